@@ -0,0 +1,28 @@
+"""add_default_partitions
+
+Revision ID: 0b6c4e8d2f17
+Revises: f81c6b2d9e34
+Create Date: 2026-10-19 23:41:07.512388
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6c4e8d2f17'
+down_revision = 'f81c6b2d9e34'
+branch_labels = None
+depends_on = None
+
+# Catch-all partitions: rows outside every monthly range land here instead of
+# failing the insert. ensure_partitions moves them out once their month exists.
+TABLES = ('videometric', 'videoframeresult')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f'CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TABLE IF EXISTS {table}_default')
@@ -0,0 +1,49 @@
+"""add_task_list_indexes
+
+Revision ID: c3a81d5e4f97
+Revises: b7e4f19a2c60
+Create Date: 2026-10-19 19:37:12.518403
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a81d5e4f97'
+down_revision = 'b7e4f19a2c60'
+branch_labels = None
+depends_on = None
+
+# Built CONCURRENTLY so a large video table stays writable during the upgrade.
+INDEXES = [
+    ('ix_video_created_at_id', 'video', ['created_at', 'id']),
+    ('ix_video_status_created_at_id', 'video', ['status', 'created_at', 'id']),
+    ('ix_video_profile_created_at_id', 'video', ['profile', 'created_at', 'id']),
+    ('ix_videometric_video_id', 'videometric', ['video_id']),
+    ('ix_persontrack_video_id', 'persontrack', ['video_id']),
+    ('ix_triggerevent_video_id', 'triggerevent', ['video_id']),
+    ('ix_webhookdelivery_video_id', 'webhookdelivery', ['video_id']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,146 @@
+"""partition_result_tables
+
+Revision ID: f81c6b2d9e34
+Revises: e5d2a7c91b08
+Create Date: 2026-10-19 22:18:44.093517
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f81c6b2d9e34'
+down_revision = 'e5d2a7c91b08'
+branch_labels = None
+depends_on = None
+
+# Monthly RANGE partitions on created_at, named <table>_pYYYYMM. The
+# retention job keeps creating them ahead of time and drops expired ones.
+MONTHS_AHEAD = 3
+
+TABLES = {
+    'videometric': {
+        'columns': """
+            id UUID NOT NULL,
+            video_id UUID NOT NULL,
+            name VARCHAR(128) NOT NULL,
+            value FLOAT NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        """,
+        'copy': 'id, video_id, name, value, created_at, updated_at',
+        'indexes': [
+            'CREATE INDEX ix_videometric_video_id ON videometric (video_id)',
+        ],
+        'old_indexes': ['ix_videometric_video_id'],
+        'sequence': None,
+    },
+    'videoframeresult': {
+        'columns': """
+            id BIGSERIAL NOT NULL,
+            video_id UUID NOT NULL,
+            timestamp_seconds FLOAT NOT NULL,
+            prompt VARCHAR(32),
+            text TEXT NOT NULL,
+            people_count INTEGER,
+            latency_seconds FLOAT,
+            search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('russian', text)) STORED,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        """,
+        'copy': (
+            'id, video_id, timestamp_seconds, prompt, text, people_count, '
+            'latency_seconds, created_at, updated_at'
+        ),
+        'indexes': [
+            'CREATE INDEX ix_videoframeresult_video_id ON videoframeresult (video_id)',
+            'CREATE INDEX ix_videoframeresult_search_vector ON videoframeresult '
+            'USING gin (search_vector)',
+        ],
+        'old_indexes': ['ix_videoframeresult_video_id', 'ix_videoframeresult_search_vector'],
+        'sequence': 'videoframeresult_id_seq',
+    },
+}
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    for table, spec in TABLES.items():
+        old = f'{table}_unpartitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+        op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+        for index in spec['old_indexes']:
+            op.execute(f'DROP INDEX {index}')
+        if spec['sequence']:
+            op.execute(f"ALTER SEQUENCE {spec['sequence']} RENAME TO {old}_id_seq")
+
+        op.execute(
+            f"""
+            CREATE TABLE {table} (
+                {spec['columns'].strip()},
+                CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at),
+                CONSTRAINT {table}_video_id_fkey FOREIGN KEY (video_id)
+                    REFERENCES video (id) ON DELETE CASCADE
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        for statement in spec['indexes']:
+            op.execute(statement)
+
+        oldest = bind.execute(sa.text(f'SELECT min(created_at) FROM {old}')).scalar()
+        month = _month_start(min(oldest or now, now))
+        last = _add_months(_month_start(now), MONTHS_AHEAD)
+        while month <= last:
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            )
+            month = upper
+
+        op.execute(f"INSERT INTO {table} ({spec['copy']}) SELECT {spec['copy']} FROM {old}")
+        if spec['sequence']:
+            op.execute(
+                f"SELECT setval('{spec['sequence']}', coalesce(max(id), 0) + 1, false) "
+                f"FROM {table}"
+            )
+        op.execute(f'DROP TABLE {old}')
+
+
+def downgrade() -> None:
+    for table, spec in TABLES.items():
+        old = f'{table}_unpartitioned'
+        columns = spec['columns'].replace('BIGSERIAL', 'BIGINT')
+        op.execute(f'CREATE TABLE {old} ({columns.strip()})')
+        op.execute(f"INSERT INTO {old} ({spec['copy']}) SELECT {spec['copy']} FROM {table}")
+        op.execute(f'DROP TABLE {table} CASCADE')
+        op.execute(f'ALTER TABLE {old} RENAME TO {table}')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_video_id_fkey FOREIGN KEY (video_id) '
+            'REFERENCES video (id) ON DELETE CASCADE'
+        )
+        if spec['sequence']:
+            op.execute(f"CREATE SEQUENCE {spec['sequence']} OWNED BY {table}.id")
+            op.execute(
+                f"ALTER TABLE {table} ALTER COLUMN id "
+                f"SET DEFAULT nextval('{spec['sequence']}')"
+            )
+            op.execute(
+                f"SELECT setval('{spec['sequence']}', coalesce(max(id), 0) + 1, false) "
+                f"FROM {table}"
+            )
+        for statement in spec['indexes']:
+            op.execute(statement)
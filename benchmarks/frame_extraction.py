@@ -0,0 +1,81 @@
+"""Compare per-timestamp ``extract_frame`` calls with one ``extract_frames`` run.
+
+Usage: python -m benchmarks.frame_extraction media/video.mp4 --frames 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.services.motion import video_stats
+from src.utils.ffmpeg_helper import FFmpegVideoHelper
+
+
+def evenly_spaced(duration: float, count: int) -> list[float]:
+    step = duration / (count + 1)
+    return [round(step * (index + 1), 3) for index in range(count)]
+
+
+def run_loop(helper: FFmpegVideoHelper, video: str, timestamps: list[float], out: Path) -> float:
+    started = time.perf_counter()
+    for index, timestamp in enumerate(timestamps):
+        helper.extract_frame(video, str(out / f"loop_{index}.jpg"), timestamp=timestamp)
+    return time.perf_counter() - started
+
+
+def run_batch(
+    helper: FFmpegVideoHelper,
+    video: str,
+    timestamps: list[float],
+    out: Path,
+    *,
+    width: int | None,
+    sprite_grid: tuple[int, int] | None,
+) -> float:
+    started = time.perf_counter()
+    helper.extract_frames(
+        video,
+        str(out),
+        timestamps,
+        width=width,
+        prefix="batch",
+        sprite_grid=sprite_grid,
+    )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("video")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--width", type=int, default=None)
+    parser.add_argument("--sprite", action="store_true", help="also tile a 10x5 sprite sheet")
+    args = parser.parse_args()
+
+    helper = FFmpegVideoHelper()
+    _, _, duration = video_stats(args.video)
+    timestamps = evenly_spaced(duration, args.frames)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        loop_seconds = run_loop(helper, args.video, timestamps, out)
+        batch_seconds = run_batch(
+            helper,
+            args.video,
+            timestamps,
+            out,
+            width=args.width,
+            sprite_grid=(10, 5) if args.sprite else None,
+        )
+
+    print(f"frames:      {len(timestamps)} over {duration:.1f}s")
+    print(f"loop:        {loop_seconds:.2f}s ({len(timestamps)} ffmpeg processes)")
+    print(f"batch:       {batch_seconds:.2f}s (1 ffmpeg process)")
+    print(f"speedup:     {loop_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
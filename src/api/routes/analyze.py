@@ -1,14 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import json
 import uuid
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, BackgroundTasks, File, HTTPException, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import cast, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import selectinload
 
-from src.db import session_scope
-from src.models import Video, VideoStatus
-from src.schemes import AnalyzeResponse, ErrorCode, ErrorResponse, VideoStatusResponse
+from src.db import async_session_scope
+from src.models import FRAME_SEARCH_CONFIG, Video, VideoFrameResult, VideoStatus
+from src.schemes import (
+    AnalyzeResponse,
+    ErrorCode,
+    ErrorResponse,
+    FrameSearchHit,
+    FrameSearchResponse,
+    TaskLookupRequest,
+    TaskLookupResponse,
+    TaskPageResponse,
+    TaskSummaryResponse,
+    VideoStatusResponse,
+)
+from src.services.live import register_live_session, request_live_stop
+from src.services.media_info import MediaInfo, probe_media
+from src.services.task_events import get_task_events
+from src.services.task_status import (
+    FINAL_STATUSES,
+    get_task_status_listener,
+    notify_live_stop,
+)
+from src.services.triggers import TriggerConfigError, parse_trigger_rules
 from src.services.video_processor import process_video_task
+from src.services.webhooks import WebhookTargetError, check_webhook_url
+from src.settings import AnalysisProfile, get_settings
+from src.utils.ffmpeg_helper import FFmpegError
 
 BASE_DIR = Path(__file__).resolve().parents[3]
 MEDIA_DIR = BASE_DIR / "media"
@@ -27,14 +70,118 @@ def save_upload_file(upload: UploadFile) -> Path:
     return target_path
 
 
+async def probe_upload(path: Path) -> MediaInfo:
+    """Reject undecodable uploads before they take a worker slot."""
+
+    try:
+        return await probe_media(str(path))
+    except FFmpegError as exc:
+        path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"code": ErrorCode.VIDEO_DECODING_FAILED, "detail": str(exc)},
+        ) from exc
+
+
+def parse_triggers_field(triggers: Optional[str]) -> Optional[list[str]]:
+    if triggers is None:
+        return None
+    try:
+        return parse_trigger_rules(triggers)
+    except TriggerConfigError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": exc.code, "detail": str(exc)},
+        ) from exc
+
+
+async def parse_webhook_field(webhook_url: Optional[str]) -> Optional[str]:
+    if not webhook_url:
+        return None
+    try:
+        await check_webhook_url(webhook_url)
+    except WebhookTargetError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": ErrorCode.INVALID_REQUEST, "detail": f"Invalid webhook_url: {exc}"},
+        ) from exc
+    return webhook_url
+
+
+async def load_task_status(task_id: uuid.UUID) -> VideoStatusResponse:
+    async with async_session_scope() as session:
+        video = await session.get(
+            Video,
+            task_id,
+            options=[selectinload(Video.tracks), selectinload(Video.trigger_events)],
+        )
+        if video is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"code": ErrorCode.VIDEO_NOT_FOUND, "detail": "Task not found"},
+            )
+        return VideoStatusResponse.from_orm(video)
+
+
+def encode_cursor(video: Video) -> str:
+    raw = json.dumps([video.created_at.isoformat(), str(video.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(task_id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": ErrorCode.INVALID_REQUEST, "detail": "Invalid cursor"},
+        ) from exc
+
+
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # ``created_at`` is stored as naive UTC.
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def resolve_live_source(source: str) -> Path:
+    live_dir = Path(get_settings().LIVE_SOURCE_DIR)
+    if not live_dir.is_absolute():
+        live_dir = BASE_DIR / live_dir
+    live_dir = live_dir.resolve()
+    path = (live_dir / source).resolve()
+    if not path.is_relative_to(live_dir):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": ErrorCode.INVALID_REQUEST, "detail": "Source outside live directory"},
+        )
+    if not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": ErrorCode.VIDEO_NOT_FOUND, "detail": "Live source not found"},
+        )
+    return path
+
+
 @router.post(
     "/analyze",
     response_model=AnalyzeResponse,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
 )
 async def analyze_video(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    triggers: Optional[str] = Form(None),
+    profile: Optional[AnalysisProfile] = Form(None),
+    time_budget: Optional[float] = Form(None),
+    webhook_url: Optional[str] = Form(None),
 ) -> AnalyzeResponse:
     if not file.filename:
         raise HTTPException(
@@ -42,35 +189,274 @@ async def analyze_video(
             detail={"code": ErrorCode.INVALID_REQUEST, "detail": "Filename missing"},
         )
 
+    if time_budget is not None and time_budget <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": ErrorCode.INVALID_REQUEST, "detail": "time_budget must be positive"},
+        )
+
+    if profile == AnalysisProfile.LIVE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": ErrorCode.INVALID_REQUEST, "detail": "Use /streams for live sources"},
+        )
+
+    trigger_rules = parse_triggers_field(triggers)
+    webhook_url = await parse_webhook_field(webhook_url)
+
     stored_path = save_upload_file(file).resolve()
-    with session_scope() as session:
+    media = await probe_upload(stored_path)
+    async with async_session_scope() as session:
         video = Video(
             original_filename=file.filename,
             stored_path=str(stored_path),
             status=VideoStatus.RECEIVED,
+            profile=profile.value if profile else None,
+            trigger_rules=trigger_rules,
+            time_budget_seconds=time_budget,
+            webhook_url=webhook_url,
+        )
+        media.apply_to(video)
+        session.add(video)
+        await session.flush()
+        video_id = video.id
+
+    background_tasks.add_task(process_video_task, video_id)
+
+    return AnalyzeResponse(task_id=video_id, status=VideoStatus.RECEIVED)
+
+
+@router.post(
+    "/streams",
+    response_model=AnalyzeResponse,
+    responses={400: {"model": ErrorResponse}},
+)
+async def analyze_stream(
+    background_tasks: BackgroundTasks,
+    source: str = Form(...),
+    triggers: Optional[str] = Form(None),
+    webhook_url: Optional[str] = Form(None),
+) -> AnalyzeResponse:
+    source_path = resolve_live_source(source)
+    trigger_rules = parse_triggers_field(triggers)
+    webhook_url = await parse_webhook_field(webhook_url)
+
+    async with async_session_scope() as session:
+        video = Video(
+            original_filename=source_path.name,
+            stored_path=str(source_path),
+            status=VideoStatus.RECEIVED,
+            profile=AnalysisProfile.LIVE.value,
+            trigger_rules=trigger_rules,
+            webhook_url=webhook_url,
         )
         session.add(video)
-        session.flush()
+        await session.flush()
         video_id = video.id
 
+    # Registered up front so the stream can be closed before the worker starts.
+    register_live_session(video_id)
     background_tasks.add_task(process_video_task, video_id)
 
     return AnalyzeResponse(task_id=video_id, status=VideoStatus.RECEIVED)
 
 
+@router.post(
+    "/tasks/{task_id}/close",
+    response_model=AnalyzeResponse,
+    responses={409: {"model": ErrorResponse}},
+)
+async def close_stream(task_id: uuid.UUID) -> AnalyzeResponse:
+    # The stream may run in another process or replica: the flag on the row is
+    # checked after every window, and the NOTIFY stops it right away.
+    stopped_here = request_live_stop(task_id)
+    async with async_session_scope() as session:
+        requested = await session.scalar(
+            update(Video)
+            .where(
+                Video.id == task_id,
+                Video.profile == AnalysisProfile.LIVE.value,
+                Video.status.in_((VideoStatus.RECEIVED, VideoStatus.PROCESSING)),
+            )
+            .values(stop_requested_at=datetime.utcnow())
+            .returning(Video.id)
+        )
+        if requested is not None:
+            await notify_live_stop(session, task_id)
+    if requested is None and not stopped_here:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"code": ErrorCode.INVALID_REQUEST, "detail": "Task is not a running stream"},
+        )
+    return AnalyzeResponse(task_id=task_id, status=VideoStatus.PROCESSING)
+
+
+@router.get(
+    "/tasks",
+    response_model=TaskPageResponse,
+    responses={400: {"model": ErrorResponse}},
+)
+async def list_tasks(
+    task_status: Optional[list[VideoStatus]] = Query(None, alias="status"),
+    profile: Optional[AnalysisProfile] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+) -> TaskPageResponse:
+    # Newest first. The cursor is the last row's (created_at, id), so each page
+    # is an index range scan on the composite indexes, however deep it is.
+    query = select(Video)
+    if task_status:
+        query = query.where(Video.status.in_(task_status))
+    if profile is not None:
+        query = query.where(Video.profile == profile.value)
+    if created_after is not None:
+        query = query.where(Video.created_at >= as_naive_utc(created_after))
+    if created_before is not None:
+        query = query.where(Video.created_at < as_naive_utc(created_before))
+    if cursor is not None:
+        query = query.where(tuple_(Video.created_at, Video.id) < decode_cursor(cursor))
+    query = query.order_by(Video.created_at.desc(), Video.id.desc()).limit(limit + 1)
+
+    async with async_session_scope() as session:
+        videos = list((await session.scalars(query)).all())
+    next_cursor = encode_cursor(videos[limit - 1]) if len(videos) > limit else None
+    return TaskPageResponse(
+        items=[TaskSummaryResponse.from_orm(video) for video in videos[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+@router.post(
+    "/tasks/lookup",
+    response_model=TaskLookupResponse,
+    responses={422: {"model": ErrorResponse}},
+)
+async def lookup_tasks(request: TaskLookupRequest) -> TaskLookupResponse:
+    ids = list(dict.fromkeys(request.ids))
+    async with async_session_scope() as session:
+        videos = await session.scalars(
+            select(Video)
+            .where(Video.id.in_(ids))
+            .options(selectinload(Video.tracks), selectinload(Video.trigger_events))
+        )
+        found = {video.id: VideoStatusResponse.from_orm(video) for video in videos}
+    return TaskLookupResponse(
+        tasks=[found[task_id] for task_id in ids if task_id in found],
+        missing=[task_id for task_id in ids if task_id not in found],
+    )
+
+
+@router.get(
+    "/search/frames",
+    response_model=FrameSearchResponse,
+)
+async def search_frames(
+    q: str = Query(..., min_length=1, max_length=500),
+    task_id: Optional[uuid.UUID] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+) -> FrameSearchResponse:
+    # Web-search syntax: ``человек бежит``, ``бег -собака``, ``"красная машина"``;
+    # ``@@`` on the stored tsvector is answered from its GIN index.
+    query = func.websearch_to_tsquery(cast(FRAME_SEARCH_CONFIG, REGCONFIG), q)
+    rank = func.ts_rank_cd(VideoFrameResult.search_vector, query)
+    statement = (
+        select(
+            VideoFrameResult.video_id,
+            VideoFrameResult.timestamp_seconds,
+            VideoFrameResult.prompt,
+            VideoFrameResult.text,
+            VideoFrameResult.people_count,
+            rank.label("rank"),
+        )
+        .where(VideoFrameResult.search_vector.op("@@")(query))
+        .order_by(rank.desc(), VideoFrameResult.id.desc())
+        .limit(limit)
+    )
+    if task_id is not None:
+        statement = statement.where(VideoFrameResult.video_id == task_id)
+
+    async with async_session_scope() as session:
+        rows = (await session.execute(statement)).all()
+    return FrameSearchResponse(
+        items=[
+            FrameSearchHit(
+                task_id=row.video_id,
+                timestamp_seconds=row.timestamp_seconds,
+                prompt=row.prompt,
+                text=row.text,
+                people_count=row.people_count,
+                rank=row.rank,
+            )
+            for row in rows
+        ]
+    )
+
+
 @router.get(
     "/tasks/{task_id}",
     response_model=VideoStatusResponse,
     responses={404: {"model": ErrorResponse}},
 )
-async def get_task_status(task_id: uuid.UUID) -> VideoStatusResponse:
-    with session_scope() as session:
-        video = session.get(Video, task_id)
-        if video is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail={"code": ErrorCode.VIDEO_NOT_FOUND, "detail": "Task not found"},
+async def get_task_status(
+    task_id: uuid.UUID,
+    wait: Optional[float] = Query(None, ge=0),
+) -> VideoStatusResponse:
+    listener = get_task_status_listener()
+    if not wait or listener is None or not listener.connected:
+        return await load_task_status(task_id)
+
+    # Watch before reading, so a change right after the read is not missed.
+    with listener.watch(task_id) as changed:
+        response = await load_task_status(task_id)
+        if response.status in FINAL_STATUSES:
+            return response
+        try:
+            await asyncio.wait_for(
+                changed.wait(), min(wait, get_settings().TASK_STATUS_MAX_WAIT_SECONDS)
             )
-        session.refresh(video)
+        except asyncio.TimeoutError:
+            return response
+    return await load_task_status(task_id)
+
+
+@router.get(
+    "/tasks/{task_id}/events",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse},
+    },
+)
+async def stream_task_events(
+    task_id: uuid.UUID,
+    last_event_id: Optional[int] = Header(None),
+) -> StreamingResponse:
+    bus = get_task_events()
+    if bus is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": ErrorCode.INVALID_REQUEST, "detail": "Task events are disabled"},
+        )
+    snapshot = await load_task_status(task_id)
+    done = snapshot.status in FINAL_STATUSES
+    keepalive = get_settings().TASK_EVENTS_KEEPALIVE_SECONDS
+
+    async def stream() -> AsyncIterator[str]:
+        yield f"event: snapshot\ndata: {snapshot.model_dump_json()}\n\n"
+        if done and not bus.finished(task_id):
+            # Finished before this process kept its events; the snapshot is all there is.
+            return
+        events = bus.subscribe(task_id, last_event_id=last_event_id, keepalive=keepalive)
+        try:
+            async for event in events:
+                yield ": keepalive\n\n" if event is None else event.encode()
+        finally:
+            await events.aclose()
 
-    return VideoStatusResponse.from_orm(video)
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,18 +1,44 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from src.api import create_api_router
+from src.db import dispose_async_engine
 from src.logger import get_logger
 from src.schemes import ErrorCode, ErrorResponse
+from src.services.retention import start_retention_job, stop_retention_job
+from src.services.task_status import start_task_status_listener, stop_task_status_listener
+from src.services.webhooks import start_webhook_dispatcher, stop_webhook_dispatcher
+from src.services.worker_loop import run_in_worker_loop, stop_worker_loop
+from src.utils.aiohttp_adapter import get_shared_adapter
 
 logger = get_logger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Provider calls run on the worker loop, so the pooled session lives there.
+    await asyncio.to_thread(run_in_worker_loop, get_shared_adapter().start())
+    await start_task_status_listener()
+    await start_webhook_dispatcher()
+    await start_retention_job()
+    try:
+        yield
+    finally:
+        await stop_retention_job()
+        await stop_webhook_dispatcher()
+        await stop_task_status_listener()
+        await dispose_async_engine()
+        await asyncio.to_thread(stop_worker_loop)
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="TSOS Video Analyzer", version="0.1.0")
+    app = FastAPI(title="TSOS Video Analyzer", version="0.1.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
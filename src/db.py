@@ -1,23 +1,47 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Generator
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
-from src.settings import get_settings
+from src.settings import BaseConfig, get_settings
 
 _engine: Engine | None = None
 _SessionFactory: sessionmaker[Session] | None = None
+_async_engine: AsyncEngine | None = None
+_async_engine_loop: asyncio.AbstractEventLoop | None = None
+_AsyncSessionFactory: async_sessionmaker[AsyncSession] | None = None
+
+
+def _pool_options(settings: BaseConfig) -> dict[str, Any]:
+    # The pool keeps DB_POOL_MIN connections open and grows to DB_POOL_MAX under load.
+    pool_size = max(settings.DB_POOL_MIN, 1)
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max(settings.DB_POOL_MAX - pool_size, 0),
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
 
 
 def get_engine() -> Engine:
+    """Sync engine for background tasks, which run in worker threads."""
+
     global _engine, _SessionFactory
     if _engine is None:
         settings = get_settings()
-        _engine = create_engine(settings.database_url, future=True)
+        _engine = create_engine(settings.database_url, future=True, **_pool_options(settings))
         _SessionFactory = sessionmaker(
             bind=_engine,
             expire_on_commit=False,
@@ -46,4 +70,65 @@ def session_scope() -> Generator[Session, None, None]:
         session.close()
 
 
-__all__ = ["get_engine", "get_session", "session_scope"]
+def get_async_engine() -> AsyncEngine:
+    """asyncpg engine for request handlers, so queries do not block the API loop.
+
+    asyncpg connections belong to the loop that opened them; a call from a
+    different loop (e.g. a test client) starts a fresh engine.
+    """
+
+    global _async_engine, _async_engine_loop, _AsyncSessionFactory
+    loop = asyncio.get_running_loop()
+    if _async_engine is not None and _async_engine_loop is not loop:
+        # Drop the old pool without closing connections from a loop that is not running.
+        _async_engine.sync_engine.dispose(close=False)
+        _async_engine = None
+    if _async_engine is None:
+        settings = get_settings()
+        _async_engine = create_async_engine(
+            settings.async_database_url, **_pool_options(settings)
+        )
+        _async_engine_loop = loop
+        _AsyncSessionFactory = async_sessionmaker(
+            bind=_async_engine,
+            expire_on_commit=False,
+            class_=AsyncSession,
+        )
+    return _async_engine
+
+
+def get_async_session() -> AsyncSession:
+    get_async_engine()
+    assert _AsyncSessionFactory is not None
+    return _AsyncSessionFactory()
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncGenerator[AsyncSession, None]:
+    session = get_async_session()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_engine_loop
+    engine, _async_engine, _async_engine_loop = _async_engine, None, None
+    if engine is not None:
+        await engine.dispose()
+
+
+__all__ = [
+    "async_session_scope",
+    "dispose_async_engine",
+    "get_async_engine",
+    "get_async_session",
+    "get_engine",
+    "get_session",
+    "session_scope",
+]
@@ -1,9 +1,26 @@
 from .base import Base
-from .video import Video, VideoMetric, VideoStatus
+from .rate_limit import ProviderRateLimit
+from .video import (
+    FRAME_SEARCH_CONFIG,
+    PersonTrack,
+    TriggerEvent,
+    Video,
+    VideoFrameResult,
+    VideoMetric,
+    VideoStatus,
+)
+from .webhook import WebhookDelivery, WebhookStatus
 
 __all__ = [
+    "FRAME_SEARCH_CONFIG",
     "Base",
+    "PersonTrack",
+    "ProviderRateLimit",
+    "TriggerEvent",
     "Video",
+    "VideoFrameResult",
     "VideoMetric",
     "VideoStatus",
+    "WebhookDelivery",
+    "WebhookStatus",
 ]
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from sqlalchemy import Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, TableNameMixin, TimestampMixin
+
+
+class ProviderRateLimit(TableNameMixin, Base, TimestampMixin):
+    """Token bucket shared by every process calling one provider/model."""
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float)
+    refilled_at: Mapped[float] = mapped_column(Float)
+    blocked_until: Mapped[float] = mapped_column(Float, default=0.0)
@@ -2,10 +2,23 @@ from __future__ import annotations
 
 import enum
 import uuid
-from typing import Optional
+from datetime import datetime
+from typing import Any, Optional
 
-from sqlalchemy import Enum, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Computed,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from .base import Base, TimestampMixin, TableNameMixin
@@ -19,6 +32,13 @@ class VideoStatus(str, enum.Enum):
 
 
 class Video(TableNameMixin, Base, TimestampMixin):
+    # Task lists filter on these and page newest first by (created_at, id).
+    __table_args__ = (
+        Index("ix_video_created_at_id", "created_at", "id"),
+        Index("ix_video_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_video_profile_created_at_id", "profile", "created_at", "id"),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
@@ -37,25 +57,134 @@ class Video(TableNameMixin, Base, TimestampMixin):
     analysis_time: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    profile: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    trigger_rules: Mapped[Optional[list[str]]] = mapped_column(JSON, nullable=True)
+    time_budget_seconds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    analysis_stage: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    video_codec: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    width: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    height: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    webhook_url: Mapped[Optional[str]] = mapped_column(String(2048), nullable=True)
+    # Set by POST /tasks/{id}/close; the replica running the stream may be another one.
+    stop_requested_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     metrics: Mapped[list["VideoMetric"]] = relationship(
         "VideoMetric",
         back_populates="video",
         cascade="all, delete-orphan",
     )
+    tracks: Mapped[list["PersonTrack"]] = relationship(
+        "PersonTrack",
+        back_populates="video",
+        cascade="all, delete-orphan",
+        order_by="PersonTrack.track_index",
+    )
+    trigger_events: Mapped[list["TriggerEvent"]] = relationship(
+        "TriggerEvent",
+        back_populates="video",
+        cascade="all, delete-orphan",
+        order_by="TriggerEvent.timestamp_seconds",
+    )
+    frame_results: Mapped[list["VideoFrameResult"]] = relationship(
+        "VideoFrameResult",
+        back_populates="video",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="VideoFrameResult.timestamp_seconds",
+    )
 
 
 class VideoMetric(TableNameMixin, Base, TimestampMixin):
+    # Partitioned by month on created_at, which must therefore be part of the key.
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
     )
+    created_at: Mapped[datetime] = mapped_column(primary_key=True, default=datetime.utcnow)
     video_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("video.id", ondelete="CASCADE"),
+        index=True,
     )
     name: Mapped[str] = mapped_column(String(128))
     value: Mapped[float] = mapped_column(Float)
 
     video: Mapped[Video] = relationship("Video", back_populates="metrics")
+
+
+class PersonTrack(TableNameMixin, Base, TimestampMixin):
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    video_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("video.id", ondelete="CASCADE"),
+        index=True,
+    )
+    track_index: Mapped[int] = mapped_column(Integer)
+    start_seconds: Mapped[float] = mapped_column(Float)
+    end_seconds: Mapped[float] = mapped_column(Float)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+
+    video: Mapped[Video] = relationship("Video", back_populates="tracks")
+
+
+class TriggerEvent(TableNameMixin, Base, TimestampMixin):
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    video_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("video.id", ondelete="CASCADE"),
+        index=True,
+    )
+    rule: Mapped[str] = mapped_column(String(255))
+    timestamp_seconds: Mapped[float] = mapped_column(Float)
+    detail: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    video: Mapped[Video] = relationship("Video", back_populates="trigger_events")
+
+
+# Text search configuration of ``VideoFrameResult.search_vector``; prompts and
+# answers are in Russian. Queries must use the same one to hit the GIN index.
+FRAME_SEARCH_CONFIG = "russian"
+
+
+class VideoFrameResult(TableNameMixin, Base, TimestampMixin):
+    """One provider answer for one frame; written in bulk when a task completes.
+
+    Partitioned by month on ``created_at`` like :class:`VideoMetric`.
+    """
+
+    __table_args__ = (
+        Index("ix_videoframeresult_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(primary_key=True, default=datetime.utcnow)
+    video_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("video.id", ondelete="CASCADE"),
+        index=True,
+    )
+    timestamp_seconds: Mapped[float] = mapped_column(Float)
+    prompt: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    text: Mapped[str] = mapped_column(Text)
+    people_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    latency_seconds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    search_vector: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{FRAME_SEARCH_CONFIG}', text)", persisted=True),
+        nullable=True,
+    )
+
+    video: Mapped[Video] = relationship("Video", back_populates="frame_results")
@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    runtime_checkable,
+)
+
+from src.logger import get_logger
+from src.providers.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    counts_as_failure,
+    get_circuit_breaker,
+)
+from src.providers.latency import AdaptiveTimeout
+from src.providers.rate_limit import RateLimiter, get_rate_limiter
+from src.providers.response_cache import ResponseCache, cache_key, get_response_cache
+from src.schemes import ErrorCode
+from src.settings import ModelTier, get_settings
+from src.utils.aiohttp_adapter import AioHttpAdapter, AioHttpAdapterError, get_shared_adapter
+
+logger = get_logger(__name__)
+
+
+# Receives the answer streamed so far, i.e. the whole text, not a delta:
+# a retried or failed-over request simply starts over.
+PartialCallback = Callable[[str], None]
+
+
+class ProviderError(RuntimeError):
+    pass
+
+
+@runtime_checkable
+class VisionProvider(Protocol):
+    """What :class:`~src.services.frame_analysis.FrameAnalyzer` needs from a backend."""
+
+    name: str
+    cost_per_request: float
+
+    async def describe_image(
+        self,
+        image_path: str,
+        *,
+        prompt: str,
+        on_partial: Optional[PartialCallback] = None,
+        tier: Optional[ModelTier] = None,
+    ) -> str:
+        ...
+
+    async def describe_images(
+        self,
+        image_paths: Sequence[str],
+        *,
+        prompt: str,
+        labels: Optional[Sequence[str]] = None,
+        tier: Optional[ModelTier] = None,
+    ) -> str:
+        ...
+
+
+def encode_image(image_path: Path) -> str:
+    mime_map = {
+        ".png": "image/png",
+        ".jpg": "image/jpeg",
+        ".jpeg": "image/jpeg",
+        ".webp": "image/webp",
+        ".gif": "image/gif",
+    }
+    suffix = image_path.suffix.lower()
+    mime = mime_map.get(suffix, "image/jpeg")
+    data = image_path.read_bytes()
+    encoded = base64.b64encode(data).decode("utf-8")
+    return f"data:{mime};base64,{encoded}"
+
+
+class ChatCompletionClient:
+    """Vision prompts over an OpenAI-compatible ``/chat/completions`` endpoint.
+
+    Subclasses set ``name``, the endpoint and auth headers. Answers go
+    through the shared response cache; ``rate_limited`` backends also take
+    tokens from the shared rate limiter under ``<name>:<model>``. Request
+    timeouts follow the latency observed per model and number of images.
+    Calls fail fast with :class:`CircuitOpenError` while the provider's
+    circuit breaker is open. With ``on_partial`` the completion is streamed
+    and the callback sees the answer grow token by token.
+
+    ``tier=ModelTier.FAST`` selects ``fast_model`` (when the backend has
+    one) instead of ``model``. Latency and token usage are recorded per model.
+    """
+
+    name = "chat"
+    error_class: type[ProviderError] = ProviderError
+    rate_limited = True
+
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        model: str,
+        fast_model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        adapter: Optional[AioHttpAdapter] = None,
+        cooldown_seconds: float = 1.5,
+        cost_per_request: float = 0.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        timeouts: Optional[AdaptiveTimeout] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.fast_model = fast_model
+        self.api_key = api_key
+        self.adapter = adapter or get_shared_adapter()
+        self.cooldown_seconds = cooldown_seconds
+        self.cost_per_request = cost_per_request
+        if rate_limiter is None and self.rate_limited:
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter
+        self.response_cache = (
+            response_cache if response_cache is not None else get_response_cache()
+        )
+        settings = get_settings()
+        if timeouts is None and settings.ADAPTIVE_TIMEOUT_ENABLED:
+            timeouts = AdaptiveTimeout(
+                default=self.adapter.timeout,
+                minimum=settings.PROVIDER_TIMEOUT_MIN_SECONDS,
+                maximum=settings.PROVIDER_TIMEOUT_MAX_SECONDS,
+                multiplier=settings.PROVIDER_TIMEOUT_P99_MULTIPLIER,
+            )
+        self.timeouts = timeouts
+        self.circuit_breaker = (
+            circuit_breaker if circuit_breaker is not None else get_circuit_breaker(self.name)
+        )
+
+    def model_for(self, tier: Optional[ModelTier]) -> str:
+        if tier == ModelTier.FAST and self.fast_model:
+            return self.fast_model
+        return self.model
+
+    def unavailable_for(self) -> float:
+        """Seconds until the circuit breaker lets calls through (``0`` if it does)."""
+
+        if self.circuit_breaker is None:
+            return 0.0
+        return self.circuit_breaker.retry_after()
+
+    @property
+    def _headers(self) -> dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    async def describe_image(
+        self,
+        image_path: str,
+        *,
+        prompt: str,
+        model: Optional[str] = None,
+        tier: Optional[ModelTier] = None,
+        on_partial: Optional[PartialCallback] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+    ) -> str:
+        path = Path(image_path)
+        if not path.exists():
+            raise self.error_class(f"Image file not found: {image_path}")
+
+        content = [
+            {"type": "text", "text": prompt},
+            {"type": "image_url", "image_url": {"url": encode_image(path)}},
+        ]
+        return await self._complete(
+            content,
+            model=model or self.model_for(tier),
+            on_partial=on_partial,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+        )
+
+    async def describe_images(
+        self,
+        image_paths: Sequence[str],
+        *,
+        prompt: str,
+        labels: Optional[Sequence[str]] = None,
+        model: Optional[str] = None,
+        tier: Optional[ModelTier] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+    ) -> str:
+        """Send several images in one chat completion.
+
+        Each image is preceded by its label (e.g. frame number and timestamp)
+        so the answer can refer to frames individually.
+        """
+
+        if labels is not None and len(labels) != len(image_paths):
+            raise self.error_class("labels must match image_paths one to one.")
+
+        content: list[dict[str, Any]] = [{"type": "text", "text": prompt}]
+        for index, image_path in enumerate(image_paths):
+            path = Path(image_path)
+            if not path.exists():
+                raise self.error_class(f"Image file not found: {image_path}")
+            if labels is not None:
+                content.append({"type": "text", "text": labels[index]})
+            content.append({"type": "image_url", "image_url": {"url": encode_image(path)}})
+
+        return await self._complete(
+            content,
+            model=model or self.model_for(tier),
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+        )
+
+    def _request_options(self, model: str) -> dict[str, Any]:
+        """Request fields besides the messages; all of them are part of the cache key."""
+
+        return {"model": model}
+
+    async def _complete(
+        self,
+        content: list[dict[str, Any]],
+        *,
+        model: str,
+        max_retries: int,
+        retry_delay: float,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> str:
+        key: Optional[str] = None
+        if self.response_cache is not None:
+            key = cache_key(self.name, content, options=self._request_options(model))
+            cached = await self.response_cache.aget(key)
+            if cached is not None:
+                logger.info("%s answer served from cache", self.name)
+                if on_partial is not None:
+                    on_partial(cached)
+                return cached
+
+        answer = await self._request(
+            content,
+            model=model,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            on_partial=on_partial,
+        )
+        if self.response_cache is not None and key is not None:
+            await self.response_cache.aset(key, answer)
+        return answer
+
+    async def _request(
+        self,
+        content: list[dict[str, Any]],
+        *,
+        model: str,
+        max_retries: int,
+        retry_delay: float,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> str:
+        payload = {
+            **self._request_options(model),
+            "messages": [{"role": "user", "content": content}],
+        }
+
+        limit_key = f"{self.name}:{model}"
+        images = sum(1 for item in content if item.get("type") == "image_url")
+        timeout_key = f"{limit_key}:{images}"
+        attempt = 0
+        throttled = False
+        while attempt < max_retries:
+            attempt += 1
+            try:
+                # After a 429 the shared limiter already holds the next attempt back.
+                if attempt > 1 and not throttled:
+                    logger.info(
+                        "Cooling down before retry (%ss)",
+                        self.cooldown_seconds,
+                    )
+                    await asyncio.sleep(self.cooldown_seconds)
+                throttled = False
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.before_call()
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire(limit_key)
+                logger.info("Calling %s (%s/%s)", self.name, attempt, max_retries)
+                started = time.perf_counter()
+                timeout = self.timeouts.timeout(timeout_key) if self.timeouts else None
+                if on_partial is None:
+                    response = await self.adapter.post_json(
+                        f"{self.base_url}/chat/completions",
+                        headers=self._headers,
+                        json=payload,
+                        timeout=timeout,
+                    )
+                    answer, headers = self._extract_content(response.payload), response.headers
+                    usage = response.payload.get("usage")
+                else:
+                    answer, headers, usage = await self._stream(payload, timeout, on_partial)
+                elapsed = time.perf_counter() - started
+                if self.timeouts is not None:
+                    self.timeouts.record(timeout_key, elapsed)
+                self._record_usage(model, elapsed, usage)
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_success()
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.observe(limit_key, headers)
+                return answer
+            except (AioHttpAdapterError, ProviderError) as exc:
+                if isinstance(exc, CircuitOpenError):
+                    raise
+                logger.warning("%s request failed: %s", self.name, exc)
+                if self.circuit_breaker is not None and isinstance(exc, AioHttpAdapterError):
+                    if counts_as_failure(exc):
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+                rate_limited = isinstance(exc, AioHttpAdapterError) and exc.status == 429
+                if rate_limited and self.rate_limiter is not None:
+                    await self.rate_limiter.penalize(
+                        limit_key,
+                        exc.headers,
+                        default=retry_delay * attempt + self.cooldown_seconds,
+                    )
+                    throttled = True
+                if attempt >= max_retries:
+                    raise
+                if throttled:
+                    continue
+                backoff = retry_delay * attempt
+                if rate_limited:
+                    backoff += self.cooldown_seconds
+                await asyncio.sleep(backoff)
+
+        raise self.error_class("Failed to describe image after retries.")
+
+    def _record_usage(self, model: str, elapsed: float, usage: Any) -> None:
+        from src.services.metrics import PROVIDER_MODEL_REQUEST_TIME, PROVIDER_TOKENS
+
+        PROVIDER_MODEL_REQUEST_TIME.labels(provider=self.name, model=model).observe(elapsed)
+        if not isinstance(usage, dict):
+            return
+        for kind in ("prompt", "completion"):
+            tokens = usage.get(f"{kind}_tokens")
+            if isinstance(tokens, int) and tokens > 0:
+                PROVIDER_TOKENS.labels(provider=self.name, model=model, kind=kind).inc(tokens)
+
+    async def _stream(
+        self,
+        payload: dict[str, Any],
+        timeout: Optional[float],
+        on_partial: PartialCallback,
+    ) -> tuple[str, Mapping[str, str], Any]:
+        from src.services.metrics import PROVIDER_FIRST_TOKEN_TIME
+
+        started = time.perf_counter()
+        parts: list[str] = []
+        usage: Any = None
+        async with self.adapter.post_stream(
+            f"{self.base_url}/chat/completions",
+            headers=self._headers,
+            json={**payload, "stream": True, "stream_options": {"include_usage": True}},
+            timeout=timeout,
+        ) as response:
+            async for event in response.events():
+                if not isinstance(event, dict):
+                    continue
+                # Usage comes with the last chunk, whose ``choices`` is empty.
+                usage = event.get("usage") or usage
+                error = event.get("error")
+                if error:
+                    # Errors after the first byte arrive in the stream with status 200.
+                    code = error.get("code") if isinstance(error, dict) else None
+                    message = error.get("message") if isinstance(error, dict) else error
+                    raise AioHttpAdapterError(
+                        ErrorCode.AI_PROVIDER_UNAVAILABLE,
+                        f"Stream error: {message}",
+                        status=code if isinstance(code, int) else None,
+                    )
+                delta = self._extract_delta(event)
+                if not delta:
+                    continue
+                if not parts:
+                    PROVIDER_FIRST_TOKEN_TIME.labels(provider=self.name).observe(
+                        time.perf_counter() - started
+                    )
+                parts.append(delta)
+                on_partial("".join(parts))
+        if not parts:
+            raise self.error_class(f"No content returned from {self.name}.")
+        return "".join(parts), response.headers, usage
+
+    @staticmethod
+    def _extract_delta(event: dict[str, Any]) -> str:
+        texts = []
+        for choice in event.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if isinstance(content, str):
+                texts.append(content)
+        return "".join(texts)
+
+    def _extract_content(self, response: dict[str, Any]) -> str:
+        choices: Iterable[dict[str, Any]] = response.get("choices", [])
+        for choice in choices:
+            message = choice.get("message")
+            if not message:
+                continue
+            content = message.get("content")
+            if isinstance(content, str):
+                return content
+            if isinstance(content, list):
+                texts = [item.get("text") for item in content if "text" in item]
+                combined = "\n".join(filter(None, texts))
+                if combined:
+                    return combined
+        raise self.error_class(f"No content returned from {self.name}.")
+
+
+__all__ = [
+    "ChatCompletionClient",
+    "PartialCallback",
+    "ProviderError",
+    "VisionProvider",
+    "encode_image",
+]
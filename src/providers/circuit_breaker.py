@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Optional
+
+from src.logger import get_logger
+from src.schemes import ErrorCode
+from src.settings import get_settings
+from src.utils.aiohttp_adapter import AioHttpAdapterError
+
+logger = get_logger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitOpenError(AioHttpAdapterError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            ErrorCode.AI_PROVIDER_UNAVAILABLE,
+            f"Circuit open for {name}, retry in {retry_after:.0f}s",
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+def counts_as_failure(exc: BaseException) -> bool:
+    """Outages trip the breaker; client errors and 429s (rate limiter's job) do not."""
+
+    if not isinstance(exc, AioHttpAdapterError) or isinstance(exc, CircuitOpenError):
+        return False
+    return exc.status is None or exc.status >= 500
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over the last ``window`` calls of a provider.
+
+    The circuit opens when at least ``min_calls`` outcomes are known and the
+    failure share reaches ``failure_rate``. After ``open_seconds`` it lets
+    ``half_open_calls`` probe requests through: a success closes it, a
+    failure opens it again for another ``open_seconds``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: CircuitState) -> None:
+        from src.services.metrics import PROVIDER_CIRCUIT_STATE
+
+        if state != self._state:
+            logger.warning("Circuit for %s: %s -> %s", self.name, self._state.value, state.value)
+        self._state = state
+        PROVIDER_CIRCUIT_STATE.labels(provider=self.name).set(_STATE_VALUES[state])
+
+    def _current(self) -> CircuitState:
+        now = self._clock()
+        if self._state == CircuitState.OPEN and now >= self._opened_at + self.open_seconds:
+            self._set_state(CircuitState.HALF_OPEN)
+            self._probes.clear()
+        # A probe that never reported back (e.g. cancelled) frees its slot eventually.
+        while self._probes and now - self._probes[0] > self.open_seconds:
+            self._probes.popleft()
+        return self._state
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current()
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a call through again (``0`` if it does now)."""
+
+        with self._lock:
+            state = self._current()
+            if state == CircuitState.OPEN:
+                return self._opened_at + self.open_seconds - self._clock()
+            if state == CircuitState.HALF_OPEN and len(self._probes) >= self.half_open_calls:
+                return self._probes[0] + self.open_seconds - self._clock()
+            return 0.0
+
+    def before_call(self) -> None:
+        from src.services.metrics import PROVIDER_CIRCUIT_REJECTED
+
+        with self._lock:
+            state = self._current()
+            if state == CircuitState.CLOSED:
+                return
+            now = self._clock()
+            if state == CircuitState.HALF_OPEN and len(self._probes) < self.half_open_calls:
+                self._probes.append(now)
+                return
+            if state == CircuitState.OPEN:
+                retry_after = self._opened_at + self.open_seconds - now
+            else:
+                retry_after = self._probes[0] + self.open_seconds - now
+        PROVIDER_CIRCUIT_REJECTED.labels(provider=self.name).inc()
+        raise CircuitOpenError(self.name, max(retry_after, 0.0))
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._probes.clear()
+        self._set_state(CircuitState.OPEN)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._current() == CircuitState.HALF_OPEN:
+                self._outcomes.clear()
+                self._probes.clear()
+                self._set_state(CircuitState.CLOSED)
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current()
+            if state == CircuitState.HALF_OPEN:
+                self._open()
+                return
+            if state == CircuitState.OPEN:
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
+    """Process-wide breaker for a provider, or ``None`` when breakers are off."""
+
+    settings = get_settings()
+    if not settings.CIRCUIT_BREAKER_ENABLED:
+        return None
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                window=settings.CIRCUIT_BREAKER_WINDOW,
+                min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+                failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+                open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+            )
+        return breaker
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CircuitState",
+    "counts_as_failure",
+    "get_circuit_breaker",
+]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Optional
+
+
+class ProviderStats:
+    """Latency and outcome of the last ``window`` calls to one provider."""
+
+    def __init__(self, window: int = 50) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+
+    def record_censored(self, latency: float) -> None:
+        """A call abandoned after ``latency`` seconds: its latency is at least that.
+
+        Kept as a latency sample so the slow tail stays visible; the outcome is
+        unknown, so the error rate is not touched.
+        """
+
+        self.latencies.append(latency)
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class AdaptiveTimeout:
+    """Per-key request timeout derived from the observed p99 latency.
+
+    Until ``min_samples`` successful calls are seen the ``default`` applies.
+    Afterwards the timeout is ``multiplier`` times the p99, clamped to
+    ``[minimum, maximum]``, so a stuck response is abandoned long before the
+    fixed ceiling while normal slow answers still fit.
+    """
+
+    def __init__(
+        self,
+        *,
+        default: float,
+        minimum: float,
+        maximum: float,
+        multiplier: float = 2.0,
+        min_samples: int = 20,
+        window: int = 200,
+    ) -> None:
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.window = window
+        self._stats: dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, latency: float) -> None:
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = ProviderStats(self.window)
+            stats.record(latency, ok=True)
+
+    def timeout(self, key: str) -> float:
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None or len(stats.latencies) < self.min_samples:
+                return self.default
+            p99 = stats.quantile(0.99) or self.default
+        return min(max(p99 * self.multiplier, self.minimum), self.maximum)
+
+
+__all__ = ["AdaptiveTimeout", "ProviderStats"]
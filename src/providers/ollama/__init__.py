@@ -0,0 +1,6 @@
+from .client import OllamaClient, OllamaError
+
+__all__ = [
+    "OllamaClient",
+    "OllamaError",
+]
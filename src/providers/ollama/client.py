@@ -1 +1,58 @@
-# Клиент для работы с Ollama API
+from __future__ import annotations
+
+from typing import Optional
+
+from src.providers.base import ChatCompletionClient, ProviderError
+from src.providers.circuit_breaker import CircuitBreaker
+from src.providers.response_cache import ResponseCache
+from src.settings import get_settings
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+DEFAULT_BASE_URL = "http://localhost:11434/v1"
+
+
+class OllamaError(ProviderError):
+    pass
+
+
+class OllamaClient(ChatCompletionClient):
+    """Local Ollama through its OpenAI-compatible ``/v1`` endpoint.
+
+    A local model has no remote quota, so calls skip the shared rate limiter.
+    The model must support images (``qwen2.5vl``, ``llava``, ``gemma3``).
+    """
+
+    name = "ollama"
+    error_class = OllamaError
+    rate_limited = False
+
+    def __init__(
+        self,
+        *,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        fast_model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        adapter: Optional[AioHttpAdapter] = None,
+        cost_per_request: Optional[float] = None,
+        response_cache: Optional[ResponseCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        settings = get_settings()
+        super().__init__(
+            base_url=base_url or settings.OLLAMA_BASE_URL or DEFAULT_BASE_URL,
+            model=model or settings.OLLAMA_MODEL,
+            fast_model=fast_model or settings.OLLAMA_FAST_MODEL,
+            api_key=api_key or settings.OLLAMA_API_KEY,
+            adapter=adapter,
+            cooldown_seconds=0.5,
+            cost_per_request=(
+                settings.OLLAMA_COST_PER_REQUEST if cost_per_request is None else cost_per_request
+            ),
+            response_cache=response_cache,
+            circuit_breaker=circuit_breaker,
+        )
+
+
+__all__ = ["OllamaClient", "OllamaError"]
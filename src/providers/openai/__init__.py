@@ -0,0 +1,6 @@
+from .client import OpenAIClient, OpenAIError
+
+__all__ = [
+    "OpenAIClient",
+    "OpenAIError",
+]
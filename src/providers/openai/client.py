@@ -1 +1,57 @@
-# Клиент для работы с OpenAI API
+from __future__ import annotations
+
+from typing import Optional
+
+from src.providers.base import ChatCompletionClient, ProviderError
+from src.providers.circuit_breaker import CircuitBreaker
+from src.providers.rate_limit import RateLimiter
+from src.providers.response_cache import ResponseCache
+from src.settings import get_settings
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+class OpenAIError(ProviderError):
+    pass
+
+
+class OpenAIClient(ChatCompletionClient):
+    """OpenAI, or any server speaking its chat completions API (vLLM, LM Studio)."""
+
+    name = "openai"
+    error_class = OpenAIError
+
+    def __init__(
+        self,
+        *,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        fast_model: Optional[str] = None,
+        adapter: Optional[AioHttpAdapter] = None,
+        cost_per_request: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        settings = get_settings()
+        api_key = api_key or settings.OPENAI_API_KEY
+
+        if not api_key:
+            raise OpenAIError("OPENAI_API_KEY is not configured.")
+
+        super().__init__(
+            base_url=base_url or settings.OPENAI_BASE_URL,
+            model=model or settings.OPENAI_MODEL,
+            fast_model=fast_model or settings.OPENAI_FAST_MODEL,
+            api_key=api_key,
+            adapter=adapter,
+            cost_per_request=(
+                settings.OPENAI_COST_PER_REQUEST if cost_per_request is None else cost_per_request
+            ),
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            circuit_breaker=circuit_breaker,
+        )
+
+
+__all__ = ["OpenAIClient", "OpenAIError"]
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional, Protocol
+
+from sqlalchemy import text
+
+from src.db import session_scope
+from src.logger import get_logger
+from src.models import ProviderRateLimit
+from src.settings import RateLimitStore, get_settings
+
+logger = get_logger(__name__)
+
+# Never sleep longer than this in one go, so a shortened block is noticed.
+_MAX_SLEEP_SECONDS = 5.0
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+@dataclass(frozen=True)
+class BucketState:
+    tokens: float
+    refilled_at: float
+    blocked_until: float = 0.0
+
+
+def take_token(
+    state: Optional[BucketState],
+    *,
+    rate: float,
+    burst: int,
+    now: float,
+) -> tuple[BucketState, float]:
+    """Refill the bucket and try to take one token.
+
+    Returns the new state and how long to wait before trying again
+    (``0`` when the token was taken).
+    """
+
+    if state is None:
+        state = BucketState(tokens=float(burst), refilled_at=now)
+    tokens = min(float(burst), state.tokens + max(now - state.refilled_at, 0.0) * rate)
+    state = replace(state, tokens=tokens, refilled_at=max(now, state.refilled_at))
+    if state.blocked_until > now:
+        return state, state.blocked_until - now
+    if tokens >= 1.0:
+        return replace(state, tokens=tokens - 1.0), 0.0
+    return state, (1.0 - tokens) / rate
+
+
+def block_bucket(state: Optional[BucketState], *, until: float, now: float) -> BucketState:
+    """Block the bucket until ``until`` and drain it, so it trickles back afterwards."""
+
+    if state is None:
+        return BucketState(tokens=0.0, refilled_at=now, blocked_until=until)
+    return BucketState(
+        tokens=0.0,
+        refilled_at=max(now, until),
+        blocked_until=max(state.blocked_until, until),
+    )
+
+
+class BucketStore(Protocol):
+    """Storage for bucket states; ``blocking`` stores are called from a thread."""
+
+    blocking: bool
+
+    def take(self, key: str, *, rate: float, burst: int, now: float) -> float:
+        ...
+
+    def block(self, key: str, *, until: float, now: float) -> None:
+        ...
+
+
+class LocalBucketStore:
+    """In-process store: shared by every task of one worker, not across workers."""
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self._states: dict[str, BucketState] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, *, rate: float, burst: int, now: float) -> float:
+        with self._lock:
+            state, wait = take_token(self._states.get(key), rate=rate, burst=burst, now=now)
+            self._states[key] = state
+            return wait
+
+    def block(self, key: str, *, until: float, now: float) -> None:
+        with self._lock:
+            self._states[key] = block_bucket(self._states.get(key), until=until, now=now)
+
+
+class PostgresBucketStore:
+    """Cluster-wide store: one row per key, updated under an advisory lock.
+
+    ``pg_advisory_xact_lock`` serialises writers of the same key (including
+    the insert of a missing row) and is released with the transaction.
+    """
+
+    blocking = True
+
+    @staticmethod
+    def _lock(session, key: str) -> Optional[ProviderRateLimit]:
+        session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": key})
+        return session.get(ProviderRateLimit, key)
+
+    @staticmethod
+    def _save(session, key: str, row: Optional[ProviderRateLimit], state: BucketState) -> None:
+        if row is None:
+            row = ProviderRateLimit(key=key)
+            session.add(row)
+        row.tokens = state.tokens
+        row.refilled_at = state.refilled_at
+        row.blocked_until = state.blocked_until
+
+    @staticmethod
+    def _state(row: Optional[ProviderRateLimit]) -> Optional[BucketState]:
+        if row is None:
+            return None
+        return BucketState(row.tokens, row.refilled_at, row.blocked_until)
+
+    def take(self, key: str, *, rate: float, burst: int, now: float) -> float:
+        with session_scope() as session:
+            row = self._lock(session, key)
+            state, wait = take_token(self._state(row), rate=rate, burst=burst, now=now)
+            self._save(session, key, row, state)
+            return wait
+
+    def block(self, key: str, *, until: float, now: float) -> None:
+        with session_scope() as session:
+            row = self._lock(session, key)
+            self._save(session, key, row, block_bucket(self._state(row), until=until, now=now))
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def parse_retry_after(value: Optional[str], *, now: float) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` value (delta-seconds or HTTP-date)."""
+
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - now, 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_reset(value: Optional[str], *, now: float) -> Optional[float]:
+    """Seconds until a rate-limit window resets.
+
+    Accepts epoch milliseconds (OpenRouter), epoch seconds, plain seconds
+    and Go-style durations such as ``6m0s`` or ``20ms`` (OpenAI).
+    """
+
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        return _parse_duration(value)
+    if number > 1e12:
+        return max(number / 1000.0 - now, 0.0)
+    if number > 1e9:
+        return max(number - now, 0.0)
+    return max(number, 0.0)
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    lowered = {name.lower(): value for name, value in headers.items()}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+def limit_delay(headers: Optional[Mapping[str, str]], *, now: float) -> Optional[float]:
+    """How long the provider asks us to hold off, or ``None`` if it does not say.
+
+    ``Retry-After`` wins; otherwise an exhausted ``x-ratelimit-remaining``
+    means waiting for ``x-ratelimit-reset``.
+    """
+
+    if not headers:
+        return None
+    retry_after = parse_retry_after(_header(headers, "retry-after"), now=now)
+    if retry_after is not None:
+        return retry_after
+    remaining = _header(headers, "x-ratelimit-remaining", "x-ratelimit-remaining-requests")
+    try:
+        exhausted = remaining is not None and float(remaining) <= 0
+    except ValueError:
+        exhausted = False
+    if not exhausted:
+        return None
+    return parse_reset(_header(headers, "x-ratelimit-reset", "x-ratelimit-reset-requests"), now=now)
+
+
+class RateLimiter:
+    """Token bucket per provider/model key, shared through a :class:`BucketStore`.
+
+    Every call waits in :meth:`acquire` for a token. A 429 or an exhausted
+    quota header blocks the key for everyone using the same store, so
+    concurrent jobs back off together instead of retrying in a storm.
+    """
+
+    def __init__(
+        self,
+        store: BucketStore,
+        *,
+        requests_per_minute: float,
+        burst: int,
+    ) -> None:
+        if requests_per_minute <= 0 or burst < 1:
+            raise ValueError("Rate limit needs a positive rate and a burst of at least 1.")
+        self.store = store
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst
+
+    async def _call(self, method, key: str, **kwargs):
+        if self.store.blocking:
+            return await asyncio.to_thread(method, key, **kwargs)
+        return method(key, **kwargs)
+
+    async def acquire(self, key: str) -> float:
+        """Wait for a token; returns the total time spent waiting."""
+
+        from src.services.metrics import RATE_LIMIT_WAIT_TIME
+
+        waited = 0.0
+        while True:
+            wait = await self._call(
+                self.store.take, key, rate=self.rate, burst=self.burst, now=time.time()
+            )
+            if wait <= 0:
+                RATE_LIMIT_WAIT_TIME.labels(key=key).observe(waited)
+                return waited
+            sleep_for = min(wait, _MAX_SLEEP_SECONDS)
+            logger.debug("Rate limit for %s, waiting %.2fs", key, sleep_for)
+            await asyncio.sleep(sleep_for)
+            waited += sleep_for
+
+    async def block(self, key: str, seconds: float) -> None:
+        now = time.time()
+        await self._call(self.store.block, key, until=now + seconds, now=now)
+
+    async def observe(self, key: str, headers: Optional[Mapping[str, str]]) -> None:
+        """Block the key early when a successful response says the quota is spent."""
+
+        delay = limit_delay(headers, now=time.time())
+        if delay:
+            logger.info("Provider quota for %s exhausted, pausing %.1fs", key, delay)
+            await self.block(key, delay)
+
+    async def penalize(
+        self,
+        key: str,
+        headers: Optional[Mapping[str, str]],
+        *,
+        default: float,
+    ) -> float:
+        """Block the key after a 429; returns the delay that was applied."""
+
+        from src.services.metrics import RATE_LIMIT_THROTTLED
+
+        delay = limit_delay(headers, now=time.time())
+        if delay is None:
+            delay = default
+        RATE_LIMIT_THROTTLED.labels(key=key).inc()
+        logger.warning("Provider throttled %s, pausing %.1fs", key, delay)
+        await self.block(key, delay)
+        return delay
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Process-wide limiter from settings, or ``None`` when rate limiting is off."""
+
+    global _shared_limiter
+    settings = get_settings()
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_limiter is None:
+            store: BucketStore
+            if settings.RATE_LIMIT_STORE == RateLimitStore.POSTGRES:
+                store = PostgresBucketStore()
+            else:
+                store = LocalBucketStore()
+            _shared_limiter = RateLimiter(
+                store,
+                requests_per_minute=settings.RATE_LIMIT_REQUESTS_PER_MINUTE,
+                burst=settings.RATE_LIMIT_BURST,
+            )
+        return _shared_limiter
+
+
+__all__ = [
+    "BucketState",
+    "BucketStore",
+    "LocalBucketStore",
+    "PostgresBucketStore",
+    "RateLimiter",
+    "block_bucket",
+    "get_rate_limiter",
+    "limit_delay",
+    "parse_reset",
+    "parse_retry_after",
+    "take_token",
+]
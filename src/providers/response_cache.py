@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+from src.logger import get_logger
+from src.settings import get_settings
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS response_accessed_at ON response (accessed_at);
+"""
+
+
+def _image_digest(url: str) -> str:
+    """SHA-256 of the image itself for data URLs, of the URL for remote images."""
+
+    header, sep, encoded = url.partition(",")
+    if sep and header.startswith("data:") and header.endswith(";base64"):
+        try:
+            return hashlib.sha256(base64.b64decode(encoded, validate=True)).hexdigest()
+        except binascii.Error:
+            pass
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def cache_key(
+    provider: str,
+    content: Sequence[dict[str, Any]],
+    *,
+    options: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """Digest of a chat request: provider, request options, text parts and images.
+
+    ``options`` are the request fields besides the messages (model,
+    temperature, token limits and so on); any of them can change the answer.
+    Images are reduced to the SHA-256 of their decoded bytes, so the same
+    frame gives the same key whatever its data URL looks like.
+    """
+
+    parts: list[Any] = [provider, dict(options or {})]
+    for item in content:
+        if item.get("type") == "image_url":
+            url = item.get("image_url", {}).get("url", "")
+            parts.append({"image": _image_digest(url)})
+        else:
+            parts.append(item.get("text", ""))
+    encoded = json.dumps(
+        parts, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache of provider answers: an in-memory LRU over SQLite.
+
+    Entries older than ``ttl_seconds`` are treated as missing. The disk tier
+    keeps at most ``max_disk_bytes`` of answers and drops the least recently
+    read ones first. ``path=None`` keeps only the memory tier.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        *,
+        memory_entries: int = 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        from src.services.metrics import RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES
+
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, created_at = cached
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    RESPONSE_CACHE_HITS.labels(tier="memory").inc()
+                    return value
+                del self._memory[key]
+
+            db = self._connection()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value, created_at FROM response WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    with db:
+                        db.execute(
+                            "UPDATE response SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                    self._remember(key, row[0], row[1])
+                    RESPONSE_CACHE_HITS.labels(tier="disk").inc()
+                    return row[0]
+                if row is not None:
+                    with db:
+                        db.execute("DELETE FROM response WHERE key = ?", (key,))
+
+        RESPONSE_CACHE_MISSES.inc()
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            db = self._connection()
+            if db is None:
+                return
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO response (key, value, size, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value.encode("utf-8")), now, now),
+                )
+                self._evict(db, now)
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute("DELETE FROM response WHERE created_at < ?", (now - self.ttl_seconds,))
+        (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM response").fetchone()
+        if total <= self.max_disk_bytes:
+            return
+        freed = 0
+        stale: list[str] = []
+        for key, size in db.execute("SELECT key, size FROM response ORDER BY accessed_at"):
+            if total - freed <= self.max_disk_bytes:
+                break
+            stale.append(key)
+            freed += size
+        db.executemany("DELETE FROM response WHERE key = ?", [(key,) for key in stale])
+        logger.info("Evicted %s cached responses (%s bytes)", len(stale), freed)
+
+    async def aget(self, key: str) -> Optional[str]:
+        if self.path is None:
+            return self.get(key)
+        try:
+            return await asyncio.to_thread(self.get, key)
+        except sqlite3.Error as exc:
+            logger.warning("Response cache read failed: %s", exc)
+            return None
+
+    async def aset(self, key: str, value: str) -> None:
+        if self.path is None:
+            self.set(key, value)
+            return
+        try:
+            await asyncio.to_thread(self.set, key, value)
+        except sqlite3.Error as exc:
+            logger.warning("Response cache write failed: %s", exc)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache from settings, or ``None`` when caching is off."""
+
+    global _shared_cache
+    settings = get_settings()
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                settings.RESPONSE_CACHE_PATH or None,
+                memory_entries=settings.RESPONSE_CACHE_MEMORY_ENTRIES,
+                ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+                max_disk_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return _shared_cache
+
+
+__all__ = ["ResponseCache", "cache_key", "get_response_cache"]
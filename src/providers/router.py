@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from src.logger import get_logger
+from src.providers.base import PartialCallback, ProviderError, VisionProvider
+from src.providers.latency import ProviderStats
+from src.providers.ollama import OllamaClient
+from src.providers.openai import OpenAIClient
+from src.providers.openrouter import OpenRouterClient
+from src.settings import BaseConfig, ModelTier, get_settings
+from src.utils.aiohttp_adapter import AioHttpAdapterError
+
+logger = get_logger(__name__)
+
+# A request to one backend; the callback is set only for the call that may stream.
+ProviderCall = Callable[[VisionProvider, Optional[PartialCallback]], Awaitable[str]]
+
+
+def unavailable_for(provider: VisionProvider) -> float:
+    """Seconds until ``provider`` accepts calls again, for providers with a breaker."""
+
+    check = getattr(provider, "unavailable_for", None)
+    return check() if check is not None else 0.0
+
+
+class ProviderRouter:
+    """Sends each request to the backend with the best recent score, failing over.
+
+    The score is the mean of p50 and p95 latency (seconds), inflated by the
+    error rate, plus ``cost_weight`` seconds per unit of ``cost_per_request``.
+    Backends without samples go first so every backend gets measured, and
+    every ``explore_every``-th call starts with the least sampled backend so
+    a recovered or slower-but-idle backend is re-measured. A failed call is
+    retried on the next backend in score order. Single and multi-image calls,
+    and calls on the fast model tier, are measured separately.
+
+    With ``hedge_quantile`` set, a call still running after that latency
+    quantile of its backend gets a duplicate on the next backend (or the
+    same one when it is alone); the first answer wins and the other request
+    is cancelled. A cancelled primary still records its elapsed time as a
+    censored latency sample. Only the first request streams partial answers, so the
+    two do not interleave.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[VisionProvider],
+        *,
+        cost_weight: float = 1000.0,
+        error_penalty: float = 4.0,
+        window: int = 50,
+        explore_every: int = 20,
+        hedge_quantile: Optional[float] = None,
+        hedge_min_samples: int = 10,
+    ) -> None:
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider.")
+        self.providers = list(providers)
+        self.cost_weight = cost_weight
+        self.error_penalty = error_penalty
+        self.window = window
+        self.explore_every = explore_every
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.stats: dict[str, ProviderStats] = {}
+        self._calls = itertools.count(1)
+
+    @property
+    def name(self) -> str:
+        return "+".join(provider.name for provider in self.providers)
+
+    @property
+    def cost_per_request(self) -> float:
+        return min(provider.cost_per_request for provider in self.providers)
+
+    def _stats(self, provider: VisionProvider, kind: str) -> ProviderStats:
+        key = provider.name if kind == "image" else f"{provider.name}/{kind}"
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = ProviderStats(self.window)
+        return stats
+
+    def score(self, provider: VisionProvider, kind: str = "image") -> float:
+        stats = self._stats(provider, kind)
+        p50, p95 = stats.quantile(0.5), stats.quantile(0.95)
+        if p50 is None or p95 is None:
+            latency = 0.0 if stats.samples == 0 else float("inf")
+        else:
+            latency = (p50 + p95) / 2
+        penalty = 1.0 + self.error_penalty * stats.error_rate
+        return latency * penalty + self.cost_weight * provider.cost_per_request
+
+    def unavailable_for(self) -> float:
+        """Seconds until any backend accepts calls again (``0`` if one does now)."""
+
+        return min(unavailable_for(provider) for provider in self.providers)
+
+    def ranked(self, kind: str = "image") -> list[VisionProvider]:
+        # Backends behind an open circuit go last; they would only fail fast.
+        ranked = sorted(
+            self.providers,
+            key=lambda provider: (unavailable_for(provider) > 0, self.score(provider, kind)),
+        )
+        if self.explore_every and next(self._calls) % self.explore_every == 0:
+            least = min(ranked, key=lambda provider: self._stats(provider, kind).samples)
+            ranked.remove(least)
+            ranked.insert(0, least)
+        return ranked
+
+    def hedge_delay(self, provider: VisionProvider, kind: str = "image") -> Optional[float]:
+        if self.hedge_quantile is None:
+            return None
+        stats = self._stats(provider, kind)
+        if len(stats.latencies) < self.hedge_min_samples:
+            return None
+        return stats.quantile(self.hedge_quantile)
+
+    async def _timed(
+        self,
+        provider: VisionProvider,
+        kind: str,
+        call: ProviderCall,
+        on_partial: Optional[PartialCallback] = None,
+        *,
+        record_cancelled: bool = False,
+    ) -> str:
+        from src.services.metrics import PROVIDER_REQUEST_TIME
+
+        started = time.perf_counter()
+        try:
+            answer = await call(provider, on_partial)
+        except asyncio.CancelledError:
+            if record_cancelled:
+                elapsed = time.perf_counter() - started
+                self._stats(provider, kind).record_censored(elapsed)
+                PROVIDER_REQUEST_TIME.labels(provider=provider.name, outcome="cancelled").observe(
+                    elapsed
+                )
+            raise
+        except (AioHttpAdapterError, ProviderError):
+            elapsed = time.perf_counter() - started
+            self._stats(provider, kind).record(elapsed, ok=False)
+            PROVIDER_REQUEST_TIME.labels(provider=provider.name, outcome="error").observe(elapsed)
+            raise
+        elapsed = time.perf_counter() - started
+        self._stats(provider, kind).record(elapsed, ok=True)
+        PROVIDER_REQUEST_TIME.labels(provider=provider.name, outcome="ok").observe(elapsed)
+        return answer
+
+    async def _hedged(
+        self,
+        primary: VisionProvider,
+        backup: VisionProvider,
+        kind: str,
+        call: ProviderCall,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> str:
+        from src.services.metrics import PROVIDER_HEDGES_FIRED, PROVIDER_HEDGES_WON
+
+        # A primary that loses to its hedge has run past the hedge delay, so its
+        # elapsed time is a meaningful lower bound; without it the slow tail
+        # that triggered the hedge would vanish from the stats. A cancelled
+        # backup only ran briefly and says nothing about its latency.
+        first = asyncio.ensure_future(
+            self._timed(primary, kind, call, on_partial, record_cancelled=True)
+        )
+        second: Optional[asyncio.Future[str]] = None
+        pending: set[asyncio.Future[str]] = {first}
+        error: Optional[BaseException] = None
+        try:
+            delay = self.hedge_delay(primary, kind)
+            if delay is not None:
+                done, pending = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    PROVIDER_HEDGES_FIRED.labels(provider=backup.name).inc()
+                    logger.info(
+                        "%s slower than %.2fs, hedging on %s", primary.name, delay, backup.name
+                    )
+                    second = asyncio.ensure_future(self._timed(backup, kind, call))
+                    pending.add(second)
+                else:
+                    pending = done
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            PROVIDER_HEDGES_WON.labels(provider=backup.name).inc()
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _route(
+        self,
+        kind: str,
+        call: ProviderCall,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> str:
+        from src.services.metrics import PROVIDER_FAILOVERS
+
+        ranked = self.ranked(kind)
+        last_error: Optional[Exception] = None
+        for index, provider in enumerate(ranked):
+            if index:
+                PROVIDER_FAILOVERS.labels(provider=provider.name).inc()
+                logger.info("Failing over to %s", provider.name)
+            backup = ranked[index + 1] if index + 1 < len(ranked) else provider
+            try:
+                return await self._hedged(provider, backup, kind, call, on_partial)
+            except (AioHttpAdapterError, ProviderError) as exc:
+                logger.warning("Provider %s failed: %s", provider.name, exc)
+                last_error = exc
+        assert last_error is not None
+        raise last_error
+
+    async def describe_image(
+        self,
+        image_path: str,
+        *,
+        prompt: str,
+        on_partial: Optional[PartialCallback] = None,
+        tier: Optional[ModelTier] = None,
+    ) -> str:
+        def call(provider: VisionProvider, partial: Optional[PartialCallback]) -> Awaitable[str]:
+            # Only pass what is set, so backends without tiers or streaming still fit.
+            options: dict[str, Any] = {}
+            if tier is not None:
+                options["tier"] = tier
+            if partial is not None:
+                options["on_partial"] = partial
+            return provider.describe_image(image_path=image_path, prompt=prompt, **options)
+
+        return await self._route(_kind("image", tier), call, on_partial)
+
+    async def describe_images(
+        self,
+        image_paths: Sequence[str],
+        *,
+        prompt: str,
+        labels: Optional[Sequence[str]] = None,
+        tier: Optional[ModelTier] = None,
+    ) -> str:
+        options = {"tier": tier} if tier is not None else {}
+        return await self._route(
+            _kind("batch", tier),
+            lambda provider, _: provider.describe_images(
+                image_paths, prompt=prompt, labels=labels, **options
+            ),
+        )
+
+
+def _kind(kind: str, tier: Optional[ModelTier]) -> str:
+    return f"{kind}-fast" if tier == ModelTier.FAST else kind
+
+
+def _configured(name: str, settings: BaseConfig) -> Optional[VisionProvider]:
+    if name == "openrouter" and settings.OPENROUTER_API_KEY:
+        return OpenRouterClient()
+    if name == "openai" and settings.OPENAI_API_KEY:
+        return OpenAIClient()
+    if name == "ollama" and (settings.OLLAMA_BASE_URL or settings.OLLAMA_API_KEY):
+        return OllamaClient()
+    if name not in ("openrouter", "openai", "ollama"):
+        logger.warning("Unknown provider %r in PROVIDERS, ignoring", name)
+    return None
+
+
+def build_provider(settings: Optional[BaseConfig] = None) -> Optional[VisionProvider]:
+    """Backends from ``PROVIDERS`` that have credentials.
+
+    Several backends, or hedging on a single one, are wrapped in a
+    :class:`ProviderRouter`.
+    """
+
+    settings = settings or get_settings()
+    providers = [
+        provider
+        for provider in (_configured(name, settings) for name in settings.PROVIDERS)
+        if provider is not None
+    ]
+    if not providers:
+        return None
+    if len(providers) == 1 and not settings.PROVIDER_HEDGING_ENABLED:
+        return providers[0]
+    return ProviderRouter(
+        providers,
+        cost_weight=settings.PROVIDER_COST_WEIGHT,
+        hedge_quantile=(
+            settings.PROVIDER_HEDGE_QUANTILE if settings.PROVIDER_HEDGING_ENABLED else None
+        ),
+        hedge_min_samples=settings.PROVIDER_HEDGE_MIN_SAMPLES,
+    )
+
+
+_shared_provider: Optional[VisionProvider] = None
+_shared_lock = threading.Lock()
+
+
+def get_provider() -> Optional[VisionProvider]:
+    """Process-wide provider, so latency statistics outlive a single task."""
+
+    global _shared_provider
+    with _shared_lock:
+        if _shared_provider is None:
+            _shared_provider = build_provider()
+        return _shared_provider
+
+
+__all__ = [
+    "ProviderRouter",
+    "ProviderStats",
+    "build_provider",
+    "get_provider",
+    "unavailable_for",
+]
@@ -1,5 +1,17 @@
 from .errors import ErrorCode, ERROR_MESSAGES, describe_error
-from .videos import AnalyzeResponse, ErrorResponse, VideoStatusResponse
+from .videos import (
+    AnalyzeResponse,
+    ErrorResponse,
+    FrameSearchHit,
+    FrameSearchResponse,
+    PersonTrackResponse,
+    TaskLookupRequest,
+    TaskLookupResponse,
+    TaskPageResponse,
+    TaskSummaryResponse,
+    TriggerEventResponse,
+    VideoStatusResponse,
+)
 
 __all__ = (
     "ErrorCode",
@@ -7,5 +19,13 @@ __all__ = (
     "describe_error",
     "AnalyzeResponse",
     "ErrorResponse",
+    "FrameSearchHit",
+    "FrameSearchResponse",
+    "PersonTrackResponse",
+    "TaskLookupRequest",
+    "TaskLookupResponse",
+    "TaskPageResponse",
+    "TaskSummaryResponse",
+    "TriggerEventResponse",
     "VideoStatusResponse",
 )
@@ -13,6 +13,7 @@ class ErrorCode(str, Enum):
     INVALID_REQUEST = "E050"
     VIDEO_NOT_FOUND = "E100"
     VIDEO_DECODING_FAILED = "E101"
+    VIDEO_PROCESSING_TIMEOUT = "E102"
     AI_PROVIDER_UNAVAILABLE = "E200"
     AI_PROVIDER_TIMEOUT = "E201"
     INVALID_TRIGGER_CONFIG = "E300"
@@ -46,6 +47,11 @@ ERROR_MESSAGES: Dict[ErrorCode, ErrorDescriptor] = {
         message="Video decoding or preprocessing failed.",
         http_status=HTTPStatus.UNPROCESSABLE_ENTITY,
     ),
+    ErrorCode.VIDEO_PROCESSING_TIMEOUT: ErrorDescriptor(
+        code=ErrorCode.VIDEO_PROCESSING_TIMEOUT,
+        message="Video processing did not finish in time.",
+        http_status=HTTPStatus.GATEWAY_TIMEOUT,
+    ),
     ErrorCode.AI_PROVIDER_UNAVAILABLE: ErrorDescriptor(
         code=ErrorCode.AI_PROVIDER_UNAVAILABLE,
         message="AI provider is unavailable or misconfigured.",
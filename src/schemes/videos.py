@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.models import VideoStatus
 from src.schemes.errors import ErrorCode
@@ -14,7 +14,26 @@ class AnalyzeResponse(BaseModel):
     status: VideoStatus
 
 
-class VideoStatusResponse(BaseModel):
+class PersonTrackResponse(BaseModel):
+    track_index: int
+    start_seconds: float
+    end_seconds: float
+    hits: int
+
+    class Config:
+        from_attributes = True
+
+
+class TriggerEventResponse(BaseModel):
+    rule: str
+    timestamp_seconds: float
+    detail: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class TaskSummaryResponse(BaseModel):
     id: uuid.UUID
     status: VideoStatus
     original_filename: str
@@ -24,11 +43,51 @@ class VideoStatusResponse(BaseModel):
     created_at: datetime | None = None
     updated_at: datetime | None = None
     error_message: str | None = None
+    profile: str | None = None
+    analysis_stage: str | None = None
+    video_codec: str | None = None
+    width: int | None = None
+    height: int | None = None
+    fps: float | None = None
+    duration_seconds: float | None = None
+    total_frames: int | None = None
 
     class Config:
         from_attributes = True
 
 
+class VideoStatusResponse(TaskSummaryResponse):
+    tracks: list[PersonTrackResponse] = []
+    trigger_events: list[TriggerEventResponse] = []
+
+
+class TaskPageResponse(BaseModel):
+    items: list[TaskSummaryResponse]
+    next_cursor: str | None = None
+
+
+class TaskLookupRequest(BaseModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=1000)
+
+
+class TaskLookupResponse(BaseModel):
+    tasks: list[VideoStatusResponse]
+    missing: list[uuid.UUID] = []
+
+
+class FrameSearchHit(BaseModel):
+    task_id: uuid.UUID
+    timestamp_seconds: float
+    prompt: str | None = None
+    text: str
+    people_count: int | None = None
+    rank: float
+
+
+class FrameSearchResponse(BaseModel):
+    items: list[FrameSearchHit]
+
+
 class ErrorResponse(BaseModel):
     code: ErrorCode
     detail: str
@@ -0,0 +1,506 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Mapping, Optional, Protocol, Sequence
+
+from pydantic import BaseModel, Field, ValidationError
+
+from src.logger import get_logger
+from src.providers.base import PartialCallback, VisionProvider
+from src.schemes import ErrorCode
+from src.services.metrics import MODEL_ESCALATIONS
+from src.settings import ModelTier
+from src.utils.aiohttp_adapter import AioHttpAdapterError
+
+logger = get_logger(__name__)
+
+
+def parse_people_count(text: str) -> int:
+    match = re.search(r"(\d+)", text)
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+def count_is_ambiguous(text: str) -> bool:
+    """A count answer is clear only when it holds exactly one number."""
+
+    return len(set(re.findall(r"\d+", text))) != 1
+
+
+_REFUSAL_RE = re.compile(
+    r"не могу|не удаётся|не удается|невозможно|cannot|can't|unable|sorry",
+    re.IGNORECASE,
+)
+
+
+def summary_is_ambiguous(text: str) -> bool:
+    text = text.strip()
+    return not text or bool(_REFUSAL_RE.search(text))
+
+
+def resolve_model_tiers(
+    policy: Mapping[str, ModelTier],
+    profile: Optional[str] = None,
+) -> dict[str, ModelTier]:
+    """Tier per prompt (``summary``, ``people``, ``combined``, ``batch``) for a profile.
+
+    ``<profile>.<prompt>`` entries of ``policy`` override plain ``<prompt>`` ones.
+    """
+
+    tiers = {key: tier for key, tier in policy.items() if "." not in key}
+    if profile:
+        prefix = f"{profile}."
+        tiers.update(
+            {key[len(prefix):]: tier for key, tier in policy.items() if key.startswith(prefix)}
+        )
+    return tiers
+
+
+_PEOPLE_FIELD_RE = re.compile(r"people[_ ]?count\"?\s*[:=]\s*\"?(\d+)", re.IGNORECASE)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def _load_json_object(text: str) -> dict:
+    match = _JSON_OBJECT_RE.search(text)
+    if not match:
+        return {}
+    try:
+        loaded = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    return loaded if isinstance(loaded, dict) else {}
+
+
+class CombinedAnswer(BaseModel):
+    summary: str = Field(min_length=1)
+    people_count: int = Field(ge=0)
+
+
+def parse_combined_response(text: str) -> tuple[Optional[str], Optional[int]]:
+    """Parse a combined ``{summary, people_count}`` answer field by field.
+
+    Fields that are missing or fail validation come back as ``None``; the
+    count additionally falls back to a ``people_count: N`` regex for answers
+    that are not valid JSON.
+    """
+
+    data = _load_json_object(text)
+    try:
+        answer = CombinedAnswer.model_validate(data)
+        return answer.summary.strip(), answer.people_count
+    except ValidationError as exc:
+        failed = {error["loc"][0] for error in exc.errors() if error["loc"]}
+
+    summary: Optional[str] = None
+    if "summary" not in failed:
+        summary = str(data["summary"]).strip()
+    people: Optional[int] = None
+    if "people_count" not in failed:
+        people = int(data["people_count"])
+    else:
+        count_match = _PEOPLE_FIELD_RE.search(text)
+        if count_match:
+            people = int(count_match.group(1))
+    return summary, people
+
+
+class BatchFrameAnswer(BaseModel):
+    index: int = Field(ge=1)
+    summary: str = Field(min_length=1)
+    people_count: Optional[int] = Field(default=None, ge=0)
+
+
+@dataclass
+class BatchAnswer:
+    frames: dict[int, BatchFrameAnswer]
+    summary: Optional[str] = None
+    unique_people: Optional[int] = None
+
+
+def parse_batch_response(text: str) -> BatchAnswer:
+    """Parse a multi-image answer; invalid frame entries are simply left out."""
+
+    data = _load_json_object(text)
+    frames: dict[int, BatchFrameAnswer] = {}
+    items = data.get("frames")
+    for item in items if isinstance(items, list) else []:
+        try:
+            answer = BatchFrameAnswer.model_validate(item)
+        except ValidationError:
+            continue
+        frames[answer.index] = answer
+
+    summary = data.get("summary")
+    unique_people = data.get("unique_people")
+    return BatchAnswer(
+        frames=frames,
+        summary=(summary.strip() or None) if isinstance(summary, str) else None,
+        unique_people=(
+            unique_people if isinstance(unique_people, int) and unique_people >= 0 else None
+        ),
+    )
+
+
+def estimate_image_payload(frame_path: Path) -> int:
+    """Size of the base64 data URI the provider client will send for a frame."""
+
+    try:
+        size = frame_path.stat().st_size
+    except OSError:
+        return 0
+    return (size + 2) // 3 * 4
+
+
+def plan_batches(
+    frames: Sequence[tuple[Path, float]],
+    *,
+    max_images: int,
+    max_payload_bytes: int,
+) -> list[list[tuple[Path, float]]]:
+    """Split frames, in order, into batches that fit the image and payload budget."""
+
+    batches: list[list[tuple[Path, float]]] = []
+    current: list[tuple[Path, float]] = []
+    current_bytes = 0
+    for frame in frames:
+        size = estimate_image_payload(frame[0])
+        if current and (
+            len(current) >= max_images or current_bytes + size > max_payload_bytes
+        ):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(frame)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+@dataclass
+class BatchOptions:
+    prompt: str
+    max_images: int = 8
+    max_payload_bytes: int = 4 * 1024 * 1024
+
+
+@dataclass
+class BatchOverview:
+    start: float
+    end: float
+    frames: int
+    summary: Optional[str] = None
+    unique_people: Optional[int] = None
+
+
+@dataclass
+class FrameResult:
+    frame_path: Path
+    timestamp: float
+    summary: str
+    people: Optional[int] = None
+    # Prompt that produced ``summary`` ("summary", "combined" or "batch") and
+    # the wall time spent on the frame; a batch's frames share its request time.
+    prompt: Optional[str] = None
+    latency: Optional[float] = None
+
+
+class AnalysisEvents(Protocol):
+    """Receives frame results, and optionally streamed answers, as they arrive."""
+
+    @property
+    def streaming(self) -> bool:
+        ...
+
+    def partial(self, timestamp: float, text: str) -> None:
+        ...
+
+    def frame(self, result: FrameResult) -> None:
+        ...
+
+
+class FrameAnalyzer:
+    """Runs the summary and people-count prompts for frames.
+
+    Both prompts of a frame, and all frames passed to :meth:`analyze_many`,
+    are sent concurrently; at most ``concurrency`` provider requests are in
+    flight at once. With ``combined_prompt`` a frame costs a single request
+    asking for JSON; only the part that could not be parsed is re-requested
+    with its own prompt. With ``batch`` :meth:`analyze_many` packs several
+    frames into one multi-image request and keeps the overall answer of each
+    request in ``batch_overviews``; frames missing from that answer fall back
+    to the single-frame path.
+
+    ``events`` is told about every finished frame; while it is ``streaming``
+    the summary (or combined) answer is streamed to it as it is generated.
+
+    ``tiers`` picks the model tier per prompt (see :func:`resolve_model_tiers`).
+    With ``escalate`` an ambiguous answer from the fast tier, such as a count
+    without exactly one number or an unparsable combined answer, is asked
+    again on the strong tier.
+    """
+
+    def __init__(
+        self,
+        client: VisionProvider,
+        *,
+        summary_prompt: str,
+        people_prompt: str,
+        count_people: bool = True,
+        count_timeout_retries: int = 2,
+        count_retry_delay: float = 2.0,
+        concurrency: int = 4,
+        combined_prompt: Optional[str] = None,
+        batch: Optional[BatchOptions] = None,
+        events: Optional[AnalysisEvents] = None,
+        tiers: Optional[Mapping[str, ModelTier]] = None,
+        escalate: bool = True,
+    ) -> None:
+        self.client = client
+        self.summary_prompt = summary_prompt
+        self.people_prompt = people_prompt
+        self.count_people = count_people
+        self.count_timeout_retries = count_timeout_retries
+        self.count_retry_delay = count_retry_delay
+        self.combined_prompt = combined_prompt
+        self.batch = batch
+        self.batch_overviews: list[BatchOverview] = []
+        self.events = events
+        self.tiers = dict(tiers or {})
+        self.escalate = escalate
+        self._slots = asyncio.Semaphore(max(concurrency, 1))
+
+    async def analyze(self, frame_path: Path, timestamp: float) -> FrameResult:
+        started = time.perf_counter()
+        on_partial = self._partial_callback(timestamp)
+        prompt = "summary"
+        if self.count_people and self.combined_prompt:
+            prompt = "combined"
+            summary, people = await self._analyze_combined(frame_path, on_partial)
+        elif self.count_people:
+            summary, people = await asyncio.gather(
+                self._summarize(frame_path, on_partial),
+                self._count_people(frame_path),
+            )
+        else:
+            summary, people = await self._summarize(frame_path, on_partial), None
+        return self._emit(
+            FrameResult(
+                frame_path=frame_path,
+                timestamp=timestamp,
+                summary=summary,
+                people=people,
+                prompt=prompt,
+                latency=time.perf_counter() - started,
+            )
+        )
+
+    def _partial_callback(self, timestamp: float) -> Optional[PartialCallback]:
+        events = self.events
+        if events is None or not events.streaming:
+            return None
+        return lambda text: events.partial(timestamp, text)
+
+    def _emit(self, result: FrameResult) -> FrameResult:
+        if self.events is not None:
+            self.events.frame(result)
+        return result
+
+    async def analyze_many(self, frames: Sequence[tuple[Path, float]]) -> list[FrameResult]:
+        """Analyze all frames concurrently; results keep the order of ``frames``."""
+
+        if self.batch is not None and len(frames) > 1:
+            batches = plan_batches(
+                frames,
+                max_images=self.batch.max_images,
+                max_payload_bytes=self.batch.max_payload_bytes,
+            )
+            grouped = await asyncio.gather(*(self._analyze_batch(batch) for batch in batches))
+            return [result for group in grouped for result in group]
+
+        return list(
+            await asyncio.gather(
+                *(self.analyze(frame_path, timestamp) for frame_path, timestamp in frames)
+            )
+        )
+
+    async def _analyze_batch(self, frames: Sequence[tuple[Path, float]]) -> list[FrameResult]:
+        labels = [
+            f"Кадр {index} ({timestamp:.1f} с)"
+            for index, (_, timestamp) in enumerate(frames, start=1)
+        ]
+        started = time.perf_counter()
+        async with self._slots:
+            text = await self.client.describe_images(
+                [str(frame_path) for frame_path, _ in frames],
+                prompt=self.batch.prompt,
+                labels=labels,
+                **({"tier": self.tiers["batch"]} if "batch" in self.tiers else {}),
+            )
+        latency = time.perf_counter() - started
+        answer = parse_batch_response(text)
+        self.batch_overviews.append(
+            BatchOverview(
+                start=frames[0][1],
+                end=frames[-1][1],
+                frames=len(frames),
+                summary=answer.summary,
+                unique_people=answer.unique_people if self.count_people else None,
+            )
+        )
+
+        async def resolve(index: int, frame_path: Path, timestamp: float) -> FrameResult:
+            entry = answer.frames.get(index)
+            if entry is None:
+                logger.info("Batch answer missing frame %s, describing it alone", index)
+                return await self.analyze(frame_path, timestamp)
+            people = entry.people_count
+            if self.count_people and people is None:
+                people = await self._count_people(frame_path)
+            return self._emit(
+                FrameResult(
+                    frame_path=frame_path,
+                    timestamp=timestamp,
+                    summary=entry.summary.strip(),
+                    people=people if self.count_people else None,
+                    prompt="batch",
+                    latency=latency,
+                )
+            )
+
+        return list(
+            await asyncio.gather(
+                *(
+                    resolve(index, frame_path, timestamp)
+                    for index, (frame_path, timestamp) in enumerate(frames, start=1)
+                )
+            )
+        )
+
+    async def _analyze_combined(
+        self,
+        frame_path: Path,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> tuple[str, int]:
+        answer = await self._ask(
+            frame_path,
+            self.combined_prompt,
+            "combined",
+            lambda text: None in parse_combined_response(text),
+            on_partial,
+        )
+        summary, people = parse_combined_response(answer)
+
+        retries = {}
+        if summary is None:
+            retries["summary"] = self._summarize(frame_path)
+        if people is None:
+            retries["people"] = self._count_people(frame_path)
+        if retries:
+            logger.info(
+                "Combined answer for frame %s missing %s, re-requesting",
+                frame_path.name,
+                ", ".join(retries),
+            )
+            values = dict(zip(retries, await asyncio.gather(*retries.values())))
+            summary = values.get("summary", summary)
+            people = values.get("people", people)
+        return summary, people
+
+    async def _summarize(
+        self,
+        frame_path: Path,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> str:
+        return await self._ask(
+            frame_path, self.summary_prompt, "summary", summary_is_ambiguous, on_partial
+        )
+
+    async def _ask(
+        self,
+        frame_path: Path,
+        prompt: str,
+        kind: str,
+        ambiguous: Callable[[str], bool],
+        on_partial: Optional[PartialCallback] = None,
+    ) -> str:
+        answer = await self._describe(frame_path, prompt, kind, on_partial)
+        if self.escalate and self.tiers.get(kind) == ModelTier.FAST and ambiguous(answer):
+            MODEL_ESCALATIONS.labels(prompt=kind).inc()
+            logger.info(
+                "Ambiguous %s answer for frame %s on the fast model, escalating",
+                kind,
+                frame_path.name,
+            )
+            answer = await self._describe(
+                frame_path, prompt, kind, on_partial, tier=ModelTier.STRONG
+            )
+        return answer
+
+    async def _describe(
+        self,
+        frame_path: Path,
+        prompt: str,
+        kind: str,
+        on_partial: Optional[PartialCallback] = None,
+        *,
+        tier: Optional[ModelTier] = None,
+    ) -> str:
+        # Only pass what is set, so providers without tiers or streaming still fit.
+        options: dict = {}
+        tier = tier or self.tiers.get(kind)
+        if tier is not None:
+            options["tier"] = tier
+        if on_partial is not None:
+            options["on_partial"] = on_partial
+        async with self._slots:
+            return await self.client.describe_image(
+                image_path=str(frame_path), prompt=prompt, **options
+            )
+
+    async def _count_people(self, frame_path: Path) -> int:
+        retry_attempts = 0
+        while True:
+            try:
+                count_response = await self._ask(
+                    frame_path, self.people_prompt, "people", count_is_ambiguous
+                )
+                return parse_people_count(count_response)
+            except AioHttpAdapterError as count_exc:
+                retry_attempts += 1
+                if (
+                    retry_attempts > self.count_timeout_retries
+                    or count_exc.code != ErrorCode.AI_PROVIDER_TIMEOUT
+                ):
+                    raise
+                logger.info(
+                    "Retrying people count for frame %s due to timeout (%s)",
+                    frame_path.name,
+                    retry_attempts,
+                )
+                await asyncio.sleep(self.count_retry_delay)
+
+
+__all__ = [
+    "AnalysisEvents",
+    "BatchAnswer",
+    "BatchFrameAnswer",
+    "BatchOptions",
+    "BatchOverview",
+    "CombinedAnswer",
+    "FrameAnalyzer",
+    "FrameResult",
+    "count_is_ambiguous",
+    "estimate_image_payload",
+    "parse_batch_response",
+    "parse_combined_response",
+    "parse_people_count",
+    "plan_batches",
+    "resolve_model_tiers",
+    "summary_is_ambiguous",
+]
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import stat
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from src.logger import get_logger
+from src.services.frame_analysis import FrameAnalyzer, FrameResult
+from src.services.motion import motion_mask, prepare_gray, save_frame
+from src.services.triggers import MOTION_SCORE_THRESHOLD, TriggerEngine
+from src.utils.ffmpeg_helper import FFmpegVideoHelper
+
+logger = get_logger(__name__)
+
+READ_GRACE_SECONDS = 10.0
+
+
+@dataclass
+class LiveHandle:
+    stop_event: threading.Event = field(default_factory=threading.Event)
+    # ffmpeg's pid, which is also its process group; set while the stream runs.
+    pid: Optional[int] = None
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.pid is not None:
+            try:
+                os.killpg(self.pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+
+_handles: dict[uuid.UUID, LiveHandle] = {}
+_handles_lock = threading.Lock()
+
+
+def register_live_session(video_id: uuid.UUID) -> LiveHandle:
+    with _handles_lock:
+        handle = _handles.setdefault(video_id, LiveHandle())
+    return handle
+
+
+def unregister_live_session(video_id: uuid.UUID) -> None:
+    with _handles_lock:
+        _handles.pop(video_id, None)
+
+
+def request_live_stop(video_id: uuid.UUID) -> bool:
+    with _handles_lock:
+        handle = _handles.get(video_id)
+    if handle is None:
+        return False
+    handle.stop()
+    return True
+
+
+@dataclass
+class LiveOptions:
+    sample_fps: float = 2.0
+    width: int = 640
+    height: int = 360
+    window_seconds: float = 10.0
+    idle_timeout: float = 30.0
+
+
+@dataclass
+class LiveWindow:
+    index: int
+    start: float
+    end: float
+    frames: int
+    motion: float
+    result: Optional[FrameResult] = None
+
+
+WindowCallback = Callable[[LiveWindow], Awaitable[None]]
+
+
+class LiveFrameReader:
+    """Reads fixed-size BGR24 frames from an ffmpeg rawvideo pipe.
+
+    ``timeout`` bounds the wait for one frame, so a decoder that hangs without
+    exiting ends the stream instead of stalling the worker.
+    """
+
+    def __init__(
+        self,
+        stream: asyncio.StreamReader,
+        *,
+        width: int,
+        height: int,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.timeout = timeout
+        self.frame_bytes = width * height * 3
+
+    async def read(self) -> Optional[np.ndarray]:
+        try:
+            data = await asyncio.wait_for(self.stream.readexactly(self.frame_bytes), self.timeout)
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.TimeoutError:
+            logger.warning("No frame from ffmpeg for %gs, closing the stream", self.timeout)
+            return None
+        return np.frombuffer(data, dtype=np.uint8).reshape((self.height, self.width, 3))
+
+
+class LiveAnalysis:
+    """Tail a growing file or FIFO and analyze it window by window.
+
+    Memory stays bounded: only the previous grayscale frame and the
+    highest-motion frame of the current window are kept. Each finished window
+    is described by the provider (when it contains motion), trigger rules are
+    evaluated and re-armed, and ``on_window`` is awaited with the result;
+    windows are not kept afterwards, so the callback is where they are stored.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        *,
+        options: LiveOptions,
+        frame_dir: Path,
+        handle: LiveHandle,
+        analyzer: Optional[FrameAnalyzer] = None,
+        triggers: Optional[TriggerEngine] = None,
+        on_window: Optional[WindowCallback] = None,
+        helper: Optional[FFmpegVideoHelper] = None,
+    ) -> None:
+        self.source = source
+        self.options = options
+        self.frame_dir = frame_dir
+        self.handle = handle
+        self.analyzer = analyzer
+        self.triggers = triggers
+        self.on_window = on_window
+        self.helper = helper or FFmpegVideoHelper()
+        self.frames_read = 0
+        self.windows_emitted = 0
+
+    @property
+    def stream_seconds(self) -> float:
+        return self.frames_read / self.options.sample_fps
+
+    def _is_fifo(self) -> bool:
+        return stat.S_ISFIFO(Path(self.source).stat().st_mode)
+
+    async def _emit(
+        self,
+        index: int,
+        start: float,
+        frames: int,
+        best: Optional[tuple[float, float, np.ndarray]],
+    ) -> None:
+        motion = best[0] if best else 0.0
+        window = LiveWindow(
+            index=index,
+            start=start,
+            end=self.stream_seconds,
+            frames=frames,
+            motion=motion,
+        )
+        if best is not None and self.analyzer is not None and motion > MOTION_SCORE_THRESHOLD:
+            _, timestamp, frame = best
+            frame_path = await asyncio.to_thread(save_frame, frame, self.frame_dir)
+            try:
+                window.result = await self.analyzer.analyze(frame_path, timestamp)
+            finally:
+                frame_path.unlink(missing_ok=True)
+            if self.triggers is not None:
+                self.triggers.observe_summary(timestamp, window.result.summary)
+                if window.result.people is not None:
+                    self.triggers.observe_people(timestamp, window.result.people)
+
+        self.windows_emitted = index
+        logger.info(
+            "Live window %s [%.1fs-%.1fs]: %s frames, motion %.2f",
+            index,
+            window.start,
+            window.end,
+            frames,
+            motion,
+        )
+        if self.on_window is not None:
+            await self.on_window(window)
+        if self.triggers is not None:
+            self.triggers.rearm()
+
+    async def run(self) -> int:
+        """Analyze the stream until it ends or is stopped; returns the window count."""
+
+        options = self.options
+        async with self.helper.aopen_frame_stream(
+            self.source,
+            width=options.width,
+            height=options.height,
+            fps=options.sample_fps,
+            follow=not self._is_fifo(),
+            idle_timeout=options.idle_timeout,
+        ) as process:
+            assert process.stdout is not None
+            self.handle.pid = process.pid
+            reader = LiveFrameReader(
+                process.stdout,
+                width=options.width,
+                height=options.height,
+                # ffmpeg's own rw_timeout normally ends an idle stream first.
+                timeout=options.idle_timeout + READ_GRACE_SECONDS,
+            )
+            try:
+                await self._consume(reader)
+            finally:
+                self.handle.pid = None
+                logger.info("Live stream %s closed after %.1fs", self.source, self.stream_seconds)
+        return self.windows_emitted
+
+    async def _consume(self, reader: LiveFrameReader) -> None:
+        options = self.options
+        prev_gray: Optional[np.ndarray] = None
+        window_index = 0
+        window_start = 0.0
+        window_frames = 0
+        best: Optional[tuple[float, float, np.ndarray]] = None
+
+        while not self.handle.stop_event.is_set():
+            frame = await reader.read()
+            if frame is None:
+                break
+            self.frames_read += 1
+            window_frames += 1
+            timestamp = self.stream_seconds
+
+            gray = prepare_gray(frame)
+            if prev_gray is not None:
+                mask = motion_mask(prev_gray, gray)
+                score = float(mask.mean())
+                if best is None or score > best[0]:
+                    best = (score, timestamp, frame.copy())
+                if self.triggers is not None and self.triggers.wants_motion:
+                    self.triggers.observe_motion(timestamp, mask)
+            prev_gray = gray
+
+            if timestamp - window_start >= options.window_seconds:
+                window_index += 1
+                await self._emit(window_index, window_start, window_frames, best)
+                window_start = timestamp
+                window_frames = 0
+                best = None
+
+        if window_frames:
+            window_index += 1
+            await self._emit(window_index, window_start, window_frames, best)
+
+
+__all__ = [
+    "LiveAnalysis",
+    "LiveFrameReader",
+    "LiveHandle",
+    "LiveOptions",
+    "LiveWindow",
+    "register_live_session",
+    "request_live_stop",
+    "unregister_live_session",
+]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from src.logger import get_logger
+from src.models import Video
+from src.schemes import ErrorCode
+from src.utils.ffmpeg_helper import FFmpegError, FFmpegVideoHelper
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    codec: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+    fps: float
+    duration: float
+    total_frames: int
+
+    @classmethod
+    def from_video(cls, video: Video) -> Optional["MediaInfo"]:
+        """Metadata stored at ingest, or ``None`` for rows created without a probe."""
+
+        if not video.fps or video.total_frames is None or video.duration_seconds is None:
+            return None
+        return cls(
+            codec=video.video_codec,
+            width=video.width,
+            height=video.height,
+            fps=video.fps,
+            duration=video.duration_seconds,
+            total_frames=video.total_frames,
+        )
+
+    def apply_to(self, video: Video) -> None:
+        video.video_codec = self.codec
+        video.width = self.width
+        video.height = self.height
+        video.fps = self.fps
+        video.duration_seconds = self.duration
+        video.total_frames = self.total_frames
+
+
+def _parse_rate(value: Optional[str]) -> float:
+    if not value:
+        return 0.0
+    numerator, _, denominator = value.partition("/")
+    try:
+        if denominator:
+            return float(numerator) / float(denominator) if float(denominator) else 0.0
+        return float(numerator)
+    except ValueError:
+        return 0.0
+
+
+def _parse_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_probe(probe: dict[str, Any]) -> MediaInfo:
+    """Build :class:`MediaInfo` from ffprobe JSON, rejecting files without video."""
+
+    stream = next(
+        (item for item in probe.get("streams", []) if item.get("codec_type") == "video"),
+        None,
+    )
+    if stream is None:
+        raise FFmpegError(ErrorCode.VIDEO_DECODING_FAILED, "No video stream found.")
+
+    fps = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+    duration = _parse_float(stream.get("duration")) or _parse_float(
+        probe.get("format", {}).get("duration")
+    )
+    total_frames = int(_parse_float(stream.get("nb_frames"))) or int(round(duration * fps))
+    if fps <= 0 or duration <= 0:
+        raise FFmpegError(
+            ErrorCode.VIDEO_DECODING_FAILED,
+            "Video stream has no usable frame rate or duration.",
+        )
+
+    return MediaInfo(
+        codec=stream.get("codec_name"),
+        width=stream.get("width"),
+        height=stream.get("height"),
+        fps=fps,
+        duration=duration,
+        total_frames=total_frames,
+    )
+
+
+async def probe_media(
+    video_path: str,
+    *,
+    helper: Optional[FFmpegVideoHelper] = None,
+) -> MediaInfo:
+    helper = helper or FFmpegVideoHelper()
+    info = parse_probe(await helper.aprobe(video_path))
+    logger.info(
+        "Probed %s: %s %sx%s, %.2f fps, %.1fs",
+        video_path,
+        info.codec,
+        info.width,
+        info.height,
+        info.fps,
+        info.duration,
+    )
+    return info
+
+
+__all__ = ["MediaInfo", "parse_probe", "probe_media"]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram, CollectorRegistry
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry
 
 REGISTRY = CollectorRegistry()
 
@@ -25,6 +25,179 @@ PROCESSING_TIME = Histogram(
     registry=REGISTRY,
 )
 
+HTTP_CONNECTIONS_CREATED = Counter(
+    "tsos_http_connections_created_total",
+    "New TCP connections opened by the shared HTTP pool",
+    registry=REGISTRY,
+)
+HTTP_CONNECTIONS_REUSED = Counter(
+    "tsos_http_connections_reused_total",
+    "Requests served over a kept-alive pooled connection",
+    registry=REGISTRY,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "tsos_http_requests_in_flight",
+    "Outgoing HTTP requests currently holding a pool connection",
+    registry=REGISTRY,
+)
+HTTP_REQUEST_TIME = Histogram(
+    "tsos_http_request_seconds",
+    "Outgoing HTTP request latency in seconds",
+    registry=REGISTRY,
+)
+
+RATE_LIMIT_WAIT_TIME = Histogram(
+    "tsos_rate_limit_wait_seconds",
+    "Time a provider call waited for the shared rate limiter",
+    ["key"],
+    registry=REGISTRY,
+)
+RATE_LIMIT_THROTTLED = Counter(
+    "tsos_rate_limit_throttled_total",
+    "Provider responses with HTTP 429 that blocked the shared limiter",
+    ["key"],
+    registry=REGISTRY,
+)
+
+RESPONSE_CACHE_HITS = Counter(
+    "tsos_response_cache_hits_total",
+    "Provider answers served from the response cache",
+    ["tier"],
+    registry=REGISTRY,
+)
+RESPONSE_CACHE_MISSES = Counter(
+    "tsos_response_cache_misses_total",
+    "Provider requests not found in the response cache",
+    registry=REGISTRY,
+)
+
+PROVIDER_REQUEST_TIME = Histogram(
+    "tsos_provider_request_seconds",
+    "Provider call latency as seen by the router, including retries",
+    ["provider", "outcome"],
+    registry=REGISTRY,
+)
+PROVIDER_FAILOVERS = Counter(
+    "tsos_provider_failovers_total",
+    "Calls retried on this provider after the preferred one failed",
+    ["provider"],
+    registry=REGISTRY,
+)
+
+PROVIDER_HEDGES_FIRED = Counter(
+    "tsos_provider_hedges_fired_total",
+    "Duplicate requests sent because the first one outlived the hedge delay",
+    ["provider"],
+    registry=REGISTRY,
+)
+PROVIDER_HEDGES_WON = Counter(
+    "tsos_provider_hedges_won_total",
+    "Hedged duplicates that answered before the original request",
+    ["provider"],
+    registry=REGISTRY,
+)
+
+PROVIDER_CIRCUIT_STATE = Gauge(
+    "tsos_provider_circuit_state",
+    "Provider circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["provider"],
+    registry=REGISTRY,
+)
+PROVIDER_CIRCUIT_REJECTED = Counter(
+    "tsos_provider_circuit_rejected_total",
+    "Provider calls refused immediately because the circuit was open",
+    ["provider"],
+    registry=REGISTRY,
+)
+VIDEOS_PARKED = Counter(
+    "tsos_videos_parked_total",
+    "Tasks put back to wait for a provider circuit to close",
+    registry=REGISTRY,
+)
+PROVIDER_FIRST_TOKEN_TIME = Histogram(
+    "tsos_provider_first_token_seconds",
+    "Time from sending a streamed provider request to its first token",
+    ["provider"],
+    registry=REGISTRY,
+)
+TASK_EVENT_SUBSCRIBERS = Gauge(
+    "tsos_task_event_subscribers",
+    "Clients connected to task event streams",
+    registry=REGISTRY,
+)
+TASK_EVENTS_DROPPED = Counter(
+    "tsos_task_events_dropped_total",
+    "Task events not delivered because a subscriber fell behind",
+    registry=REGISTRY,
+)
+PROVIDER_MODEL_REQUEST_TIME = Histogram(
+    "tsos_provider_model_request_seconds",
+    "Latency of successful provider requests per model",
+    ["provider", "model"],
+    registry=REGISTRY,
+)
+PROVIDER_TOKENS = Counter(
+    "tsos_provider_tokens_total",
+    "Tokens reported by providers per model",
+    ["provider", "model", "kind"],
+    registry=REGISTRY,
+)
+MODEL_ESCALATIONS = Counter(
+    "tsos_model_escalations_total",
+    "Fast-tier answers judged ambiguous and re-asked on the strong model",
+    ["prompt"],
+    registry=REGISTRY,
+)
+TASK_STATUS_NOTIFICATIONS = Counter(
+    "tsos_task_status_notifications_total",
+    "Task status changes received over LISTEN/NOTIFY",
+    registry=REGISTRY,
+)
+TASK_STATUS_WAITERS = Gauge(
+    "tsos_task_status_waiters",
+    "Long-poll requests waiting for a task status change",
+    registry=REGISTRY,
+)
+WEBHOOK_DELIVERY_LAG = Histogram(
+    "tsos_webhook_delivery_lag_seconds",
+    "Time from a webhook event being queued to its successful delivery",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600, 14400),
+    registry=REGISTRY,
+)
+WEBHOOK_DELIVERIES = Counter(
+    "tsos_webhook_deliveries_total",
+    "Webhook delivery attempts by outcome (delivered, retry, failed)",
+    ["outcome"],
+    registry=REGISTRY,
+)
+WEBHOOK_BATCH_EVENTS = Histogram(
+    "tsos_webhook_batch_events",
+    "Events sent per webhook POST",
+    buckets=(1, 2, 5, 10, 25, 50, 100),
+    registry=REGISTRY,
+)
+RETENTION_PARTITIONS_DROPPED = Counter(
+    "tsos_retention_partitions_dropped_total",
+    "Expired monthly partitions dropped by the retention job",
+    ["table"],
+    registry=REGISTRY,
+)
+RETENTION_VIDEOS_DELETED = Counter(
+    "tsos_retention_videos_deleted_total",
+    "Finished tasks deleted by the retention job",
+    registry=REGISTRY,
+)
+RETENTION_FILES_DELETED = Counter(
+    "tsos_retention_files_deleted_total",
+    "Uploads, proxies and leftover frames deleted by the retention job",
+    registry=REGISTRY,
+)
+RETENTION_BYTES_FREED = Counter(
+    "tsos_retention_bytes_freed_total",
+    "Disk space freed by the retention job",
+    registry=REGISTRY,
+)
+
 METRIC_REGISTRY = REGISTRY
 
 
@@ -33,5 +206,35 @@ __all__ = [
     "VIDEOS_FAILED",
     "VIDEOS_IN_PROGRESS",
     "PROCESSING_TIME",
+    "HTTP_CONNECTIONS_CREATED",
+    "HTTP_CONNECTIONS_REUSED",
+    "HTTP_REQUESTS_IN_FLIGHT",
+    "HTTP_REQUEST_TIME",
+    "RATE_LIMIT_WAIT_TIME",
+    "RATE_LIMIT_THROTTLED",
+    "RESPONSE_CACHE_HITS",
+    "RESPONSE_CACHE_MISSES",
+    "PROVIDER_REQUEST_TIME",
+    "PROVIDER_FAILOVERS",
+    "PROVIDER_HEDGES_FIRED",
+    "PROVIDER_HEDGES_WON",
+    "PROVIDER_CIRCUIT_STATE",
+    "PROVIDER_CIRCUIT_REJECTED",
+    "VIDEOS_PARKED",
+    "PROVIDER_FIRST_TOKEN_TIME",
+    "TASK_EVENT_SUBSCRIBERS",
+    "TASK_EVENTS_DROPPED",
+    "PROVIDER_MODEL_REQUEST_TIME",
+    "PROVIDER_TOKENS",
+    "MODEL_ESCALATIONS",
+    "TASK_STATUS_NOTIFICATIONS",
+    "TASK_STATUS_WAITERS",
+    "WEBHOOK_DELIVERY_LAG",
+    "WEBHOOK_DELIVERIES",
+    "WEBHOOK_BATCH_EVENTS",
+    "RETENTION_PARTITIONS_DROPPED",
+    "RETENTION_VIDEOS_DELETED",
+    "RETENTION_FILES_DELETED",
+    "RETENTION_BYTES_FREED",
     "METRIC_REGISTRY",
 ]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+def prepare_gray(frame: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.GaussianBlur(gray, (21, 21), 0)
+
+
+def motion_mask(prev_gray: np.ndarray, gray: np.ndarray) -> np.ndarray:
+    diff = cv2.absdiff(prev_gray, gray)
+    return cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)[1]
+
+
+def save_frame(frame: np.ndarray, frame_dir: Path) -> Path:
+    frame_path = frame_dir / f"{uuid.uuid4()}.jpg"
+    cv2.imwrite(str(frame_path), frame)
+    return frame_path
+
+
+def read_frame_at(cap: cv2.VideoCapture, timestamp: float) -> Optional[np.ndarray]:
+    cap.set(cv2.CAP_PROP_POS_MSEC, max(timestamp, 0.0) * 1000)
+    ret, frame = cap.read()
+    return frame if ret else None
+
+
+def save_frames_at(
+    video_path: str,
+    timestamps: list[float],
+    frame_dir: Path,
+) -> list[tuple[Path, float]]:
+    """Seek ``video_path`` to every timestamp and save the frame found there."""
+
+    cap = cv2.VideoCapture(video_path)
+    saved: list[tuple[Path, float]] = []
+    try:
+        for timestamp in timestamps:
+            frame = read_frame_at(cap, timestamp)
+            if frame is not None:
+                saved.append((save_frame(frame, frame_dir), timestamp))
+    finally:
+        cap.release()
+    return saved
+
+
+def video_stats(video_path: str) -> tuple[float, int, float]:
+    """Return ``(fps, total_frames, duration)`` from the container header."""
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError("Cannot open video file")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 24.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+    return fps, total_frames, total_frames / fps if fps else 0
+
+
+def motion_score_at(cap: cv2.VideoCapture, timestamp: float) -> Optional[float]:
+    """Motion between the frame at ``timestamp`` and the one right after it."""
+
+    first = read_frame_at(cap, timestamp)
+    if first is None:
+        return None
+    ret, second = cap.read()
+    if not ret:
+        return 0.0
+    return float(motion_mask(prepare_gray(first), prepare_gray(second)).mean())
+
+
+__all__ = [
+    "motion_mask",
+    "motion_score_at",
+    "prepare_gray",
+    "read_frame_at",
+    "save_frame",
+    "save_frames_at",
+    "video_stats",
+]
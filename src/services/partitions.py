@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import re
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.db import session_scope
+from src.logger import get_logger
+from src.settings import get_settings
+
+logger = get_logger(__name__)
+
+# Tables partitioned by month on created_at (see the f81c6b2d9e34 migration).
+# Each also has a ``<table>_default`` partition, so an insert never fails for
+# lack of a monthly one; its rows move out when that month is created.
+PARTITIONED_TABLES = ("videometric", "videoframeresult")
+
+# Advisory lock key serializing partition DDL across processes.
+PARTITION_LOCK_KEY = 7_505_001
+
+_PARTITION_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    match = _PARTITION_RE.search(name)
+    if match is None:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def expired_partitions(names: Iterable[str], cutoff: datetime) -> list[str]:
+    """Monthly partitions whose whole month is older than ``cutoff``."""
+
+    expired = []
+    for name in names:
+        month = partition_month(name)
+        if month is not None and add_months(month, 1) <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+def list_partitions(session: Session, table: str) -> list[str]:
+    rows = session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    return [name for (name,) in rows]
+
+
+def _stored_columns(session: Session, table: str) -> str:
+    # Generated columns (search_vector) are recomputed on insert.
+    rows = session.execute(
+        text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = :table AND is_generated = 'NEVER' "
+            "ORDER BY ordinal_position"
+        ),
+        {"table": table},
+    )
+    return ", ".join(name for (name,) in rows)
+
+
+def _create_partition(session: Session, table: str, month: datetime, has_default: bool) -> None:
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    upper = add_months(month, 1)
+    in_month = f"created_at >= '{month:%Y-%m-%d}' AND created_at < '{upper:%Y-%m-%d}'"
+    bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+    stranded = has_default and session.execute(
+        text(f"SELECT 1 FROM {default} WHERE {in_month} LIMIT 1")
+    ).first()
+    if not stranded:
+        session.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return
+
+    # Postgres refuses a partition whose rows sit in the default one; move them first.
+    columns = _stored_columns(session, table)
+    session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    session.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+    session.execute(
+        text(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {default} WHERE {in_month}")
+    )
+    session.execute(text(f"DELETE FROM {default} WHERE {in_month}"))
+    session.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.info("Moved %s rows of %s out of the default partition", table, f"{month:%Y-%m}")
+
+
+def ensure_partitions(session: Session, *, now: datetime, months_ahead: int) -> list[str]:
+    """Create partitions from the current month to ``months_ahead`` months later."""
+
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = set(list_partitions(session, table))
+        has_default = default_partition_name(table) in existing
+        month = month_start(now)
+        for _ in range(months_ahead + 1):
+            if partition_name(table, month) not in existing:
+                _create_partition(session, table, month, has_default)
+                created.append(partition_name(table, month))
+            month = add_months(month, 1)
+    return created
+
+
+_ensured_month: Optional[datetime] = None
+_ensured_lock = threading.Lock()
+
+
+def ensure_current_partitions(*, now: Optional[datetime] = None) -> None:
+    """Make sure this month's partitions exist; checks the database once per process and month.
+
+    Called by workers before they write results, so new months do not depend
+    on the API's retention loop. A failure is only logged: rows then land in
+    the default partition.
+    """
+
+    global _ensured_month
+    now = now or datetime.utcnow()
+    month = month_start(now)
+    with _ensured_lock:
+        if _ensured_month == month:
+            return
+        try:
+            with session_scope() as session:
+                if session.get_bind().dialect.name == "postgresql":
+                    session.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_KEY)))
+                    ensure_partitions(
+                        session, now=now, months_ahead=get_settings().RETENTION_PARTITIONS_AHEAD
+                    )
+        except SQLAlchemyError as exc:
+            logger.warning("Could not create result partitions: %s", exc)
+            return
+        _ensured_month = month
+
+
+__all__ = [
+    "PARTITIONED_TABLES",
+    "PARTITION_LOCK_KEY",
+    "add_months",
+    "default_partition_name",
+    "ensure_current_partitions",
+    "ensure_partitions",
+    "expired_partitions",
+    "list_partitions",
+    "month_start",
+    "partition_month",
+    "partition_name",
+]
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+import cv2
+
+from src.logger import get_logger
+from src.services.frame_analysis import FrameAnalyzer, FrameResult
+from src.services.media_info import MediaInfo
+from src.services.motion import motion_score_at, save_frames_at, video_stats
+from src.services.proxy import apull_original_frames
+from src.services.triggers import TriggerEngine
+
+logger = get_logger(__name__)
+
+StageCallback = Callable[[str, "ProgressiveOutcome"], Awaitable[None]]
+
+
+@dataclass
+class ProgressiveOptions:
+    budget_seconds: float
+    coarse_interval: float = 5.0
+    coarse_frames: int = 3
+    refine_interval: float = 0.5
+    refine_frames_per_stage: int = 2
+    max_frames: int = 12
+    # Share of the budget the coarse motion scan may use; the rest is left
+    # for provider calls. Long files get a sparser scan instead of a late answer.
+    coarse_budget_share: float = 0.5
+
+
+@dataclass
+class ProgressiveOutcome:
+    total_frames: int
+    duration: float
+    results: List[FrameResult] = field(default_factory=list)
+    stage: Optional[str] = None
+
+    @property
+    def ordered_results(self) -> List[FrameResult]:
+        return sorted(self.results, key=lambda result: result.timestamp)
+
+
+def _frange(start: float, stop: float, step: float) -> List[float]:
+    values: List[float] = []
+    current = start
+    while current < stop:
+        values.append(round(current, 3))
+        current += step
+    return values
+
+
+def _spread(values: List[float]) -> List[float]:
+    """Reorder ``values`` so that every prefix covers their whole range.
+
+    Takes every ``2**k``-th item with ``k`` decreasing, so a scan cut short
+    by the budget is coarser, not truncated to the start of the file.
+    """
+
+    order: List[float] = []
+    taken: set[int] = set()
+    step = 1 << max(len(values) - 1, 0).bit_length()
+    while step:
+        for index in range(0, len(values), step):
+            if index not in taken:
+                taken.add(index)
+                order.append(values[index])
+        step //= 2
+    return order
+
+
+class ProgressiveAnalysis:
+    """Coarse-to-fine analysis that stops when the time or frame budget runs out.
+
+    The coarse stage samples the whole file at ``coarse_interval``, within
+    ``coarse_budget_share`` of the budget, and sends the highest-motion
+    frames to the provider. Refinement stages then sample
+    densely around the strongest coarse regions, one region per stage, while
+    the budget allows another round of provider calls. ``on_stage`` is
+    awaited after every stage so partial results can be published.
+    Motion is sampled from ``video_path`` (possibly a proxy) while frames sent
+    to the provider come from ``frame_source`` when it is set. ``media`` holds
+    the metadata probed at ingest and spares reopening the container.
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        *,
+        options: ProgressiveOptions,
+        frame_dir: Path,
+        analyzer: Optional[FrameAnalyzer] = None,
+        triggers: Optional[TriggerEngine] = None,
+        on_stage: Optional[StageCallback] = None,
+        frame_source: Optional[str] = None,
+        media: Optional[MediaInfo] = None,
+    ) -> None:
+        self.video_path = video_path
+        self.frame_source = frame_source
+        self.media = media
+        self.options = options
+        self.frame_dir = frame_dir
+        self.analyzer = analyzer
+        self.triggers = triggers
+        self.on_stage = on_stage
+        self.saved_frames: List[Path] = []
+        self._deadline = 0.0
+        self._stage_seconds: List[float] = []
+
+    def _remaining(self) -> float:
+        return self._deadline - time.perf_counter()
+
+    def _estimated_stage_cost(self) -> float:
+        if not self._stage_seconds:
+            return 0.0
+        return sum(self._stage_seconds) / len(self._stage_seconds)
+
+    def _sample_scores(
+        self,
+        timestamps: List[float],
+        *,
+        deadline: Optional[float] = None,
+        min_samples: int = 1,
+    ) -> List[tuple[float, float]]:
+        """Motion scores at ``timestamps``; stops at ``deadline`` once ``min_samples`` are in."""
+
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise RuntimeError("Cannot open video file")
+        try:
+            scores: List[tuple[float, float]] = []
+            for timestamp in timestamps:
+                if (
+                    deadline is not None
+                    and len(scores) >= min_samples
+                    and time.perf_counter() >= deadline
+                ):
+                    logger.info(
+                        "Motion scan cut by the budget: %s of %s samples",
+                        len(scores),
+                        len(timestamps),
+                    )
+                    break
+                score = motion_score_at(cap, timestamp)
+                if score is not None:
+                    scores.append((timestamp, score))
+            return scores
+        finally:
+            cap.release()
+
+    async def _save_frames(self, timestamps: List[float]) -> List[tuple[Path, float]]:
+        if self.frame_source is not None:
+            return await apull_original_frames(self.frame_source, timestamps, self.frame_dir)
+        return await asyncio.to_thread(save_frames_at, self.video_path, timestamps, self.frame_dir)
+
+    def _probe(self) -> tuple[int, float]:
+        if self.media is not None:
+            return self.media.total_frames, self.media.duration
+        _, total_frames, duration = video_stats(self.frame_source or self.video_path)
+        return total_frames, duration
+
+    def _frames_affordable(self, wanted: int) -> int:
+        wanted = min(wanted, self.options.max_frames - len(self.saved_frames))
+        if self.analyzer is None or wanted <= 0:
+            return max(wanted, 0)
+        # Frames of a stage are described concurrently, so a stage costs about
+        # one provider round trip regardless of how many frames it has.
+        cost = self._estimated_stage_cost()
+        if cost > 0 and self._remaining() < cost:
+            return 0
+        return wanted
+
+    async def _analyze(self, outcome: ProgressiveOutcome, timestamps: List[float]) -> None:
+        saved = await self._save_frames(timestamps)
+        self.saved_frames.extend(path for path, _ in saved)
+        if self.analyzer is None:
+            return
+        if not saved:
+            return
+        # The first stage is always described so the client gets some answer.
+        if self._remaining() <= 0 and outcome.results:
+            logger.info("Progressive budget exhausted before %s frames", len(saved))
+            return
+        started = time.perf_counter()
+        results = await self.analyzer.analyze_many(saved)
+        self._stage_seconds.append(time.perf_counter() - started)
+        for result in results:
+            outcome.results.append(result)
+            if self.triggers is not None:
+                self.triggers.observe_summary(result.timestamp, result.summary)
+                if result.people is not None:
+                    self.triggers.observe_people(result.timestamp, result.people)
+
+    async def _finish_stage(self, outcome: ProgressiveOutcome, stage: str) -> None:
+        outcome.stage = stage
+        logger.info(
+            "Progressive stage %s done: %s frames, %.1fs left",
+            stage,
+            len(outcome.results),
+            self._remaining(),
+        )
+        if self.on_stage is not None:
+            await self.on_stage(stage, outcome)
+
+    async def run(self) -> ProgressiveOutcome:
+        options = self.options
+        self._deadline = time.perf_counter() + options.budget_seconds
+
+        total_frames, duration = await asyncio.to_thread(self._probe)
+        outcome = ProgressiveOutcome(total_frames=total_frames, duration=duration)
+
+        coarse = await asyncio.to_thread(
+            self._sample_scores,
+            _spread(_frange(0.0, max(duration, options.coarse_interval), options.coarse_interval)),
+            deadline=time.perf_counter() + options.budget_seconds * options.coarse_budget_share,
+            min_samples=options.coarse_frames,
+        )
+        ranked = sorted(coarse, key=lambda item: item[1], reverse=True)
+        top = [timestamp for timestamp, _ in ranked[: options.coarse_frames]]
+        await self._analyze(outcome, sorted(top))
+        await self._finish_stage(outcome, "coarse")
+        if self.analyzer is None:
+            return outcome
+
+        analyzed = set(top)
+        half_window = options.coarse_interval / 2
+        stage_index = 0
+        for center, _ in ranked:
+            wanted = self._frames_affordable(options.refine_frames_per_stage)
+            if wanted <= 0 or self._remaining() <= 0:
+                break
+            window = [
+                timestamp
+                for timestamp in _frange(
+                    max(center - half_window, 0.0),
+                    min(center + half_window, duration),
+                    options.refine_interval,
+                )
+                if all(abs(timestamp - seen) >= options.refine_interval for seen in analyzed)
+            ]
+            if not window:
+                continue
+            fine = await asyncio.to_thread(self._sample_scores, window, deadline=self._deadline)
+            fine.sort(key=lambda item: item[1], reverse=True)
+            picked = sorted(timestamp for timestamp, _ in fine[:wanted])
+            if not picked:
+                continue
+            analyzed.update(picked)
+            stage_index += 1
+            await self._analyze(outcome, picked)
+            await self._finish_stage(outcome, f"refine-{stage_index}")
+
+        return outcome
+
+
+__all__ = ["ProgressiveAnalysis", "ProgressiveOptions", "ProgressiveOutcome"]
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.logger import get_logger
+from src.settings import get_settings
+from src.utils.ffmpeg_helper import FFmpegError, FFmpegVideoHelper
+
+logger = get_logger(__name__)
+
+PROXY_SUFFIX = ".proxy.mp4"
+
+
+def proxy_path_for(video_path: str) -> Path:
+    path = Path(video_path)
+    return path.with_name(f"{path.stem}{PROXY_SUFFIX}")
+
+
+def ensure_proxy(video_path: str, *, helper: Optional[FFmpegVideoHelper] = None) -> Optional[Path]:
+    """Return a low-res, low-fps, keyframe-dense copy of ``video_path``.
+
+    The proxy is generated once and stored next to the original. ``None`` means
+    the original should be used: proxies are disabled, the source is too small
+    to benefit, or transcoding failed.
+    """
+
+    settings = get_settings()
+    if not settings.PROXY_ENABLED:
+        return None
+
+    source = Path(video_path)
+    proxy = proxy_path_for(video_path)
+    if proxy.exists():
+        os.utime(proxy)
+        return proxy
+
+    try:
+        source_size = source.stat().st_size
+    except OSError:
+        return None
+    if source_size < settings.PROXY_MIN_SOURCE_MB * 1024 * 1024:
+        return None
+
+    helper = helper or FFmpegVideoHelper()
+    # Unique per attempt: workers racing on the same upload must not write
+    # into one file; the finished proxy is swapped in atomically.
+    partial = proxy.with_name(f"{proxy.name}.{os.getpid()}-{uuid.uuid4().hex[:8]}.part.mp4")
+    try:
+        helper.transcode(
+            str(source),
+            str(partial),
+            crf=settings.PROXY_CRF,
+            preset=settings.PROXY_PRESET,
+            width=settings.PROXY_WIDTH,
+            fps=settings.PROXY_FPS,
+            keyint=settings.PROXY_KEYINT,
+            tune="fastdecode",
+            drop_audio=True,
+        )
+        os.replace(partial, proxy)
+    except FFmpegError as exc:
+        logger.warning("Proxy transcode failed for %s, using original: %s", source.name, exc)
+        partial.unlink(missing_ok=True)
+        return None
+
+    logger.info(
+        "Proxy created for %s: %.1f MB -> %.1f MB",
+        source.name,
+        source_size / 1024 / 1024,
+        proxy.stat().st_size / 1024 / 1024,
+    )
+    enforce_proxy_retention([source.parent], keep=proxy)
+    return proxy
+
+
+def pull_original_frames(
+    video_path: str,
+    timestamps: list[float],
+    frame_dir: Path,
+    *,
+    helper: Optional[FFmpegVideoHelper] = None,
+) -> list[tuple[Path, float]]:
+    """Extract the frames selected on the proxy from the original in one ffmpeg run."""
+
+    if not timestamps:
+        return []
+    helper = helper or FFmpegVideoHelper()
+    batch = helper.extract_frames(
+        video_path,
+        str(frame_dir),
+        timestamps,
+        prefix=uuid.uuid4().hex,
+    )
+    return [(path, timestamp) for timestamp, path in batch.frames]
+
+
+async def apull_original_frames(
+    video_path: str,
+    timestamps: list[float],
+    frame_dir: Path,
+    *,
+    helper: Optional[FFmpegVideoHelper] = None,
+) -> list[tuple[Path, float]]:
+    if not timestamps:
+        return []
+    helper = helper or FFmpegVideoHelper()
+    batch = await helper.aextract_frames(
+        video_path,
+        str(frame_dir),
+        timestamps,
+        prefix=uuid.uuid4().hex,
+    )
+    return [(path, timestamp) for timestamp, path in batch.frames]
+
+
+def enforce_proxy_retention(
+    directories: Iterable[Path],
+    *,
+    max_bytes: Optional[int] = None,
+    keep: Optional[Path] = None,
+) -> list[Path]:
+    """Delete least recently used proxies until they fit into the disk cap."""
+
+    if max_bytes is None:
+        max_bytes = get_settings().PROXY_MAX_DISK_MB * 1024 * 1024
+
+    proxies: list[tuple[float, int, Path]] = []
+    for directory in directories:
+        for proxy in Path(directory).glob(f"*{PROXY_SUFFIX}"):
+            try:
+                stat = proxy.stat()
+            except OSError:
+                continue
+            proxies.append((stat.st_mtime, stat.st_size, proxy))
+
+    total = sum(size for _, size, _ in proxies)
+    removed: list[Path] = []
+    for _, size, proxy in sorted(proxies):
+        if total <= max_bytes:
+            break
+        if keep is not None and proxy == keep:
+            continue
+        proxy.unlink(missing_ok=True)
+        total -= size
+        removed.append(proxy)
+
+    if removed:
+        logger.info("Proxy retention removed %s files", len(removed))
+    return removed
+
+
+__all__ = [
+    "PROXY_SUFFIX",
+    "apull_original_frames",
+    "enforce_proxy_retention",
+    "ensure_proxy",
+    "proxy_path_for",
+    "pull_original_frames",
+]
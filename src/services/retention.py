@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Collection, Iterable, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from src.db import session_scope
+from src.logger import get_logger
+from src.models import Video
+from src.services.metrics import (
+    RETENTION_BYTES_FREED,
+    RETENTION_FILES_DELETED,
+    RETENTION_PARTITIONS_DROPPED,
+    RETENTION_VIDEOS_DELETED,
+)
+from src.services.partitions import (
+    PARTITION_LOCK_KEY,
+    PARTITIONED_TABLES,
+    ensure_partitions,
+    expired_partitions,
+    list_partitions,
+)
+from src.services.proxy import PROXY_SUFFIX, proxy_path_for
+from src.services.task_status import FINAL_STATUSES
+from src.services.video_processor import FRAME_DIR, MEDIA_DIR
+from src.settings import get_settings
+
+logger = get_logger(__name__)
+
+UPLOAD_DIR = MEDIA_DIR / "uploads"
+
+
+def drop_expired_partitions(session: Session, *, cutoff: datetime) -> list[str]:
+    """Drop whole months of results; unlike ``DELETE`` this costs the same at any size."""
+
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for name in expired_partitions(list_partitions(session, table), cutoff):
+            session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            RETENTION_PARTITIONS_DROPPED.labels(table=table).inc()
+            dropped.append(name)
+    return dropped
+
+
+def delete_expired_videos(*, cutoff: datetime, batch_size: int) -> list[str]:
+    """Delete finished tasks created before ``cutoff``; returns their stored paths.
+
+    Runs in short batches along the ``(created_at, id)`` index so no single
+    transaction holds locks for long. Child rows go with ``ON DELETE CASCADE``.
+    """
+
+    stored_paths: list[str] = []
+    while True:
+        with session_scope() as session:
+            expired = (
+                select(Video.id)
+                .where(Video.created_at < cutoff, Video.status.in_(FINAL_STATUSES))
+                .order_by(Video.created_at)
+                .limit(batch_size)
+            )
+            paths = list(
+                session.scalars(
+                    delete(Video)
+                    .where(Video.id.in_(expired))
+                    .returning(Video.stored_path)
+                    .execution_options(synchronize_session=False)
+                )
+            )
+        RETENTION_VIDEOS_DELETED.inc(len(paths))
+        stored_paths.extend(paths)
+        if len(paths) < batch_size:
+            return stored_paths
+
+
+def _unlink(path: Path) -> int:
+    try:
+        size = path.stat().st_size
+        path.unlink()
+    except FileNotFoundError:
+        return 0
+    except OSError as exc:
+        logger.warning("Retention could not remove %s: %s", path, exc)
+        return 0
+    RETENTION_FILES_DELETED.inc()
+    RETENTION_BYTES_FREED.inc(size)
+    return size
+
+
+def remove_task_files(stored_paths: Iterable[str], *, upload_dir: Path = UPLOAD_DIR) -> int:
+    """Delete uploads and their proxies; files outside ``upload_dir`` (live sources) stay."""
+
+    upload_dir = upload_dir.resolve()
+    freed = 0
+    for stored_path in stored_paths:
+        path = Path(stored_path).resolve()
+        if not path.is_relative_to(upload_dir):
+            continue
+        freed += _unlink(path) + _unlink(proxy_path_for(str(path)))
+    return freed
+
+
+def active_upload_paths(session: Session) -> set[Path]:
+    """Stored files of tasks that are not finished yet (queued, running or parked)."""
+
+    paths = session.scalars(
+        select(Video.stored_path).where(Video.status.not_in(FINAL_STATUSES))
+    )
+    return {Path(path).resolve() for path in paths}
+
+
+def sweep_files(
+    directories: Iterable[Path], *, cutoff: float, keep: Collection[Path] = ()
+) -> int:
+    """Delete files last modified before ``cutoff`` (a timestamp); returns bytes freed.
+
+    An upload takes its proxy with it. Proxies are touched on every use, so
+    a proxy of a kept upload stays as long as it is needed. Files in ``keep``
+    (resolved paths of unfinished tasks) and their proxies are never removed.
+    """
+
+    kept = set(keep) | {proxy_path_for(str(path)) for path in keep}
+    freed = 0
+    for directory in directories:
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False) or entry.name.startswith("."):
+                continue
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            path = Path(entry.path)
+            if path.resolve() in kept:
+                continue
+            freed += _unlink(path)
+            if not entry.name.endswith(PROXY_SUFFIX):
+                freed += _unlink(proxy_path_for(str(path)))
+    return freed
+
+
+@dataclass
+class RetentionReport:
+    partitions_created: list[str] = field(default_factory=list)
+    partitions_dropped: list[str] = field(default_factory=list)
+    videos_deleted: int = 0
+    bytes_freed: int = 0
+
+
+def run_retention(*, now: Optional[datetime] = None) -> RetentionReport:
+    """Keep partitions ahead of time and remove data past the configured retention."""
+
+    settings = get_settings()
+    now = now or datetime.utcnow()
+    report = RetentionReport()
+
+    with session_scope() as session:
+        locked = session.scalar(select(func.pg_try_advisory_xact_lock(PARTITION_LOCK_KEY)))
+        if not locked:
+            logger.info("Retention already running on another replica")
+            return report
+        report.partitions_created = ensure_partitions(
+            session, now=now, months_ahead=settings.RETENTION_PARTITIONS_AHEAD
+        )
+        if settings.RETENTION_RESULTS_DAYS:
+            report.partitions_dropped = drop_expired_partitions(
+                session, cutoff=now - timedelta(days=settings.RETENTION_RESULTS_DAYS)
+            )
+
+    if settings.RETENTION_RESULTS_DAYS:
+        stored_paths = delete_expired_videos(
+            cutoff=now - timedelta(days=settings.RETENTION_RESULTS_DAYS),
+            batch_size=settings.RETENTION_DELETE_BATCH,
+        )
+        report.videos_deleted = len(stored_paths)
+        report.bytes_freed += remove_task_files(stored_paths)
+
+    if settings.RETENTION_UPLOADS_DAYS:
+        cutoff = time.time() - settings.RETENTION_UPLOADS_DAYS * 86400
+        # A task that is queued, running or parked still needs its upload.
+        with session_scope() as session:
+            active = active_upload_paths(session)
+        report.bytes_freed += sweep_files([UPLOAD_DIR, FRAME_DIR], cutoff=cutoff, keep=active)
+
+    logger.info(
+        "Retention: %s partitions created, %s dropped, %s tasks deleted, %.1f MB freed",
+        len(report.partitions_created),
+        len(report.partitions_dropped),
+        report.videos_deleted,
+        report.bytes_freed / 1024 / 1024,
+    )
+    return report
+
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _run_periodically(interval: float) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(run_retention)
+        except Exception as exc:
+            logger.warning("Retention run failed: %s", exc)
+        await asyncio.sleep(interval)
+
+
+async def start_retention_job() -> None:
+    global _task
+    interval = get_settings().RETENTION_INTERVAL_SECONDS
+    if interval <= 0 or _task is not None:
+        return
+    _task = asyncio.ensure_future(_run_periodically(interval))
+
+
+async def stop_retention_job() -> None:
+    global _task
+    task, _task = _task, None
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+__all__ = [
+    "RetentionReport",
+    "active_upload_paths",
+    "delete_expired_videos",
+    "drop_expired_partitions",
+    "remove_task_files",
+    "run_retention",
+    "start_retention_job",
+    "stop_retention_job",
+    "sweep_files",
+]
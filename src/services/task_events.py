@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Optional
+
+from src.logger import get_logger
+from src.services.frame_analysis import FrameResult
+from src.services.metrics import TASK_EVENT_SUBSCRIBERS, TASK_EVENTS_DROPPED
+from src.settings import get_settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class TaskEvent:
+    id: int
+    type: str
+    data: dict[str, Any]
+
+    def encode(self) -> str:
+        """The event as a ``text/event-stream`` message."""
+
+        payload = json.dumps(self.data, ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+
+
+@dataclass
+class _Channel:
+    history: deque
+    subscribers: set[_Subscriber] = field(default_factory=set)
+    next_id: int = 1
+    finished_at: Optional[float] = None
+
+
+def _offer(queue: asyncio.Queue, event: Optional[TaskEvent]) -> None:
+    # Runs on the subscriber's loop; ``None`` ends the stream and must get through.
+    if queue.full():
+        if event is not None:
+            TASK_EVENTS_DROPPED.inc()
+            return
+        queue.get_nowait()
+        TASK_EVENTS_DROPPED.inc()
+    queue.put_nowait(event)
+
+
+class TaskEventBus:
+    """Fans analysis events of a task out to its event-stream clients.
+
+    Workers publish from the worker loop; clients read on the API loop, so
+    events are handed to each subscriber's loop with ``call_soon_threadsafe``.
+    The last ``history`` events of a task are kept for clients that connect
+    late or reconnect with ``Last-Event-ID``, and for ``retention_seconds``
+    after the task finished. ``partial`` answers are never kept: the next
+    one, or the frame result, supersedes them.
+    """
+
+    def __init__(
+        self,
+        *,
+        history: int = 256,
+        queue_size: int = 1024,
+        retention_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.history = history
+        self.queue_size = queue_size
+        self.retention_seconds = retention_seconds
+        self._clock = clock
+        self._channels: dict[uuid.UUID, _Channel] = {}
+        self._lock = threading.Lock()
+
+    def _channel(self, task_id: uuid.UUID) -> _Channel:
+        now = self._clock()
+        for key, channel in list(self._channels.items()):
+            if (
+                channel.finished_at is not None
+                and not channel.subscribers
+                and now - channel.finished_at > self.retention_seconds
+            ):
+                del self._channels[key]
+        channel = self._channels.get(task_id)
+        if channel is None:
+            channel = self._channels[task_id] = _Channel(history=deque(maxlen=self.history))
+        return channel
+
+    def has_subscribers(self, task_id: uuid.UUID) -> bool:
+        with self._lock:
+            channel = self._channels.get(task_id)
+            return channel is not None and bool(channel.subscribers)
+
+    def _deliver(self, channel: _Channel, event: Optional[TaskEvent]) -> None:
+        for subscriber in list(channel.subscribers):
+            try:
+                subscriber.loop.call_soon_threadsafe(_offer, subscriber.queue, event)
+            except RuntimeError:
+                # The subscriber's loop is gone (e.g. server shutdown).
+                channel.subscribers.discard(subscriber)
+
+    def publish(
+        self,
+        task_id: uuid.UUID,
+        type: str,
+        data: dict[str, Any],
+        *,
+        retain: bool = True,
+    ) -> TaskEvent:
+        """Send an event to current subscribers; safe to call from any thread."""
+
+        with self._lock:
+            channel = self._channel(task_id)
+            event = TaskEvent(channel.next_id, type, data)
+            channel.next_id += 1
+            if retain:
+                channel.history.append(event)
+            # A new run of the same task (e.g. after parking) reopens the stream.
+            channel.finished_at = None
+            self._deliver(channel, event)
+        return event
+
+    def finish(self, task_id: uuid.UUID, type: str, data: dict[str, Any]) -> TaskEvent:
+        """Publish the final event of a task and close its subscribers' streams."""
+
+        with self._lock:
+            channel = self._channel(task_id)
+            event = TaskEvent(channel.next_id, type, data)
+            channel.next_id += 1
+            channel.history.append(event)
+            channel.finished_at = self._clock()
+            self._deliver(channel, event)
+            self._deliver(channel, None)
+        return event
+
+    async def subscribe(
+        self,
+        task_id: uuid.UUID,
+        *,
+        last_event_id: Optional[int] = None,
+        keepalive: Optional[float] = None,
+    ) -> AsyncIterator[Optional[TaskEvent]]:
+        """Kept events newer than ``last_event_id``, then live ones until the task ends.
+
+        Yields ``None`` after ``keepalive`` seconds without events so the
+        caller can keep the connection open.
+        """
+
+        subscriber = _Subscriber(asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            channel = self._channel(task_id)
+            backlog = [
+                event
+                for event in channel.history
+                if last_event_id is None or event.id > last_event_id
+            ]
+            finished = channel.finished_at is not None
+            if not finished:
+                channel.subscribers.add(subscriber)
+        TASK_EVENT_SUBSCRIBERS.inc()
+        try:
+            for event in backlog:
+                yield event
+            if finished:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            TASK_EVENT_SUBSCRIBERS.dec()
+            with self._lock:
+                channel.subscribers.discard(subscriber)
+                if not channel.history and not channel.subscribers:
+                    self._channels.pop(task_id, None)
+
+    def finished(self, task_id: uuid.UUID) -> bool:
+        with self._lock:
+            channel = self._channels.get(task_id)
+            return channel is not None and channel.finished_at is not None
+
+
+class TaskEventPublisher:
+    """Publishes the progress of one task; passed to :class:`FrameAnalyzer` as ``events``."""
+
+    def __init__(self, bus: TaskEventBus, task_id: uuid.UUID, *, stream_partials: bool = True):
+        self.bus = bus
+        self.task_id = task_id
+        self.stream_partials = stream_partials
+
+    @property
+    def streaming(self) -> bool:
+        # Streamed completions only pay off while someone is watching.
+        return self.stream_partials and self.bus.has_subscribers(self.task_id)
+
+    def partial(self, timestamp: float, text: str) -> None:
+        self.bus.publish(
+            self.task_id,
+            "partial",
+            {"timestamp": timestamp, "text": text},
+            retain=False,
+        )
+
+    def frame(self, result: FrameResult) -> None:
+        self.bus.publish(
+            self.task_id,
+            "frame",
+            {
+                "timestamp": result.timestamp,
+                "summary": result.summary,
+                "people": result.people,
+            },
+        )
+
+    def stage(self, stage: str, summary: Optional[str]) -> None:
+        self.bus.publish(self.task_id, "stage", {"stage": stage, "summary": summary})
+
+    def status(self, status: str, **fields: Any) -> None:
+        self.bus.publish(self.task_id, "status", {"status": status, **fields})
+
+    def finish(self, status: str, **fields: Any) -> None:
+        self.bus.finish(self.task_id, "status", {"status": status, **fields})
+
+
+_shared_bus: Optional[TaskEventBus] = None
+_shared_lock = threading.Lock()
+
+
+def get_task_events() -> Optional[TaskEventBus]:
+    """Process-wide event bus, or ``None`` when task events are disabled."""
+
+    global _shared_bus
+    settings = get_settings()
+    if not settings.TASK_EVENTS_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_bus is None:
+            _shared_bus = TaskEventBus(
+                history=settings.TASK_EVENTS_HISTORY,
+                retention_seconds=settings.TASK_EVENTS_RETENTION_SECONDS,
+            )
+        return _shared_bus
+
+
+__all__ = [
+    "TaskEvent",
+    "TaskEventBus",
+    "TaskEventPublisher",
+    "get_task_events",
+]
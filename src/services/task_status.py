@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.logger import get_logger
+from src.models import Video, VideoStatus
+from src.services.live import request_live_stop
+from src.services.metrics import TASK_STATUS_NOTIFICATIONS, TASK_STATUS_WAITERS
+from src.services.task_events import get_task_events
+from src.settings import get_settings
+
+logger = get_logger(__name__)
+
+TASK_STATUS_CHANNEL = "tsos_task_status"
+# Payload is a task id; whichever replica runs that live stream stops it.
+LIVE_STOP_CHANNEL = "tsos_live_stop"
+FINAL_STATUSES = (VideoStatus.COMPLETED, VideoStatus.FAILED)
+
+# Tells this process's own notifications apart from those of other replicas.
+INSTANCE_ID = uuid.uuid4().hex
+
+
+def notify_task_changed(session: Session, video: Video) -> None:
+    """Queue a ``NOTIFY`` for ``video``; Postgres delivers it when the session commits."""
+
+    if not get_settings().TASK_STATUS_NOTIFY_ENABLED:
+        return
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    payload = {
+        "id": str(video.id),
+        "status": video.status.value,
+        "stage": video.analysis_stage,
+        "origin": INSTANCE_ID,
+    }
+    session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": TASK_STATUS_CHANNEL, "payload": json.dumps(payload)},
+    )
+
+
+async def notify_live_stop(session: AsyncSession, task_id: uuid.UUID) -> None:
+    """Queue a ``NOTIFY`` asking every replica to stop the live stream ``task_id``."""
+
+    if not get_settings().TASK_STATUS_NOTIFY_ENABLED:
+        return
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": LIVE_STOP_CHANNEL, "payload": str(task_id)},
+    )
+
+
+class TaskStatusListener:
+    """One ``LISTEN`` connection that wakes every request waiting on a task.
+
+    Long-poll requests register with :meth:`watch` and are woken by the
+    next notification for their task. Changes made by other replicas are
+    also published to the task event bus for stream clients of this
+    process (the local worker publishes its own). After a reconnect all
+    waiters are woken, since notifications may have been missed. Stop
+    requests for live streams arrive on a second channel and stop the
+    stream if it runs in this process.
+    """
+
+    def __init__(self, *, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._waiters: dict[uuid.UUID, set[asyncio.Event]] = {}
+        self._connection: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._wake_all()
+
+    @contextmanager
+    def watch(self, task_id: uuid.UUID) -> Iterator[asyncio.Event]:
+        changed = asyncio.Event()
+        self._waiters.setdefault(task_id, set()).add(changed)
+        TASK_STATUS_WAITERS.inc()
+        try:
+            yield changed
+        finally:
+            TASK_STATUS_WAITERS.dec()
+            waiters = self._waiters.get(task_id)
+            if waiters is not None:
+                waiters.discard(changed)
+                if not waiters:
+                    del self._waiters[task_id]
+
+    def _wake_all(self) -> None:
+        for waiters in self._waiters.values():
+            for changed in waiters:
+                changed.set()
+
+    async def _connect(self) -> asyncpg.Connection:
+        settings = get_settings()
+        return await asyncpg.connect(
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            database=settings.DB_NAME,
+        )
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                connection = await self._connect()
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as exc:
+                logger.warning("Task status LISTEN connection failed: %s", exc)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            closed = asyncio.get_running_loop().create_future()
+
+            def on_close(_: asyncpg.Connection) -> None:
+                if not closed.done():
+                    closed.set_result(None)
+
+            connection.add_termination_listener(on_close)
+            try:
+                await connection.add_listener(TASK_STATUS_CHANNEL, self._on_notify)
+                await connection.add_listener(LIVE_STOP_CHANNEL, self._on_live_stop)
+                self._connection = connection
+                delay = self.reconnect_delay
+                logger.info("Listening for task status changes")
+                self._wake_all()
+                await closed
+                logger.warning("Task status LISTEN connection lost, reconnecting")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Task status LISTEN failed: %s", exc)
+            finally:
+                self._connection = None
+                if not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(delay)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            task_id = uuid.UUID(data["id"])
+            status = VideoStatus(data["status"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed task status notification: %r", payload)
+            return
+        TASK_STATUS_NOTIFICATIONS.inc()
+        for changed in self._waiters.get(task_id, ()):
+            changed.set()
+
+        bus = get_task_events()
+        if bus is None or data.get("origin") == INSTANCE_ID or not bus.has_subscribers(task_id):
+            return
+        event = {"status": status.value, "stage": data.get("stage")}
+        if status in FINAL_STATUSES:
+            bus.finish(task_id, "status", event)
+        else:
+            bus.publish(task_id, "status", event)
+
+    def _on_live_stop(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            task_id = uuid.UUID(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed live stop notification: %r", payload)
+            return
+        if request_live_stop(task_id):
+            logger.info("Live stream %s stopped on request from another replica", task_id)
+
+
+_listener: Optional[TaskStatusListener] = None
+
+
+def get_task_status_listener() -> Optional[TaskStatusListener]:
+    return _listener
+
+
+async def start_task_status_listener() -> None:
+    """Start listening in the background; the API starts even if Postgres is not up yet."""
+
+    global _listener
+    if not get_settings().TASK_STATUS_NOTIFY_ENABLED or _listener is not None:
+        return
+    _listener = TaskStatusListener()
+    _listener.start()
+
+
+async def stop_task_status_listener() -> None:
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        await listener.stop()
+
+
+__all__ = [
+    "FINAL_STATUSES",
+    "LIVE_STOP_CHANNEL",
+    "TASK_STATUS_CHANNEL",
+    "TaskStatusListener",
+    "get_task_status_listener",
+    "notify_live_stop",
+    "notify_task_changed",
+    "start_task_status_listener",
+    "stop_task_status_listener",
+]
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+import cv2
+import numpy as np
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+Box = tuple[int, int, int, int]
+
+
+@dataclass
+class Track:
+    track_id: int
+    box: Box
+    first_seen: float
+    last_seen: float
+    hits: int = 1
+    missed: int = 0
+
+    @property
+    def centroid(self) -> tuple[float, float]:
+        x, y, w, h = self.box
+        return x + w / 2, y + h / 2
+
+
+@dataclass(frozen=True)
+class TrackSpan:
+    track_id: int
+    start_seconds: float
+    end_seconds: float
+    hits: int
+
+
+def box_iou(first: Box, second: Box) -> float:
+    ax, ay, aw, ah = first
+    bx, by, bw, bh = second
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    intersection = inter_w * inter_h
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union else 0.0
+
+
+class PersonDetector:
+    """HOG-based pedestrian detector from OpenCV, no model files required."""
+
+    def __init__(
+        self,
+        *,
+        resize_width: int = 640,
+        min_confidence: float = 0.5,
+        nms_threshold: float = 0.4,
+    ) -> None:
+        self.resize_width = resize_width
+        self.min_confidence = min_confidence
+        self.nms_threshold = nms_threshold
+        self._hog = cv2.HOGDescriptor()
+        self._hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+
+    def detect(self, frame: np.ndarray) -> List[Box]:
+        height, width = frame.shape[:2]
+        scale = 1.0
+        if width > self.resize_width:
+            scale = self.resize_width / width
+            frame = cv2.resize(frame, (self.resize_width, int(height * scale)))
+
+        rects, weights = self._hog.detectMultiScale(
+            frame,
+            winStride=(8, 8),
+            padding=(8, 8),
+            scale=1.05,
+        )
+        if len(rects) == 0:
+            return []
+
+        boxes = [[int(v) for v in rect] for rect in rects]
+        scores = [float(w) for w in np.ravel(weights)]
+        keep = cv2.dnn.NMSBoxes(boxes, scores, self.min_confidence, self.nms_threshold)
+        return [
+            tuple(int(round(v / scale)) for v in boxes[i])  # type: ignore[misc]
+            for i in np.ravel(keep)
+        ]
+
+
+class PersonTracker:
+    """Greedy IoU tracker with a centroid-distance fallback.
+
+    Frames are sampled sparsely (a few per second), so boxes of the same person
+    may not overlap between samples; in that case the nearest centroid within
+    ``max_distance`` box diagonals is used.
+    """
+
+    def __init__(
+        self,
+        *,
+        iou_threshold: float = 0.3,
+        max_distance: float = 1.0,
+        max_missed: int = 4,
+        min_hits: int = 2,
+    ) -> None:
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.min_hits = min_hits
+        self._active: List[Track] = []
+        self._finished: List[Track] = []
+        self._next_id = 1
+
+    def update(self, boxes: Sequence[Box], timestamp: float) -> List[Track]:
+        unmatched = list(range(len(boxes)))
+        candidates = sorted(
+            (
+                (self._match_score(track, boxes[index]), track_index, index)
+                for track_index, track in enumerate(self._active)
+                for index in unmatched
+            ),
+            reverse=True,
+        )
+
+        matched_tracks: set[int] = set()
+        for score, track_index, index in candidates:
+            if score <= 0 or track_index in matched_tracks or index not in unmatched:
+                continue
+            track = self._active[track_index]
+            track.box = boxes[index]
+            track.last_seen = timestamp
+            track.hits += 1
+            track.missed = 0
+            matched_tracks.add(track_index)
+            unmatched.remove(index)
+
+        still_active: List[Track] = []
+        for track_index, track in enumerate(self._active):
+            if track_index not in matched_tracks:
+                track.missed += 1
+            if track.missed > self.max_missed:
+                self._finished.append(track)
+            else:
+                still_active.append(track)
+
+        for index in unmatched:
+            still_active.append(
+                Track(
+                    track_id=self._next_id,
+                    box=boxes[index],
+                    first_seen=timestamp,
+                    last_seen=timestamp,
+                )
+            )
+            self._next_id += 1
+
+        self._active = still_active
+        return self._active
+
+    def _match_score(self, track: Track, box: Box) -> float:
+        iou = box_iou(track.box, box)
+        if iou >= self.iou_threshold:
+            return 1.0 + iou
+
+        x, y, w, h = box
+        cx, cy = track.centroid
+        distance = math.hypot(cx - (x + w / 2), cy - (y + h / 2))
+        _, _, tw, th = track.box
+        diagonal = math.hypot(tw, th) or 1.0
+        normalized = distance / diagonal
+        if normalized > self.max_distance:
+            return 0.0
+        return 1.0 - normalized / (self.max_distance + 1e-9)
+
+    @property
+    def confirmed_tracks(self) -> List[Track]:
+        tracks = self._finished + self._active
+        return [track for track in tracks if track.hits >= self.min_hits]
+
+    @property
+    def unique_count(self) -> int:
+        return len(self.confirmed_tracks)
+
+    @property
+    def max_concurrent(self) -> int:
+        return sum(1 for track in self._active if track.hits >= self.min_hits)
+
+    def spans(self) -> List[TrackSpan]:
+        return [
+            TrackSpan(
+                track_id=track.track_id,
+                start_seconds=track.first_seen,
+                end_seconds=track.last_seen,
+                hits=track.hits,
+            )
+            for track in sorted(self.confirmed_tracks, key=lambda t: t.track_id)
+        ]
+
+
+@dataclass
+class PeopleTracking:
+    """Runs the detector on a sampled frame stream and feeds the tracker."""
+
+    sample_fps: float = 2.0
+    detector: PersonDetector = field(default_factory=PersonDetector)
+    tracker: PersonTracker = field(default_factory=PersonTracker)
+
+    def stride(self, fps: float) -> int:
+        if self.sample_fps <= 0:
+            return 1
+        return max(1, int(round(fps / self.sample_fps)))
+
+    def observe(self, frame: np.ndarray, timestamp: float) -> List[Track]:
+        boxes = self.detector.detect(frame)
+        return self.tracker.update(boxes, timestamp)
+
+    @property
+    def unique_count(self) -> int:
+        return self.tracker.unique_count
+
+    def spans(self) -> List[TrackSpan]:
+        return self.tracker.spans()
+
+
+__all__ = [
+    "Box",
+    "PeopleTracking",
+    "PersonDetector",
+    "PersonTracker",
+    "Track",
+    "TrackSpan",
+    "box_iou",
+]
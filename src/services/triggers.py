@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import operator
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.logger import get_logger
+from src.schemes import ErrorCode
+
+logger = get_logger(__name__)
+
+MOTION_SCORE_THRESHOLD = 2.0
+MOTION_GAP_SECONDS = 1.0
+
+_COMPARATORS: dict[str, Callable[[float, float], bool]] = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "==": operator.eq,
+    "<=": operator.le,
+    "<": operator.lt,
+}
+
+_PEOPLE_RE = re.compile(r"^people\s*(>=|>|==|<=|<)\s*(\d+)$", re.IGNORECASE)
+_SUMMARY_RE = re.compile(r"^summary\s+mentions\s+(.+)$", re.IGNORECASE)
+_MOTION_RE = re.compile(
+    r"^motion(?:\s+in\s+roi\s*\(([^)]*)\))?\s+for\s*(>=|>)\s*(\d+(?:\.\d+)?)\s*s$",
+    re.IGNORECASE,
+)
+
+
+class TriggerConfigError(ValueError):
+    def __init__(self, message: str):
+        self.code = ErrorCode.INVALID_TRIGGER_CONFIG
+        super().__init__(message)
+
+
+@dataclass(frozen=True)
+class PeopleRule:
+    expression: str
+    comparator: str
+    threshold: int
+
+    def matches(self, count: int) -> bool:
+        return _COMPARATORS[self.comparator](count, self.threshold)
+
+
+@dataclass(frozen=True)
+class SummaryRule:
+    expression: str
+    phrase: str
+
+    def matches(self, text: str) -> bool:
+        return self.phrase.lower() in text.lower()
+
+
+@dataclass(frozen=True)
+class MotionRule:
+    """Motion inside a region for longer than ``min_seconds``.
+
+    ``roi`` is ``(x, y, width, height)`` in fractions of the frame size;
+    ``None`` means the whole frame.
+    """
+
+    expression: str
+    comparator: str
+    min_seconds: float
+    roi: Optional[tuple[float, float, float, float]] = None
+
+    def satisfied(self, elapsed: float) -> bool:
+        return _COMPARATORS[self.comparator](elapsed, self.min_seconds)
+
+    def region(self, mask: np.ndarray) -> np.ndarray:
+        if self.roi is None:
+            return mask
+        height, width = mask.shape[:2]
+        x, y, w, h = self.roi
+        left, top = int(x * width), int(y * height)
+        right, bottom = int((x + w) * width), int((y + h) * height)
+        return mask[top:max(bottom, top + 1), left:max(right, left + 1)]
+
+
+TriggerRule = Union[PeopleRule, SummaryRule, MotionRule]
+
+
+@dataclass(frozen=True)
+class TriggerFiring:
+    rule: str
+    timestamp: float
+    detail: str
+
+
+def _parse_roi(raw: str, expression: str) -> tuple[float, float, float, float]:
+    try:
+        values = tuple(float(part) for part in raw.split(","))
+    except ValueError as exc:
+        raise TriggerConfigError(f"Invalid ROI in trigger '{expression}'") from exc
+    if len(values) != 4:
+        raise TriggerConfigError(f"ROI must have 4 values in trigger '{expression}'")
+    x, y, w, h = values
+    if not (0 <= x < 1 and 0 <= y < 1 and 0 < w <= 1 and 0 < h <= 1):
+        raise TriggerConfigError(
+            f"ROI values must be fractions of the frame in trigger '{expression}'"
+        )
+    return x, y, w, h
+
+
+def parse_trigger_rule(expression: str) -> TriggerRule:
+    text = " ".join(expression.split())
+    if not text:
+        raise TriggerConfigError("Empty trigger rule")
+
+    match = _PEOPLE_RE.match(text)
+    if match:
+        return PeopleRule(text, match.group(1), int(match.group(2)))
+
+    match = _SUMMARY_RE.match(text)
+    if match:
+        phrase = match.group(1).strip().strip("\"'")
+        if not phrase:
+            raise TriggerConfigError(f"Empty phrase in trigger '{text}'")
+        return SummaryRule(text, phrase)
+
+    match = _MOTION_RE.match(text)
+    if match:
+        roi = _parse_roi(match.group(1), text) if match.group(1) is not None else None
+        return MotionRule(text, match.group(2), float(match.group(3)), roi)
+
+    raise TriggerConfigError(f"Unsupported trigger rule '{text}'")
+
+
+def parse_trigger_rules(raw: Union[str, Sequence[str], None]) -> List[str]:
+    """Normalize rules given as a JSON list or ``;``/newline separated text.
+
+    Every rule is validated; the normalized expressions are returned so they can
+    be stored on the video row.
+    """
+
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        text = raw.strip()
+        if not text:
+            return []
+        if text.startswith("["):
+            try:
+                items = json.loads(text)
+            except json.JSONDecodeError as exc:
+                raise TriggerConfigError("Trigger rules are not valid JSON") from exc
+            if not isinstance(items, list) or not all(isinstance(i, str) for i in items):
+                raise TriggerConfigError("Trigger rules must be a list of strings")
+        else:
+            items = re.split(r"[;\n]", text)
+    else:
+        items = list(raw)
+
+    return [parse_trigger_rule(item).expression for item in items if item.strip()]
+
+
+@dataclass
+class _MotionState:
+    started_at: Optional[float] = None
+    last_seen: Optional[float] = None
+
+
+@dataclass
+class TriggerEngine:
+    """Evaluates trigger rules incrementally; each rule fires at most once per arming."""
+
+    rules: List[TriggerRule]
+    fired: List[TriggerFiring] = field(default_factory=list)
+    _motion: dict[str, _MotionState] = field(default_factory=dict)
+    _armed_from: int = 0
+
+    @classmethod
+    def from_expressions(cls, expressions: Iterable[str]) -> "TriggerEngine":
+        return cls(rules=[parse_trigger_rule(expression) for expression in expressions])
+
+    @property
+    def has_fired(self) -> bool:
+        return bool(self.fired)
+
+    @property
+    def wants_motion(self) -> bool:
+        return any(isinstance(rule, MotionRule) for rule in self._pending())
+
+    def rearm(self) -> None:
+        """Let every rule fire again; earlier firings stay in ``fired``."""
+
+        self._armed_from = len(self.fired)
+
+    def _pending(self) -> List[TriggerRule]:
+        done = {firing.rule for firing in self.fired[self._armed_from:]}
+        return [rule for rule in self.rules if rule.expression not in done]
+
+    def _fire(self, rule: TriggerRule, timestamp: float, detail: str) -> TriggerFiring:
+        firing = TriggerFiring(rule=rule.expression, timestamp=timestamp, detail=detail)
+        self.fired.append(firing)
+        logger.info("Trigger '%s' fired at %.2fs: %s", rule.expression, timestamp, detail)
+        return firing
+
+    def observe_people(self, timestamp: float, count: int) -> List[TriggerFiring]:
+        return [
+            self._fire(rule, timestamp, f"people={count}")
+            for rule in self._pending()
+            if isinstance(rule, PeopleRule) and rule.matches(count)
+        ]
+
+    def observe_summary(self, timestamp: float, text: str) -> List[TriggerFiring]:
+        return [
+            self._fire(rule, timestamp, f"summary mentions '{rule.phrase}'")
+            for rule in self._pending()
+            if isinstance(rule, SummaryRule) and rule.matches(text)
+        ]
+
+    def observe_motion(self, timestamp: float, motion_mask: np.ndarray) -> List[TriggerFiring]:
+        """Feed a thresholded frame difference (0/255 mask)."""
+
+        fired: List[TriggerFiring] = []
+        for rule in self._pending():
+            if not isinstance(rule, MotionRule):
+                continue
+            state = self._motion.setdefault(rule.expression, _MotionState())
+            moving = float(rule.region(motion_mask).mean()) > MOTION_SCORE_THRESHOLD
+            if moving:
+                gap = timestamp - state.last_seen if state.last_seen is not None else None
+                if state.started_at is None or (gap is not None and gap > MOTION_GAP_SECONDS):
+                    state.started_at = timestamp
+                state.last_seen = timestamp
+                elapsed = timestamp - state.started_at
+                if rule.satisfied(elapsed):
+                    fired.append(self._fire(rule, timestamp, f"motion for {elapsed:.1f}s"))
+            elif state.last_seen is not None and timestamp - state.last_seen > MOTION_GAP_SECONDS:
+                state.started_at = None
+                state.last_seen = None
+        return fired
+
+
+__all__ = [
+    "MOTION_SCORE_THRESHOLD",
+    "MotionRule",
+    "PeopleRule",
+    "SummaryRule",
+    "TriggerConfigError",
+    "TriggerEngine",
+    "TriggerFiring",
+    "TriggerRule",
+    "parse_trigger_rule",
+    "parse_trigger_rules",
+]
@@ -1,26 +1,77 @@
 from __future__ import annotations
 
 import asyncio
-import re
+import threading
 import time
 import uuid
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional
 
 import cv2
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 
 from src.db import session_scope
 from src.logger import get_logger
-from src.models import Video, VideoMetric, VideoStatus
-from src.providers.openrouter import OpenRouterClient
-from src.schemes import ErrorCode
+from src.models import (
+    PersonTrack,
+    TriggerEvent,
+    Video,
+    VideoFrameResult,
+    VideoMetric,
+    VideoStatus,
+)
+from src.providers.circuit_breaker import CircuitOpenError
+from src.providers.router import get_provider, unavailable_for
 from src.services.metrics import (
     PROCESSING_TIME,
     VIDEOS_FAILED,
     VIDEOS_IN_PROGRESS,
+    VIDEOS_PARKED,
     VIDEOS_PROCESSED,
 )
-from src.settings import get_settings
+from src.services.frame_analysis import (
+    BatchOptions,
+    FrameAnalyzer,
+    FrameResult,
+    resolve_model_tiers,
+)
+from src.services.live import (
+    LiveAnalysis,
+    LiveOptions,
+    LiveWindow,
+    register_live_session,
+    unregister_live_session,
+)
+from src.services.media_info import MediaInfo
+from src.services.motion import (
+    motion_mask,
+    prepare_gray,
+    save_frame,
+    video_stats,
+)
+from src.services.partitions import ensure_current_partitions
+from src.services.progressive import (
+    ProgressiveAnalysis,
+    ProgressiveOptions,
+    ProgressiveOutcome,
+)
+from src.services.proxy import ensure_proxy, pull_original_frames
+from src.services.task_events import TaskEventPublisher, get_task_events
+from src.services.task_status import notify_task_changed
+from src.services.webhooks import enqueue_task_webhook, enqueue_trigger_webhooks
+from src.services.tracking import PeopleTracking, PersonTracker
+from src.services.triggers import MOTION_SCORE_THRESHOLD, TriggerEngine, TriggerFiring
+from src.services.worker_loop import run_in_worker_loop
+from src.settings import (
+    AnalysisProfile,
+    CircuitOpenAction,
+    PeopleCountSource,
+    PromptMode,
+    get_settings,
+)
 from src.utils.aiohttp_adapter import AioHttpAdapterError
 
 logger = get_logger(__name__)
@@ -32,50 +83,182 @@ FRAME_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def run_coroutine_sync(coro):
-    return asyncio.run(coro)
-
-
-def detect_motion_frames(video_path: str, max_frames: int = 5) -> tuple[List[Path], int, float]:
+    return run_in_worker_loop(coro)
+
+
+@dataclass
+class MotionScan:
+    frames: List[Path]
+    timestamps: List[float]
+    total_frames: int
+    duration: float
+    stopped_early: bool = False
+
+
+def detect_motion_frames(
+    video_path: str,
+    max_frames: int = 5,
+    *,
+    tracking: Optional[PeopleTracking] = None,
+    triggers: Optional[TriggerEngine] = None,
+    stop_on_trigger: bool = False,
+    frame_source: Optional[str] = None,
+    media: Optional[MediaInfo] = None,
+) -> MotionScan:
+    """Scan ``video_path`` for motion and save up to ``max_frames`` frames.
+
+    When ``frame_source`` is given (the original behind an analysis proxy),
+    the scan only records timestamps and the selected frames are pulled from
+    ``frame_source`` afterwards; frame counts are reported for it as well.
+    ``media`` is the metadata of the original probed at ingest; when present
+    it replaces reading the container header.
+    """
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise RuntimeError("Cannot open video file")
 
-    fps = cap.get(cv2.CAP_PROP_FPS) or 24.0
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    if media is not None and frame_source is None:
+        fps = media.fps
+        total_frames = media.total_frames
+    else:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 24.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
     duration = total_frames / fps if fps else 0
+    tracking_stride = tracking.stride(fps) if tracking else 0
+    # At most one captured frame per second; sub-1 fps sources (timelapses)
+    # may capture every frame.
+    capture_stride = max(int(fps), 1)
 
     prev_gray = None
     saved_frames: List[Path] = []
+    timestamps: List[float] = []
     frame_index = 0
-
-    while cap.isOpened() and len(saved_frames) < max_frames:
+    stopped_early = False
+
+    while cap.isOpened():
+        watch_motion = triggers is not None and triggers.wants_motion
+        capturing = len(timestamps) < max_frames
+        # Tracking and motion triggers need the whole stream, frame capture only
+        # the first max_frames hits.
+        if not capturing and tracking is None and not watch_motion:
+            break
         ret, frame = cap.read()
         if not ret:
             break
         frame_index += 1
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
-        if prev_gray is None:
+        timestamp = (frame_index - 1) / fps
+        if tracking is not None and frame_index % tracking_stride == 0:
+            tracking.observe(frame, timestamp)
+            if triggers is not None:
+                triggers.observe_people(timestamp, tracking.tracker.max_concurrent)
+        if capturing or watch_motion:
+            gray = prepare_gray(frame)
+            if prev_gray is not None:
+                thresh = motion_mask(prev_gray, gray)
+                if watch_motion:
+                    triggers.observe_motion(timestamp, thresh)
+                movement_score = thresh.mean()
+                if (
+                    capturing
+                    and movement_score > MOTION_SCORE_THRESHOLD
+                    and frame_index % capture_stride == 0
+                ):
+                    if frame_source is None:
+                        saved_frames.append(save_frame(frame, FRAME_DIR))
+                    timestamps.append(timestamp)
             prev_gray = gray
-            continue
-        diff = cv2.absdiff(prev_gray, gray)
-        thresh = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)[1]
-        movement_score = thresh.mean()
-        if movement_score > 2.0 and frame_index % int(fps) == 0:
-            frame_path = FRAME_DIR / f"{uuid.uuid4()}.jpg"
-            cv2.imwrite(str(frame_path), frame)
-            saved_frames.append(frame_path)
-        prev_gray = gray
+        if stop_on_trigger and triggers is not None and triggers.has_fired:
+            logger.info("Stopping decode at %.2fs: trigger fired", timestamp)
+            stopped_early = True
+            break
 
     cap.release()
-    return saved_frames, total_frames, duration
-
 
-def parse_people_count(text: str) -> int:
-    match = re.search(r"(\d+)", text)
-    if match:
-        return int(match.group(1))
-    return 0
+    if frame_source is not None:
+        saved = pull_original_frames(frame_source, timestamps, FRAME_DIR)
+        saved_frames = [path for path, _ in saved]
+        timestamps = [timestamp for _, timestamp in saved]
+        if media is not None:
+            total_frames, duration = media.total_frames, media.duration
+        else:
+            _, total_frames, duration = video_stats(frame_source)
+
+    return MotionScan(
+        frames=saved_frames,
+        timestamps=timestamps,
+        total_frames=total_frames,
+        duration=duration,
+        stopped_early=stopped_early,
+    )
+
+
+def observe_result(triggers: Optional[TriggerEngine], result: FrameResult) -> None:
+    if triggers is None:
+        return
+    triggers.observe_summary(result.timestamp, result.summary)
+    if result.people is not None:
+        triggers.observe_people(result.timestamp, result.people)
+
+
+async def describe_frames(
+    analyzer: FrameAnalyzer,
+    frames: List[tuple[Path, float]],
+    *,
+    triggers: Optional[TriggerEngine] = None,
+    stop_on_trigger: bool = False,
+) -> List[FrameResult]:
+    """Provider phase of the default scan.
+
+    Frames are described concurrently and returned in frame order. With
+    ``stop_on_trigger`` they go one by one so a firing rule saves the
+    remaining requests.
+    """
+
+    if stop_on_trigger and triggers is not None:
+        results: List[FrameResult] = []
+        for frame_path, timestamp in frames:
+            if triggers.has_fired:
+                logger.info("Alert-only profile: trigger fired, skipping remaining frames")
+                break
+            result = await analyzer.analyze(frame_path, timestamp)
+            results.append(result)
+            observe_result(triggers, result)
+        return results
+
+    results = await analyzer.analyze_many(frames)
+    for result in results:
+        observe_result(triggers, result)
+    return results
+
+
+def build_people_tracking() -> Optional[PeopleTracking]:
+    settings = get_settings()
+    if not settings.TRACKING_ENABLED and settings.PEOPLE_COUNT_SOURCE != PeopleCountSource.TRACKER:
+        return None
+    return PeopleTracking(
+        sample_fps=settings.TRACKING_SAMPLE_FPS,
+        tracker=PersonTracker(min_hits=settings.TRACKING_MIN_HITS),
+    )
+
+
+def plan_people_counting(profile: AnalysisProfile) -> tuple[Optional[PeopleTracking], bool]:
+    """Return the tracker for ``profile`` and whether the provider counts people.
+
+    Progressive and live runs never decode every frame, so they cannot track;
+    they count with the provider even under ``PEOPLE_COUNT_SOURCE=tracker``
+    instead of reporting zero people.
+    """
+
+    settings = get_settings()
+    tracking = (
+        build_people_tracking()
+        if profile not in (AnalysisProfile.PROGRESSIVE, AnalysisProfile.LIVE)
+        else None
+    )
+    if tracking is None and settings.PEOPLE_COUNT_SOURCE == PeopleCountSource.TRACKER:
+        logger.info("No tracking in the %s profile, the provider counts people", profile.value)
+        return None, True
+    return tracking, settings.PEOPLE_COUNT_SOURCE == PeopleCountSource.PROVIDER
 
 
 def cleanup_frames(frames: List[Path]) -> None:
@@ -86,10 +269,143 @@ def cleanup_frames(frames: List[Path]) -> None:
             logger.warning("Failed to remove frame %s", frame)
 
 
+def _store_frame_results(
+    session: Session,
+    video_id: uuid.UUID,
+    results: List[FrameResult],
+) -> None:
+    """Write every frame answer of a task with one multi-row ``INSERT``."""
+
+    if not results:
+        return
+    session.execute(
+        insert(VideoFrameResult),
+        [
+            {
+                "video_id": video_id,
+                "timestamp_seconds": result.timestamp,
+                "prompt": result.prompt,
+                "text": result.summary,
+                "people_count": result.people,
+                "latency_seconds": result.latency,
+            }
+            for result in results
+        ],
+    )
+
+
+def _store_partial_results(
+    video_id: uuid.UUID,
+    outcome: ProgressiveOutcome,
+    provider_name: Optional[str],
+) -> None:
+    results = outcome.ordered_results
+    with session_scope() as session:
+        video = session.get(Video, video_id)
+        if video is None:
+            return
+        video.analysis_stage = outcome.stage
+        video.provider = provider_name
+        video.total_frames = outcome.total_frames
+        video.duration_seconds = outcome.duration
+        video.summary = " | ".join(result.summary for result in results) or None
+        video.unique_people = max(
+            (result.people for result in results if result.people is not None),
+            default=0,
+        )
+        session.add(video)
+        notify_task_changed(session, video)
+
+
+def _store_live_window(
+    video_id: uuid.UUID,
+    window: LiveWindow,
+    summaries: List[str],
+    firings: List[TriggerFiring],
+    provider_name: Optional[str],
+) -> bool:
+    """Store one live window; returns True once the stream was asked to stop."""
+
+    # A stream may outlive the month it started in.
+    ensure_current_partitions()
+    with session_scope() as session:
+        video = session.get(Video, video_id)
+        if video is None:
+            return True
+        video.analysis_stage = f"window-{window.index}"
+        video.provider = provider_name
+        video.duration_seconds = window.end
+        video.summary = " | ".join(summaries) or None
+        if window.result is not None and window.result.people is not None:
+            video.unique_people = max(video.unique_people or 0, window.result.people)
+        session.add(video)
+        notify_task_changed(session, video)
+
+        session.add(VideoMetric(video_id=video_id, name="window_motion", value=window.motion))
+        if window.result is not None:
+            _store_frame_results(session, video_id, [window.result])
+            if window.result.people is not None:
+                session.add(
+                    VideoMetric(
+                        video_id=video_id, name="window_people", value=window.result.people
+                    )
+                )
+        for firing in firings:
+            session.add(
+                TriggerEvent(
+                    video_id=video_id,
+                    rule=firing.rule,
+                    timestamp_seconds=firing.timestamp,
+                    detail=firing.detail,
+                )
+            )
+        enqueue_trigger_webhooks(session, video, firings)
+        return video.stop_requested_at is not None
+
+
+_park_attempts: dict[uuid.UUID, int] = {}
+_park_lock = threading.Lock()
+
+
+def _park_video(video_id: uuid.UUID, retry_after: float) -> bool:
+    """Return the task to ``received`` and re-run it once the circuit may close.
+
+    There is no external queue, so the retry is a timer in this process.
+    Returns ``False`` once ``CIRCUIT_PARK_MAX_ATTEMPTS`` is used up.
+    """
+
+    settings = get_settings()
+    with _park_lock:
+        attempts = _park_attempts.get(video_id, 0) + 1
+        if attempts > settings.CIRCUIT_PARK_MAX_ATTEMPTS:
+            _park_attempts.pop(video_id, None)
+            return False
+        _park_attempts[video_id] = attempts
+
+    delay = max(retry_after, 1.0)
+    with session_scope() as session:
+        video = session.get(Video, video_id)
+        if video:
+            video.status = VideoStatus.RECEIVED
+            video.error_message = (
+                f"Provider unavailable, retry {attempts}/{settings.CIRCUIT_PARK_MAX_ATTEMPTS} "
+                f"in {delay:.0f}s"
+            )
+            session.add(video)
+            notify_task_changed(session, video)
+    timer = threading.Timer(delay, process_video_task, args=(video_id,))
+    timer.daemon = True
+    timer.start()
+    VIDEOS_PARKED.inc()
+    logger.info("Video %s parked for %.0fs (attempt %s)", video_id, delay, attempts)
+    return True
+
+
 def process_video_task(video_id: uuid.UUID) -> None:
     start_time = time.perf_counter()
     VIDEOS_IN_PROGRESS.inc()
     logger.info("Processing started for video %s", video_id)
+    ensure_current_partitions()
 
     with session_scope() as session:
         video = session.get(Video, video_id)
@@ -98,58 +414,202 @@ def process_video_task(video_id: uuid.UUID) -> None:
             return
         video.status = VideoStatus.PROCESSING
         session.add(video)
+        notify_task_changed(session, video)
+
+    settings = get_settings()
+    profile = AnalysisProfile(video.profile or settings.ANALYSIS_PROFILE)
+    rules = video.trigger_rules if video.trigger_rules is not None else settings.TRIGGER_RULES
+    bus = get_task_events()
+    events = (
+        TaskEventPublisher(bus, video_id, stream_partials=settings.PROVIDER_STREAMING_ENABLED)
+        if bus is not None
+        else None
+    )
+    if events is not None:
+        events.status(VideoStatus.PROCESSING.value, profile=profile.value)
+    stop_on_trigger = profile == AnalysisProfile.ALERT_ONLY
+    media = MediaInfo.from_video(video)
 
     frames: List[Path] = []
-    descriptions: List[str] = []
+    results: List[FrameResult] = []
     unique_people = 0
+    summary_text: Optional[str] = None
     provider_name: Optional[str] = None
+    analysis_stage: Optional[str] = None
+    persisted_firings = 0
+    parked = False
 
     try:
-        frames, total_frames, duration = detect_motion_frames(video.stored_path)
-        settings = get_settings()
-
-        if settings.OPENROUTER_API_KEY:
-            client = OpenRouterClient(
-                api_key=settings.OPENROUTER_API_KEY,
+        triggers = TriggerEngine.from_expressions(rules) if rules else None
+        tracking, count_with_provider = plan_people_counting(profile)
+
+        analyzer: Optional[FrameAnalyzer] = None
+        client = get_provider()
+        if client is not None:
+            provider_name = client.name
+            analyzer = FrameAnalyzer(
+                client,
+                summary_prompt=settings.SUMMARY_PROMPT,
+                people_prompt=settings.PEOPLE_COUNT_PROMPT,
+                count_people=count_with_provider,
+                concurrency=settings.PROVIDER_CONCURRENCY,
+                combined_prompt=(
+                    settings.COMBINED_PROMPT
+                    if settings.PROMPT_MODE == PromptMode.COMBINED
+                    else None
+                ),
+                batch=(
+                    BatchOptions(
+                        prompt=settings.BATCH_PROMPT,
+                        max_images=settings.PROVIDER_BATCH_MAX_IMAGES,
+                        max_payload_bytes=settings.PROVIDER_BATCH_MAX_PAYLOAD_KB * 1024,
+                    )
+                    if settings.PROMPT_MODE == PromptMode.BATCHED
+                    else None
+                ),
+                events=events,
+                tiers=resolve_model_tiers(settings.MODEL_POLICY, profile.value),
+                escalate=settings.MODEL_ESCALATION_ENABLED,
             )
-            provider_name = "openrouter"
-            summary_prompt = settings.SUMMARY_PROMPT
-            people_prompt = settings.PEOPLE_COUNT_PROMPT
-            for frame_path in frames:
-                summary_response = run_coroutine_sync(
-                    client.describe_image(
-                        image_path=str(frame_path),
-                        prompt=summary_prompt,
+        else:
+            logger.info("No AI providers configured, skipping description phase.")
+
+        if client is not None and profile != AnalysisProfile.LIVE:
+            # Do not decode the whole file only to have every provider call refused.
+            blocked_for = unavailable_for(client)
+            if blocked_for > 0:
+                raise CircuitOpenError(client.name, blocked_for)
+
+        proxy = ensure_proxy(video.stored_path) if profile != AnalysisProfile.LIVE else None
+        scan_path = str(proxy) if proxy else video.stored_path
+        frame_source = video.stored_path if proxy else None
+
+        if profile == AnalysisProfile.PROGRESSIVE:
+            async def publish_stage(stage: str, partial: ProgressiveOutcome) -> None:
+                await asyncio.to_thread(_store_partial_results, video_id, partial, provider_name)
+                if events is not None:
+                    events.stage(
+                        stage,
+                        " | ".join(result.summary for result in partial.ordered_results) or None,
                     )
-                )
-                descriptions.append(summary_response)
-
-                retry_attempts = 0
-                while True:
-                    try:
-                        count_response = run_coroutine_sync(
-                            client.describe_image(
-                                image_path=str(frame_path),
-                                prompt=people_prompt,
-                            )
-                        )
-                        break
-                    except AioHttpAdapterError as count_exc:
-                        retry_attempts += 1
-                        if retry_attempts > 2 or count_exc.code != ErrorCode.AI_PROVIDER_TIMEOUT:
-                            raise
-                        logger.info(
-                            "Retrying people count for frame %s due to timeout (%s)",
-                            frame_path.name,
-                            retry_attempts,
-                        )
-                        time.sleep(2)
 
-                unique_people = max(unique_people, parse_people_count(count_response))
+            progressive = ProgressiveAnalysis(
+                scan_path,
+                options=ProgressiveOptions(
+                    budget_seconds=(
+                        video.time_budget_seconds or settings.PROGRESSIVE_TIME_BUDGET_SECONDS
+                    ),
+                    coarse_interval=settings.PROGRESSIVE_COARSE_INTERVAL_SECONDS,
+                    coarse_frames=settings.PROGRESSIVE_COARSE_FRAMES,
+                    refine_interval=settings.PROGRESSIVE_REFINE_INTERVAL_SECONDS,
+                    refine_frames_per_stage=settings.PROGRESSIVE_REFINE_FRAMES,
+                    max_frames=settings.PROGRESSIVE_MAX_FRAMES,
+                ),
+                frame_dir=FRAME_DIR,
+                analyzer=analyzer,
+                triggers=triggers,
+                on_stage=publish_stage,
+                frame_source=frame_source,
+                media=media,
+            )
+            try:
+                outcome = run_coroutine_sync(progressive.run())
+            finally:
+                frames = progressive.saved_frames
+            results = outcome.ordered_results
+            total_frames, duration = outcome.total_frames, outcome.duration
+            analysis_stage = outcome.stage
+        elif profile == AnalysisProfile.LIVE:
+            handle = register_live_session(video_id)
+            if video.stop_requested_at is not None:
+                handle.stop()
+            recent: deque[str] = deque(maxlen=settings.LIVE_SUMMARY_WINDOWS)
+
+            async def publish_window(window: LiveWindow) -> None:
+                nonlocal persisted_firings, unique_people
+                if window.result is not None:
+                    recent.append(window.result.summary)
+                    if window.result.people is not None:
+                        unique_people = max(unique_people, window.result.people)
+                firings = triggers.fired[persisted_firings:] if triggers is not None else []
+                persisted_firings += len(firings)
+                stop_requested = await asyncio.to_thread(
+                    _store_live_window,
+                    video_id,
+                    window,
+                    list(recent),
+                    firings,
+                    provider_name,
+                )
+                if stop_requested:
+                    handle.stop()
+                if events is not None:
+                    events.stage(f"window-{window.index}", " | ".join(recent) or None)
+
+            live = LiveAnalysis(
+                video.stored_path,
+                options=LiveOptions(
+                    sample_fps=settings.LIVE_SAMPLE_FPS,
+                    width=settings.LIVE_FRAME_WIDTH,
+                    height=settings.LIVE_FRAME_HEIGHT,
+                    window_seconds=settings.LIVE_WINDOW_SECONDS,
+                    idle_timeout=settings.LIVE_IDLE_TIMEOUT_SECONDS,
+                ),
+                frame_dir=FRAME_DIR,
+                handle=handle,
+                analyzer=analyzer,
+                triggers=triggers,
+                on_window=publish_window,
+            )
+            try:
+                window_count = run_coroutine_sync(live.run())
+            finally:
+                unregister_live_session(video_id)
+            # Frame results were stored window by window; ``results`` stays empty.
+            total_frames, duration = live.frames_read, live.stream_seconds
+            analysis_stage = f"window-{window_count}" if window_count else None
+            summary_text = " | ".join(recent) or None
         else:
-            logger.info("No AI providers configured, skipping description phase.")
+            scan = detect_motion_frames(
+                scan_path,
+                tracking=tracking,
+                triggers=triggers,
+                stop_on_trigger=stop_on_trigger,
+                frame_source=frame_source,
+                media=media,
+            )
+            frames = scan.frames
+            total_frames, duration = scan.total_frames, scan.duration
+
+            if scan.stopped_early:
+                logger.info("Alert-only profile: skipping provider phase for video %s", video_id)
+            elif analyzer is not None:
+                results = run_coroutine_sync(
+                    describe_frames(
+                        analyzer,
+                        list(zip(frames, scan.timestamps)),
+                        triggers=triggers,
+                        stop_on_trigger=stop_on_trigger,
+                    )
+                )
 
-        summary_text = " | ".join(descriptions) if descriptions else None
+        if tracking is not None and not count_with_provider:
+            unique_people = tracking.unique_count
+        overviews = (
+            analyzer.batch_overviews
+            if analyzer is not None and profile != AnalysisProfile.LIVE
+            else []
+        )
+        unique_people = max(
+            [unique_people]
+            + [result.people for result in results if result.people is not None]
+            + [item.unique_people for item in overviews if item.unique_people is not None]
+        )
+        if results:
+            summary_text = " | ".join(result.summary for result in results)
+        if any(item.summary for item in overviews):
+            # Multi-image answers already describe the frames together.
+            summary_text = " | ".join(item.summary for item in overviews if item.summary)
 
         with session_scope() as session:
             video = session.get(Video, video_id)
@@ -162,24 +622,88 @@ def process_video_task(video_id: uuid.UUID) -> None:
             video.duration_seconds = duration
             video.analysis_time = time.perf_counter() - start_time
             video.summary = summary_text
+            video.analysis_stage = analysis_stage
             session.add(video)
+            notify_task_changed(session, video)
+            enqueue_task_webhook(session, video)
 
             metric = VideoMetric(video_id=video_id, name="unique_people", value=unique_people)
             session.add(metric)
+            _store_frame_results(session, video_id, results)
+
+            if tracking is not None:
+                session.add(
+                    VideoMetric(
+                        video_id=video_id,
+                        name="tracked_people",
+                        value=tracking.unique_count,
+                    )
+                )
+                for span in tracking.spans():
+                    session.add(
+                        PersonTrack(
+                            video_id=video_id,
+                            track_index=span.track_id,
+                            start_seconds=span.start_seconds,
+                            end_seconds=span.end_seconds,
+                            hits=span.hits,
+                        )
+                    )
+
+            if triggers is not None:
+                session.add(
+                    VideoMetric(
+                        video_id=video_id,
+                        name="triggers_fired",
+                        value=len(triggers.fired),
+                    )
+                )
+                for firing in triggers.fired[persisted_firings:]:
+                    session.add(
+                        TriggerEvent(
+                            video_id=video_id,
+                            rule=firing.rule,
+                            timestamp_seconds=firing.timestamp,
+                            detail=firing.detail,
+                        )
+                    )
+                enqueue_trigger_webhooks(session, video, triggers.fired[persisted_firings:])
 
         VIDEOS_PROCESSED.inc()
         PROCESSING_TIME.observe(time.perf_counter() - start_time)
         logger.info("Processing finished for video %s", video_id)
+        if events is not None:
+            events.finish(
+                VideoStatus.COMPLETED.value,
+                summary=summary_text,
+                unique_people=unique_people,
+                analysis_stage=analysis_stage,
+            )
 
     except AioHttpAdapterError as exc:
-        logger.warning("Provider error for video %s: %s", video_id, exc)
-        with session_scope() as session:
-            video = session.get(Video, video_id)
-            if video:
-                video.status = VideoStatus.FAILED
-                video.error_message = f"Provider error ({exc.status}): {exc}"
-                session.add(video)
-        VIDEOS_FAILED.inc()
+        parked = (
+            isinstance(exc, CircuitOpenError)
+            and settings.CIRCUIT_OPEN_ACTION == CircuitOpenAction.PARK
+            and profile != AnalysisProfile.LIVE
+            and _park_video(video_id, exc.retry_after)
+        )
+        if parked:
+            if events is not None:
+                events.status(VideoStatus.RECEIVED.value, retry_after=exc.retry_after)
+        else:
+            logger.warning("Provider error for video %s: %s", video_id, exc)
+            message = f"Provider error ({exc.status or exc.code.value}): {exc}"
+            with session_scope() as session:
+                video = session.get(Video, video_id)
+                if video:
+                    video.status = VideoStatus.FAILED
+                    video.error_message = message
+                    session.add(video)
+                    notify_task_changed(session, video)
+                    enqueue_task_webhook(session, video)
+            VIDEOS_FAILED.inc()
+            if events is not None:
+                events.finish(VideoStatus.FAILED.value, error=message)
 
     except Exception as exc:
         logger.exception("Video processing failed: %s", exc)
@@ -189,9 +713,16 @@ def process_video_task(video_id: uuid.UUID) -> None:
                 video.status = VideoStatus.FAILED
                 video.error_message = str(exc)
                 session.add(video)
+                notify_task_changed(session, video)
+                enqueue_task_webhook(session, video)
         VIDEOS_FAILED.inc()
+        if events is not None:
+            events.finish(VideoStatus.FAILED.value, error=str(exc))
     finally:
         cleanup_frames(frames)
+        if not parked:
+            with _park_lock:
+                _park_attempts.pop(video_id, None)
 
 
 __all__ = ["process_video_task"]
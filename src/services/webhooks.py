@@ -0,0 +1,467 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+from urllib.parse import urlsplit
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.db import async_session_scope
+from src.logger import get_logger
+from src.models import Video, WebhookDelivery, WebhookStatus
+from src.providers.rate_limit import parse_retry_after
+from src.services.metrics import (
+    WEBHOOK_BATCH_EVENTS,
+    WEBHOOK_DELIVERIES,
+    WEBHOOK_DELIVERY_LAG,
+)
+from src.services.triggers import TriggerFiring
+from src.settings import get_settings
+from src.utils.aiohttp_adapter import AioHttpAdapter, AioHttpAdapterError
+
+logger = get_logger(__name__)
+
+SIGNATURE_HEADER = "X-TSOS-Signature"
+TIMESTAMP_HEADER = "X-TSOS-Timestamp"
+TRIGGER_EVENT = "trigger.fired"
+
+
+def webhook_secret() -> str:
+    settings = get_settings()
+    return settings.WEBHOOK_SECRET or settings.SECRET_KEY
+
+
+def sign_payload(body: bytes, timestamp: int, secret: str) -> str:
+    """``sha256=<hex>`` HMAC over ``"<timestamp>.<body>"``, so old bodies cannot be replayed."""
+
+    message = str(timestamp).encode() + b"." + body
+    return "sha256=" + hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_signature(
+    body: bytes,
+    timestamp: str,
+    signature: str,
+    secret: str,
+    *,
+    tolerance: float = 300.0,
+    now: Optional[float] = None,
+) -> bool:
+    """Receiver-side check of :func:`sign_payload`; also rejects stale timestamps."""
+
+    try:
+        sent_at = int(timestamp)
+    except ValueError:
+        return False
+    if abs((time.time() if now is None else now) - sent_at) > tolerance:
+        return False
+    return hmac.compare_digest(sign_payload(body, sent_at, secret), signature)
+
+
+class WebhookTargetError(ValueError):
+    """A webhook URL that must not be called; ``permanent`` is False for DNS failures."""
+
+    def __init__(self, message: str, *, permanent: bool = True):
+        self.permanent = permanent
+        super().__init__(message)
+
+
+def is_public_address(address: str) -> bool:
+    """False for private, loopback, link-local (169.254.169.254), reserved and multicast."""
+
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _allowed_host(host: str, allowed_hosts: Optional[Iterable[str]]) -> bool:
+    if allowed_hosts is None:
+        allowed_hosts = get_settings().WEBHOOK_ALLOWED_HOSTS
+    return host.lower() in allowed_hosts
+
+
+async def _resolve(host: str, port: int, family: int = socket.AF_UNSPEC) -> list[tuple]:
+    try:
+        return await asyncio.get_running_loop().getaddrinfo(
+            host, port, family=family, type=socket.SOCK_STREAM
+        )
+    except socket.gaierror as exc:
+        raise WebhookTargetError(f"Cannot resolve {host}: {exc}", permanent=False) from exc
+
+
+async def check_webhook_url(url: str, *, allowed_hosts: Optional[Iterable[str]] = None) -> None:
+    """Reject URLs that are malformed or point at a non-public address.
+
+    Every address the host resolves to must be public, unless the host is in
+    ``WEBHOOK_ALLOWED_HOSTS``. Runs when a URL is accepted and again before
+    each delivery, because DNS answers change.
+    """
+
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname or len(url) > 2048:
+        raise WebhookTargetError("Invalid webhook URL")
+    host = parts.hostname
+    if _allowed_host(host, allowed_hosts):
+        return
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError as exc:
+        raise WebhookTargetError("Invalid webhook URL") from exc
+    for *_, sockaddr in await _resolve(host, port):
+        if not is_public_address(sockaddr[0]):
+            raise WebhookTargetError(f"Webhook host {host} resolves to a non-public address")
+
+
+class PublicResolver(AbstractResolver):
+    """aiohttp resolver that refuses non-public addresses.
+
+    Closes the gap between :func:`check_webhook_url` and the connection: a
+    name that re-resolves to an internal address fails to connect.
+    """
+
+    def __init__(self, *, allowed_hosts: Optional[Iterable[str]] = None):
+        self.allowed_hosts = allowed_hosts
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> list[ResolveResult]:
+        results: list[ResolveResult] = []
+        for family_, _, proto, _, sockaddr in await _resolve(host, port, family):
+            address = sockaddr[0]
+            if not _allowed_host(host, self.allowed_hosts) and not is_public_address(address):
+                raise OSError(f"Webhook host {host} resolves to a non-public address")
+            results.append(
+                {
+                    "hostname": host,
+                    "host": address,
+                    "port": sockaddr[1],
+                    "family": family_,
+                    "proto": proto,
+                    "flags": socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+                }
+            )
+        if not results:
+            raise OSError(f"Cannot resolve {host}")
+        return results
+
+    async def close(self) -> None:
+        return None
+
+
+def _webhook_url(video: Video) -> Optional[str]:
+    # The task's own URL wins over ``WEBHOOK_URL``, the default for every
+    # task submitted with this deployment's key.
+    settings = get_settings()
+    if not settings.WEBHOOK_ENABLED:
+        return None
+    return video.webhook_url or settings.WEBHOOK_URL
+
+
+def enqueue_task_webhook(session: Session, video: Video) -> Optional[WebhookDelivery]:
+    """Queue the final status of ``video`` for its webhook, in the caller's transaction."""
+
+    url = _webhook_url(video)
+    if not url:
+        return None
+    delivery = WebhookDelivery(
+        id=uuid.uuid4(),
+        video_id=video.id,
+        url=url,
+        event=f"task.{video.status.value}",
+        payload={
+            "task_id": str(video.id),
+            "status": video.status.value,
+            "summary": video.summary,
+            "unique_people": video.unique_people,
+            "analysis_stage": video.analysis_stage,
+            "error": video.error_message,
+        },
+    )
+    session.add(delivery)
+    return delivery
+
+
+def enqueue_trigger_webhooks(
+    session: Session, video: Video, firings: Iterable[TriggerFiring]
+) -> list[WebhookDelivery]:
+    """Queue a ``trigger.fired`` event per firing, in the transaction that stores them."""
+
+    url = _webhook_url(video)
+    if not url:
+        return []
+    deliveries = [
+        WebhookDelivery(
+            id=uuid.uuid4(),
+            video_id=video.id,
+            url=url,
+            event=TRIGGER_EVENT,
+            payload={
+                "task_id": str(video.id),
+                "rule": firing.rule,
+                "timestamp_seconds": firing.timestamp,
+                "detail": firing.detail,
+            },
+        )
+        for firing in firings
+    ]
+    session.add_all(deliveries)
+    return deliveries
+
+
+def retry_delay(attempts: int, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff after ``attempts`` failures, never sooner than ``Retry-After``."""
+
+    settings = get_settings()
+    delay = min(
+        settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.WEBHOOK_RETRY_MAX_SECONDS,
+    )
+    return max(delay, retry_after or 0.0)
+
+
+@dataclass
+class PendingWebhook:
+    id: uuid.UUID
+    url: str
+    event: str
+    payload: dict[str, Any]
+    attempts: int
+    created_at: datetime
+
+    def envelope(self) -> dict[str, Any]:
+        return {
+            "id": str(self.id),
+            "event": self.event,
+            "created_at": self.created_at.isoformat() + "Z",
+            "data": self.payload,
+        }
+
+
+async def send_webhooks(
+    adapter: AioHttpAdapter,
+    url: str,
+    deliveries: list[PendingWebhook],
+    *,
+    secret: str,
+    timeout: Optional[float] = None,
+) -> None:
+    """POST ``deliveries`` to ``url`` as one signed ``{"events": [...]}`` body."""
+
+    body = json.dumps(
+        {"events": [delivery.envelope() for delivery in deliveries]},
+        ensure_ascii=False,
+        default=str,
+    ).encode()
+    timestamp = int(time.time())
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "TSOS-Webhooks",
+        TIMESTAMP_HEADER: str(timestamp),
+        SIGNATURE_HEADER: sign_payload(body, timestamp, secret),
+    }
+    WEBHOOK_BATCH_EVENTS.observe(len(deliveries))
+    await adapter.post_data(url, data=body, headers=headers, timeout=timeout)
+
+
+class WebhookDispatcher:
+    """Delivers queued webhook events from the outbox table.
+
+    Due rows are claimed with ``FOR UPDATE SKIP LOCKED``, so several API
+    replicas can run a dispatcher, and leased by pushing ``next_attempt_at``
+    past the request timeout: a crash mid-delivery only delays a retry.
+    Rows for one URL are sent together, up to ``WEBHOOK_BATCH_SIZE`` per
+    POST. Failed rows back off exponentially until ``WEBHOOK_MAX_ATTEMPTS``.
+    """
+
+    def __init__(self, *, adapter: Optional[AioHttpAdapter] = None):
+        settings = get_settings()
+        self.adapter = adapter or AioHttpAdapter(
+            timeout=settings.WEBHOOK_TIMEOUT_SECONDS, resolver=PublicResolver()
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.adapter.close()
+
+    async def _run(self) -> None:
+        settings = get_settings()
+        while True:
+            try:
+                sent = await self.dispatch_once()
+            except Exception as exc:
+                logger.warning("Webhook dispatch failed: %s", exc)
+                sent = 0
+            if not sent:
+                await asyncio.sleep(settings.WEBHOOK_POLL_SECONDS)
+
+    async def _claim(self) -> list[PendingWebhook]:
+        settings = get_settings()
+        now = datetime.utcnow()
+        lease = timedelta(seconds=settings.WEBHOOK_TIMEOUT_SECONDS * 2 + 5)
+        async with async_session_scope() as session:
+            rows = (
+                await session.scalars(
+                    select(WebhookDelivery)
+                    .where(
+                        WebhookDelivery.status == WebhookStatus.PENDING,
+                        WebhookDelivery.next_attempt_at <= now,
+                    )
+                    .order_by(WebhookDelivery.next_attempt_at)
+                    .limit(max(settings.WEBHOOK_BATCH_SIZE, 1) * 20)
+                    .with_for_update(skip_locked=True)
+                )
+            ).all()
+            for row in rows:
+                row.attempts += 1
+                row.next_attempt_at = now + lease
+            return [
+                PendingWebhook(
+                    row.id, row.url, row.event, row.payload, row.attempts, row.created_at
+                )
+                for row in rows
+            ]
+
+    async def dispatch_once(self) -> int:
+        """Send every due delivery once; returns how many were attempted."""
+
+        settings = get_settings()
+        claimed = await self._claim()
+        if not claimed:
+            return 0
+        by_url: dict[str, list[PendingWebhook]] = {}
+        for delivery in claimed:
+            by_url.setdefault(delivery.url, []).append(delivery)
+        size = max(settings.WEBHOOK_BATCH_SIZE, 1)
+        batches = [
+            deliveries[start:start + size]
+            for deliveries in by_url.values()
+            for start in range(0, len(deliveries), size)
+        ]
+        secret = webhook_secret()
+        results = await asyncio.gather(
+            *(self._deliver(batch, secret, settings.WEBHOOK_TIMEOUT_SECONDS) for batch in batches),
+            return_exceptions=True,
+        )
+        await self._record(batches, results)
+        return len(claimed)
+
+    async def _deliver(self, batch: list[PendingWebhook], secret: str, timeout: float) -> None:
+        # Checked again here: the URL may have been queued before the host's
+        # DNS changed, or by a build without the check.
+        await check_webhook_url(batch[0].url)
+        await send_webhooks(self.adapter, batch[0].url, batch, secret=secret, timeout=timeout)
+
+    async def _record(
+        self,
+        batches: list[list[PendingWebhook]],
+        results: list[Any],
+    ) -> None:
+        settings = get_settings()
+        now = datetime.utcnow()
+        async with async_session_scope() as session:
+            for batch, result in zip(batches, results):
+                ids = [delivery.id for delivery in batch]
+                if result is None:
+                    WEBHOOK_DELIVERIES.labels(outcome="delivered").inc(len(batch))
+                    for delivery in batch:
+                        WEBHOOK_DELIVERY_LAG.observe(
+                            (now - delivery.created_at).total_seconds()
+                        )
+                    await session.execute(
+                        update(WebhookDelivery)
+                        .where(WebhookDelivery.id.in_(ids))
+                        .values(
+                            status=WebhookStatus.DELIVERED,
+                            delivered_at=now,
+                            last_error=None,
+                        )
+                    )
+                    continue
+                retry_after = None
+                if isinstance(result, AioHttpAdapterError):
+                    retry_after = parse_retry_after(
+                        result.headers.get("Retry-After"), now=time.time()
+                    )
+                elif not isinstance(result, WebhookTargetError):
+                    logger.error("Unexpected webhook error", exc_info=result)
+                blocked = isinstance(result, WebhookTargetError) and result.permanent
+                logger.warning(
+                    "Webhook delivery to %s failed (%d events): %s",
+                    batch[0].url,
+                    len(batch),
+                    result,
+                )
+                for delivery in batch:
+                    values: dict[str, Any] = {"last_error": str(result)[:1000]}
+                    if blocked or delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                        WEBHOOK_DELIVERIES.labels(outcome="failed").inc()
+                        values["status"] = WebhookStatus.FAILED
+                    else:
+                        WEBHOOK_DELIVERIES.labels(outcome="retry").inc()
+                        delay = retry_delay(delivery.attempts, retry_after)
+                        values["next_attempt_at"] = now + timedelta(seconds=delay)
+                    await session.execute(
+                        update(WebhookDelivery)
+                        .where(WebhookDelivery.id == delivery.id)
+                        .values(**values)
+                    )
+
+
+_dispatcher: Optional[WebhookDispatcher] = None
+
+
+async def start_webhook_dispatcher() -> None:
+    global _dispatcher
+    if not get_settings().WEBHOOK_ENABLED or _dispatcher is not None:
+        return
+    _dispatcher = WebhookDispatcher()
+    _dispatcher.start()
+
+
+async def stop_webhook_dispatcher() -> None:
+    global _dispatcher
+    dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        await dispatcher.stop()
+
+
+__all__ = [
+    "PendingWebhook",
+    "PublicResolver",
+    "SIGNATURE_HEADER",
+    "TIMESTAMP_HEADER",
+    "TRIGGER_EVENT",
+    "WebhookDispatcher",
+    "WebhookTargetError",
+    "check_webhook_url",
+    "enqueue_task_webhook",
+    "enqueue_trigger_webhooks",
+    "is_public_address",
+    "retry_delay",
+    "send_webhooks",
+    "sign_payload",
+    "start_webhook_dispatcher",
+    "stop_webhook_dispatcher",
+    "verify_signature",
+    "webhook_secret",
+]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+from src.logger import get_logger
+from src.utils.aiohttp_adapter import close_shared_adapter
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerLoop:
+    """A single event loop, running in a daemon thread, for all background tasks.
+
+    Sync task code submits coroutines with :meth:`run` and blocks until they
+    finish, so provider sessions, semaphores and pooled connections outlive a
+    single call instead of being rebuilt by ``asyncio.run`` every time.
+    """
+
+    def __init__(self, name: str = "tsos-worker-loop") -> None:
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self.running:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def serve() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=serve, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            logger.info("Worker event loop started")
+            return loop
+
+    def run(self, coro: Awaitable[T]) -> T:
+        loop = self.start()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("WorkerLoop.run() called from the worker loop itself.")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(close_shared_adapter(), loop).result(timeout)
+        except Exception as exc:
+            logger.warning("Failed to close HTTP session on worker loop: %s", exc)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.info("Worker event loop stopped")
+
+
+_worker_loop = WorkerLoop()
+
+
+def run_in_worker_loop(coro: Awaitable[T]) -> T:
+    return _worker_loop.run(coro)
+
+
+def start_worker_loop() -> asyncio.AbstractEventLoop:
+    return _worker_loop.start()
+
+
+def stop_worker_loop() -> None:
+    _worker_loop.stop()
+
+
+__all__ = ["WorkerLoop", "run_in_worker_loop", "start_worker_loop", "stop_worker_loop"]
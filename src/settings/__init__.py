@@ -1,16 +1,28 @@
 from .config import (
+    AnalysisProfile,
     BaseConfig,
+    CircuitOpenAction,
     ConfigUnion,
     DevConfig,
     EnvironmentType,
     LocalConfig,
+    ModelTier,
+    PeopleCountSource,
     ProdConfig,
+    PromptMode,
+    RateLimitStore,
     TestConfig,
     get_settings,
 )
 
 __all__ = [
+    "AnalysisProfile",
+    "CircuitOpenAction",
     "EnvironmentType",
+    "ModelTier",
+    "PeopleCountSource",
+    "PromptMode",
+    "RateLimitStore",
     "BaseConfig",
     "LocalConfig",
     "DevConfig",
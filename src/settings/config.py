@@ -23,6 +23,51 @@ class EnvironmentType(str, Enum):
     LOCAL = "local"
 
 
+class PeopleCountSource(str, Enum):
+    """Источник подсчёта уникальных людей."""
+
+    PROVIDER = "provider"
+    TRACKER = "tracker"
+
+
+class AnalysisProfile(str, Enum):
+    """Профиль обработки видео."""
+
+    FULL = "full"
+    ALERT_ONLY = "alert_only"
+    PROGRESSIVE = "progressive"
+    LIVE = "live"
+
+
+class PromptMode(str, Enum):
+    """Способ запроса описания и подсчёта людей у провайдера."""
+
+    SEPARATE = "separate"
+    COMBINED = "combined"
+    BATCHED = "batched"
+
+
+class CircuitOpenAction(str, Enum):
+    """Что делать с задачей, пока цепь провайдера разомкнута."""
+
+    FAIL = "fail"
+    PARK = "park"
+
+
+class ModelTier(str, Enum):
+    """Класс модели провайдера: быстрая и дешёвая или более сильная."""
+
+    FAST = "fast"
+    STRONG = "strong"
+
+
+class RateLimitStore(str, Enum):
+    """Где хранится состояние ограничителя запросов к провайдерам."""
+
+    LOCAL = "local"
+    POSTGRES = "postgres"
+
+
 def _parse_list(value: str | list[str]) -> list[str]:
     if isinstance(value, list):
         return value
@@ -57,11 +102,84 @@ class BaseConfig(BaseSettings):
     DB_PORT: int = Field(env="DB_PORT", default=5432)
     DB_POOL_MIN: int = Field(env="DB_POOL_MIN", default=1)
     DB_POOL_MAX: int = Field(env="DB_POOL_MAX", default=5)
+    DB_POOL_TIMEOUT_SECONDS: float = Field(env="DB_POOL_TIMEOUT_SECONDS", default=30.0)
+    DB_POOL_RECYCLE_SECONDS: int = Field(env="DB_POOL_RECYCLE_SECONDS", default=1800)
+    DB_POOL_PRE_PING: bool = Field(env="DB_POOL_PRE_PING", default=True)
 
     OPENAI_API_KEY: str | None = Field(env="OPENAI_API_KEY", default=None)
     OLLAMA_API_KEY: str | None = Field(env="OLLAMA_API_KEY", default=None)
     G4F_API_KEY: str | None = Field(env="G4F_API_KEY", default=None)
     OPENROUTER_API_KEY: str | None = Field(env="OPENROUTER_API_KEY", default=None)
+    PROVIDERS: list[str] = Field(env="PROVIDERS", default=["ollama", "openai", "openrouter"])
+    OPENROUTER_MODEL: str | None = Field(env="OPENROUTER_MODEL", default=None)
+    OPENROUTER_FAST_MODEL: str | None = Field(
+        env="OPENROUTER_FAST_MODEL", default="google/gemma-3-4b-it:free"
+    )
+    OPENROUTER_COST_PER_REQUEST: float = Field(env="OPENROUTER_COST_PER_REQUEST", default=0.0)
+    OPENAI_BASE_URL: str = Field(env="OPENAI_BASE_URL", default="https://api.openai.com/v1")
+    OPENAI_MODEL: str = Field(env="OPENAI_MODEL", default="gpt-4o-mini")
+    OPENAI_FAST_MODEL: str | None = Field(env="OPENAI_FAST_MODEL", default="gpt-4.1-nano")
+    OPENAI_COST_PER_REQUEST: float = Field(env="OPENAI_COST_PER_REQUEST", default=0.0005)
+    OLLAMA_BASE_URL: str | None = Field(env="OLLAMA_BASE_URL", default=None)
+    OLLAMA_MODEL: str = Field(env="OLLAMA_MODEL", default="qwen2.5vl:7b")
+    OLLAMA_FAST_MODEL: str | None = Field(env="OLLAMA_FAST_MODEL", default=None)
+    OLLAMA_COST_PER_REQUEST: float = Field(env="OLLAMA_COST_PER_REQUEST", default=0.0)
+    PROVIDER_COST_WEIGHT: float = Field(env="PROVIDER_COST_WEIGHT", default=1000.0)
+    MODEL_POLICY: dict[str, ModelTier] = Field(
+        env="MODEL_POLICY",
+        default={
+            "people": ModelTier.FAST,
+            "summary": ModelTier.STRONG,
+            "combined": ModelTier.STRONG,
+            "batch": ModelTier.STRONG,
+            "alert_only.summary": ModelTier.FAST,
+        },
+    )
+    MODEL_ESCALATION_ENABLED: bool = Field(env="MODEL_ESCALATION_ENABLED", default=True)
+    ADAPTIVE_TIMEOUT_ENABLED: bool = Field(env="ADAPTIVE_TIMEOUT_ENABLED", default=True)
+    PROVIDER_TIMEOUT_MIN_SECONDS: float = Field(env="PROVIDER_TIMEOUT_MIN_SECONDS", default=5.0)
+    PROVIDER_TIMEOUT_MAX_SECONDS: float = Field(env="PROVIDER_TIMEOUT_MAX_SECONDS", default=120.0)
+    PROVIDER_TIMEOUT_P99_MULTIPLIER: float = Field(
+        env="PROVIDER_TIMEOUT_P99_MULTIPLIER", default=2.0
+    )
+    PROVIDER_HEDGING_ENABLED: bool = Field(env="PROVIDER_HEDGING_ENABLED", default=False)
+    PROVIDER_HEDGE_QUANTILE: float = Field(env="PROVIDER_HEDGE_QUANTILE", default=0.95)
+    PROVIDER_HEDGE_MIN_SAMPLES: int = Field(env="PROVIDER_HEDGE_MIN_SAMPLES", default=10)
+    CIRCUIT_BREAKER_ENABLED: bool = Field(env="CIRCUIT_BREAKER_ENABLED", default=True)
+    CIRCUIT_BREAKER_WINDOW: int = Field(env="CIRCUIT_BREAKER_WINDOW", default=20)
+    CIRCUIT_BREAKER_MIN_CALLS: int = Field(env="CIRCUIT_BREAKER_MIN_CALLS", default=5)
+    CIRCUIT_BREAKER_FAILURE_RATE: float = Field(env="CIRCUIT_BREAKER_FAILURE_RATE", default=0.5)
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = Field(env="CIRCUIT_BREAKER_OPEN_SECONDS", default=30.0)
+    CIRCUIT_OPEN_ACTION: CircuitOpenAction = Field(
+        env="CIRCUIT_OPEN_ACTION", default=CircuitOpenAction.FAIL
+    )
+    CIRCUIT_PARK_MAX_ATTEMPTS: int = Field(env="CIRCUIT_PARK_MAX_ATTEMPTS", default=5)
+    TASK_EVENTS_ENABLED: bool = Field(env="TASK_EVENTS_ENABLED", default=True)
+    TASK_EVENTS_HISTORY: int = Field(env="TASK_EVENTS_HISTORY", default=256)
+    TASK_EVENTS_RETENTION_SECONDS: float = Field(
+        env="TASK_EVENTS_RETENTION_SECONDS", default=300.0
+    )
+    TASK_EVENTS_KEEPALIVE_SECONDS: float = Field(env="TASK_EVENTS_KEEPALIVE_SECONDS", default=15.0)
+    PROVIDER_STREAMING_ENABLED: bool = Field(env="PROVIDER_STREAMING_ENABLED", default=True)
+    TASK_STATUS_NOTIFY_ENABLED: bool = Field(env="TASK_STATUS_NOTIFY_ENABLED", default=True)
+    TASK_STATUS_MAX_WAIT_SECONDS: float = Field(env="TASK_STATUS_MAX_WAIT_SECONDS", default=60.0)
+    WEBHOOK_ENABLED: bool = Field(env="WEBHOOK_ENABLED", default=True)
+    WEBHOOK_URL: str | None = Field(env="WEBHOOK_URL", default=None)
+    WEBHOOK_SECRET: str | None = Field(env="WEBHOOK_SECRET", default=None)
+    # Hosts exempt from the public-address check, e.g. an in-cluster receiver.
+    WEBHOOK_ALLOWED_HOSTS: list[str] = Field(env="WEBHOOK_ALLOWED_HOSTS", default=[])
+    WEBHOOK_BATCH_SIZE: int = Field(env="WEBHOOK_BATCH_SIZE", default=1)
+    WEBHOOK_POLL_SECONDS: float = Field(env="WEBHOOK_POLL_SECONDS", default=2.0)
+    WEBHOOK_TIMEOUT_SECONDS: float = Field(env="WEBHOOK_TIMEOUT_SECONDS", default=10.0)
+    WEBHOOK_MAX_ATTEMPTS: int = Field(env="WEBHOOK_MAX_ATTEMPTS", default=8)
+    WEBHOOK_RETRY_BASE_SECONDS: float = Field(env="WEBHOOK_RETRY_BASE_SECONDS", default=5.0)
+    WEBHOOK_RETRY_MAX_SECONDS: float = Field(env="WEBHOOK_RETRY_MAX_SECONDS", default=3600.0)
+    # Nothing is deleted unless a retention period is set for the deployment.
+    RETENTION_RESULTS_DAYS: int | None = Field(env="RETENTION_RESULTS_DAYS", default=None)
+    RETENTION_UPLOADS_DAYS: int | None = Field(env="RETENTION_UPLOADS_DAYS", default=None)
+    RETENTION_INTERVAL_SECONDS: float = Field(env="RETENTION_INTERVAL_SECONDS", default=21600.0)
+    RETENTION_PARTITIONS_AHEAD: int = Field(env="RETENTION_PARTITIONS_AHEAD", default=3)
+    RETENTION_DELETE_BATCH: int = Field(env="RETENTION_DELETE_BATCH", default=1000)
     API_HOST: str = Field(env="API_HOST", default="0.0.0.0")
     API_PORT: int = Field(env="API_PORT", default=8000)
     SUMMARY_PROMPT: str = Field(
@@ -72,8 +190,98 @@ class BaseConfig(BaseSettings):
         env="PEOPLE_COUNT_PROMPT",
         default="Сколько уникальных людей на изображении? Ответь только числом.",
     )
+    PROMPT_MODE: PromptMode = Field(env="PROMPT_MODE", default=PromptMode.SEPARATE)
+    COMBINED_PROMPT: str = Field(
+        env="COMBINED_PROMPT",
+        default=(
+            "Опиши подробно сцену на кадре, перечисли действия людей, и посчитай "
+            "уникальных людей. Ответь только JSON-объектом вида "
+            '{"summary": "<описание>", "people_count": <целое число>}.'
+        ),
+    )
+    BATCH_PROMPT: str = Field(
+        env="BATCH_PROMPT",
+        default=(
+            "Перед тобой несколько кадров одного видео, каждый подписан номером и временем. "
+            "Опиши каждый кадр и действия людей на нём, посчитай людей на каждом кадре и "
+            "уникальных людей на всех кадрах вместе. Ответь только JSON-объектом вида "
+            '{"frames": [{"index": <номер кадра>, "summary": "<описание>", '
+            '"people_count": <целое число>}], "summary": "<общее описание>", '
+            '"unique_people": <целое число>}.'
+        ),
+    )
+    PROVIDER_BATCH_MAX_IMAGES: int = Field(env="PROVIDER_BATCH_MAX_IMAGES", default=8)
+    PROVIDER_BATCH_MAX_PAYLOAD_KB: int = Field(env="PROVIDER_BATCH_MAX_PAYLOAD_KB", default=4096)
     METRICS_NAMESPACE: str = Field(env="METRICS_NAMESPACE", default="tsos")
 
+    PEOPLE_COUNT_SOURCE: PeopleCountSource = Field(
+        env="PEOPLE_COUNT_SOURCE",
+        default=PeopleCountSource.PROVIDER,
+    )
+    TRACKING_ENABLED: bool = Field(env="TRACKING_ENABLED", default=False)
+    TRACKING_SAMPLE_FPS: float = Field(env="TRACKING_SAMPLE_FPS", default=2.0)
+    TRACKING_MIN_HITS: int = Field(env="TRACKING_MIN_HITS", default=2)
+
+    ANALYSIS_PROFILE: AnalysisProfile = Field(
+        env="ANALYSIS_PROFILE",
+        default=AnalysisProfile.FULL,
+    )
+    TRIGGER_RULES: list[str] = Field(env="TRIGGER_RULES", default=[])
+
+    PROGRESSIVE_TIME_BUDGET_SECONDS: float = Field(
+        env="PROGRESSIVE_TIME_BUDGET_SECONDS",
+        default=60.0,
+    )
+    PROGRESSIVE_COARSE_INTERVAL_SECONDS: float = Field(
+        env="PROGRESSIVE_COARSE_INTERVAL_SECONDS",
+        default=5.0,
+    )
+    PROGRESSIVE_COARSE_FRAMES: int = Field(env="PROGRESSIVE_COARSE_FRAMES", default=3)
+    PROGRESSIVE_REFINE_INTERVAL_SECONDS: float = Field(
+        env="PROGRESSIVE_REFINE_INTERVAL_SECONDS",
+        default=0.5,
+    )
+    PROGRESSIVE_REFINE_FRAMES: int = Field(env="PROGRESSIVE_REFINE_FRAMES", default=2)
+    PROGRESSIVE_MAX_FRAMES: int = Field(env="PROGRESSIVE_MAX_FRAMES", default=12)
+
+    LIVE_SOURCE_DIR: str = Field(env="LIVE_SOURCE_DIR", default="media/live")
+    LIVE_SAMPLE_FPS: float = Field(env="LIVE_SAMPLE_FPS", default=2.0)
+    LIVE_FRAME_WIDTH: int = Field(env="LIVE_FRAME_WIDTH", default=640)
+    LIVE_FRAME_HEIGHT: int = Field(env="LIVE_FRAME_HEIGHT", default=360)
+    LIVE_WINDOW_SECONDS: float = Field(env="LIVE_WINDOW_SECONDS", default=10.0)
+    LIVE_IDLE_TIMEOUT_SECONDS: float = Field(env="LIVE_IDLE_TIMEOUT_SECONDS", default=30.0)
+    LIVE_SUMMARY_WINDOWS: int = Field(env="LIVE_SUMMARY_WINDOWS", default=5)
+
+    PROXY_ENABLED: bool = Field(env="PROXY_ENABLED", default=False)
+    PROXY_MIN_SOURCE_MB: float = Field(env="PROXY_MIN_SOURCE_MB", default=50.0)
+    PROXY_WIDTH: int = Field(env="PROXY_WIDTH", default=640)
+    PROXY_FPS: float = Field(env="PROXY_FPS", default=5.0)
+    PROXY_KEYINT: int = Field(env="PROXY_KEYINT", default=5)
+    PROXY_PRESET: str = Field(env="PROXY_PRESET", default="ultrafast")
+    PROXY_CRF: int = Field(env="PROXY_CRF", default=28)
+    PROXY_MAX_DISK_MB: int = Field(env="PROXY_MAX_DISK_MB", default=2048)
+    FFMPEG_MAX_CONCURRENCY: int = Field(env="FFMPEG_MAX_CONCURRENCY", default=2)
+    FFMPEG_TIMEOUT_SECONDS: float = Field(env="FFMPEG_TIMEOUT_SECONDS", default=600.0)
+    FFMPEG_PROBE_TIMEOUT_SECONDS: float = Field(env="FFMPEG_PROBE_TIMEOUT_SECONDS", default=15.0)
+    PROVIDER_CONCURRENCY: int = Field(env="PROVIDER_CONCURRENCY", default=4)
+    HTTP_POOL_LIMIT: int = Field(env="HTTP_POOL_LIMIT", default=100)
+    HTTP_POOL_LIMIT_PER_HOST: int = Field(env="HTTP_POOL_LIMIT_PER_HOST", default=10)
+    HTTP_KEEPALIVE_SECONDS: float = Field(env="HTTP_KEEPALIVE_SECONDS", default=30.0)
+    HTTP_DNS_CACHE_TTL_SECONDS: int = Field(env="HTTP_DNS_CACHE_TTL_SECONDS", default=300)
+    RATE_LIMIT_ENABLED: bool = Field(env="RATE_LIMIT_ENABLED", default=True)
+    RATE_LIMIT_STORE: RateLimitStore = Field(env="RATE_LIMIT_STORE", default=RateLimitStore.LOCAL)
+    RATE_LIMIT_REQUESTS_PER_MINUTE: float = Field(
+        env="RATE_LIMIT_REQUESTS_PER_MINUTE", default=20.0
+    )
+    RATE_LIMIT_BURST: int = Field(env="RATE_LIMIT_BURST", default=5)
+    RESPONSE_CACHE_ENABLED: bool = Field(env="RESPONSE_CACHE_ENABLED", default=True)
+    RESPONSE_CACHE_PATH: str = Field(
+        env="RESPONSE_CACHE_PATH", default="media/cache/responses.sqlite3"
+    )
+    RESPONSE_CACHE_MEMORY_ENTRIES: int = Field(env="RESPONSE_CACHE_MEMORY_ENTRIES", default=1024)
+    RESPONSE_CACHE_TTL_SECONDS: float = Field(env="RESPONSE_CACHE_TTL_SECONDS", default=604800.0)
+    RESPONSE_CACHE_MAX_MB: int = Field(env="RESPONSE_CACHE_MAX_MB", default=256)
+
     class Config:
         env_file: ClassVar[str] = ".env"
         env_file_encoding: ClassVar[str] = "utf-8"
@@ -89,6 +297,11 @@ class BaseConfig(BaseSettings):
     def _validate_csrf_trusted_origins(cls, value: str | list[str]) -> list[str]:
         return _parse_list(value)
 
+    @field_validator("WEBHOOK_ALLOWED_HOSTS", mode="before")
+    @classmethod
+    def _validate_webhook_allowed_hosts(cls, value: str | list[str]) -> list[str]:
+        return [host.lower() for host in _parse_list(value)]
+
     @property
     def database_url(self) -> str:
         return (
@@ -96,6 +309,13 @@ class BaseConfig(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}"
+            f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        )
+
 
 class LocalConfig(BaseConfig):
     DEBUG: bool = True
@@ -140,7 +360,9 @@ def get_settings(env: str | None = None) -> ConfigUnion:
 
 
 __all__ = [
+    "AnalysisProfile",
     "EnvironmentType",
+    "PeopleCountSource",
     "BaseConfig",
     "LocalConfig",
     "DevConfig",
@@ -1,9 +1,16 @@
-from .aiohttp_adapter import AioHttpAdapter, AioHttpAdapterError
+from .aiohttp_adapter import (
+    AioHttpAdapter,
+    AioHttpAdapterError,
+    close_shared_adapter,
+    get_shared_adapter,
+)
 from .ffmpeg_helper import FFmpegError, FFmpegVideoHelper
 
 __all__ = [
     "AioHttpAdapter",
     "AioHttpAdapterError",
+    "close_shared_adapter",
+    "get_shared_adapter",
     "FFmpegVideoHelper",
     "FFmpegError",
 ]
@@ -1,28 +1,173 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Mapping, Optional
+import json as jsonlib
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Mapping, Optional
 
 import aiohttp
+from aiohttp.abc import AbstractResolver
 
 from src.logger import get_logger
 from src.schemes import ErrorCode
+from src.settings import get_settings
 
 logger = get_logger(__name__)
 
 
 class AioHttpAdapterError(RuntimeError):
-    def __init__(self, code: ErrorCode, message: str, *, status: int | None = None):
+    def __init__(
+        self,
+        code: ErrorCode,
+        message: str,
+        *,
+        status: int | None = None,
+        headers: Mapping[str, str] | None = None,
+    ):
         self.code = code
         self.status = status
+        self.headers = headers or {}
         super().__init__(message)
 
 
+@dataclass
+class JsonResponse:
+    payload: Any
+    status: int
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class StreamResponse:
+    """An open ``text/event-stream`` response; iterate :meth:`events` for its payloads."""
+
+    status: int
+    headers: Mapping[str, str]
+    _response: aiohttp.ClientResponse = field(repr=False)
+
+    async def events(self) -> AsyncIterator[Any]:
+        """JSON payloads of the ``data:`` fields, until ``[DONE]`` or end of stream.
+
+        Comment lines (``: keep-alive``) and other fields are skipped; a
+        multi-line ``data`` field is joined before decoding.
+        """
+
+        data: list[str] = []
+        async for raw in self._response.content:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+            elif not line and data:
+                text, data = "\n".join(data), []
+                if text == "[DONE]":
+                    return
+                yield _decode_event(text)
+        if data and data != ["[DONE]"]:
+            yield _decode_event("\n".join(data))
+
+
+def _decode_event(text: str) -> Any:
+    try:
+        return jsonlib.loads(text)
+    except ValueError as exc:
+        logger.error("Failed to decode stream event: %s", exc)
+        raise AioHttpAdapterError(
+            ErrorCode.AI_PROVIDER_UNAVAILABLE,
+            "Invalid stream payload",
+        ) from exc
+
+
+def _pool_trace_config() -> aiohttp.TraceConfig:
+    # Imported lazily: src.services pulls in the providers built on this adapter.
+    from src.services.metrics import HTTP_CONNECTIONS_CREATED, HTTP_CONNECTIONS_REUSED
+
+    async def on_connection_create_end(session, context, params) -> None:
+        HTTP_CONNECTIONS_CREATED.inc()
+
+    async def on_connection_reuseconn(session, context, params) -> None:
+        HTTP_CONNECTIONS_REUSED.inc()
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+
 class AioHttpAdapter:
-    def __init__(self, *, timeout: float = 30.0, max_retries: int = 0, retry_delay: float = 0.5):
+    """JSON-over-HTTP client backed by one long-lived pooled session.
+
+    The session is created lazily on the running event loop and reused for
+    every request, keeping TCP/TLS connections alive and DNS answers cached.
+    A session belongs to its loop, so a call from a different loop replaces
+    it. Call :meth:`start` and :meth:`close` from the application lifecycle.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30.0,
+        max_retries: int = 0,
+        retry_delay: float = 0.5,
+        pool_limit: Optional[int] = None,
+        pool_limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        dns_cache_ttl: Optional[int] = None,
+        resolver: Optional[AbstractResolver] = None,
+    ):
+        settings = get_settings()
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.pool_limit = pool_limit or settings.HTTP_POOL_LIMIT
+        self.pool_limit_per_host = pool_limit_per_host or settings.HTTP_POOL_LIMIT_PER_HOST
+        self.keepalive_timeout = keepalive_timeout or settings.HTTP_KEEPALIVE_SECONDS
+        self.dns_cache_ttl = dns_cache_ttl or settings.HTTP_DNS_CACHE_TTL_SECONDS
+        self.resolver = resolver
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        await self._get_session()
+
+    async def close(self) -> None:
+        session, loop = self._session, self._session_loop
+        self._session = None
+        self._session_loop = None
+        if session is None or session.closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await session.close()
+        elif loop is not None and loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+        else:
+            session.detach()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._session
+        if session is not None and not session.closed and self._session_loop is loop:
+            return session
+        if session is not None and not session.closed:
+            logger.debug("Event loop changed, replacing pooled HTTP session")
+            await self.close()
+
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_limit,
+            limit_per_host=self.pool_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            resolver=self.resolver,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[_pool_trace_config()],
+        )
+        self._session_loop = loop
+        return self._session
 
     async def _request(
         self,
@@ -31,30 +176,41 @@ class AioHttpAdapter:
         *,
         headers: Optional[Mapping[str, str]] = None,
         json: Any = None,
-    ) -> dict[str, Any]:
+        timeout: Optional[float] = None,
+    ) -> JsonResponse:
+        from src.services.metrics import HTTP_REQUEST_TIME, HTTP_REQUESTS_IN_FLIGHT
+
+        # Omitting ``timeout`` keeps the session default; ``None`` would disable it.
+        options: dict[str, Any] = {}
+        if timeout:
+            options["timeout"] = aiohttp.ClientTimeout(total=timeout)
         attempt = 0
 
         while True:
             attempt += 1
+            started = time.perf_counter()
+            HTTP_REQUESTS_IN_FLIGHT.inc()
             try:
-                timeout = aiohttp.ClientTimeout(total=self.timeout)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.request(method, url, headers=headers, json=json) as response:
-                        payload = await response.json(content_type=None)
-                        if response.status >= 400:
-                            logger.error(
-                                "HTTP error from %s %s status=%s body=%s",
-                                method,
-                                url,
-                                response.status,
-                                payload,
-                            )
-                            raise AioHttpAdapterError(
-                                ErrorCode.AI_PROVIDER_UNAVAILABLE,
-                                f"HTTP {response.status} error",
-                                status=response.status,
-                            )
-                        return payload
+                session = await self._get_session()
+                async with session.request(
+                    method, url, headers=headers, json=json, **options
+                ) as response:
+                    payload = await response.json(content_type=None)
+                    if response.status >= 400:
+                        logger.error(
+                            "HTTP error from %s %s status=%s body=%s",
+                            method,
+                            url,
+                            response.status,
+                            payload,
+                        )
+                        raise AioHttpAdapterError(
+                            ErrorCode.AI_PROVIDER_UNAVAILABLE,
+                            f"HTTP {response.status} error",
+                            status=response.status,
+                            headers=response.headers.copy(),
+                        )
+                    return JsonResponse(payload, response.status, response.headers.copy())
             except asyncio.TimeoutError as exc:
                 logger.warning("Request to %s timed out: %s", url, exc)
                 error = AioHttpAdapterError(
@@ -73,8 +229,9 @@ class AioHttpAdapter:
                     ErrorCode.AI_PROVIDER_UNAVAILABLE,
                     "Invalid response payload",
                 ) from exc
-            else:
-                return  # pragma: no cover
+            finally:
+                HTTP_REQUESTS_IN_FLIGHT.dec()
+                HTTP_REQUEST_TIME.observe(time.perf_counter() - started)
 
             if attempt > self.max_retries:
                 raise error
@@ -87,8 +244,148 @@ class AioHttpAdapter:
         *,
         headers: Optional[Mapping[str, str]] = None,
         json: Any = None,
+        timeout: Optional[float] = None,
     ) -> dict[str, Any]:
-        return await self._request("POST", url, headers=headers, json=json)
+        response = await self._request("POST", url, headers=headers, json=json, timeout=timeout)
+        return response.payload
+
+    async def post_json(
+        self,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+    ) -> JsonResponse:
+        """Like :meth:`post`, but also returns the status and response headers."""
+
+        return await self._request("POST", url, headers=headers, json=json, timeout=timeout)
+
+    async def post_data(
+        self,
+        url: str,
+        *,
+        data: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """POST a prepared body once and return the status; the response body is ignored.
+
+        For callers that sign the exact bytes they send. Redirects are not
+        followed and any non-2xx status raises :class:`AioHttpAdapterError`.
+        """
+
+        from src.services.metrics import HTTP_REQUEST_TIME, HTTP_REQUESTS_IN_FLIGHT
+
+        options: dict[str, Any] = {}
+        if timeout:
+            options["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            session = await self._get_session()
+            async with session.post(
+                url, data=data, headers=headers, allow_redirects=False, **options
+            ) as response:
+                await response.read()
+                if not 200 <= response.status < 300:
+                    raise AioHttpAdapterError(
+                        ErrorCode.UNKNOWN,
+                        f"HTTP {response.status} error",
+                        status=response.status,
+                        headers=response.headers.copy(),
+                    )
+                return response.status
+        except asyncio.TimeoutError as exc:
+            raise AioHttpAdapterError(ErrorCode.UNKNOWN, "Request timed out") from exc
+        except aiohttp.ClientError as exc:
+            raise AioHttpAdapterError(ErrorCode.UNKNOWN, "Network error") from exc
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_TIME.observe(time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def post_stream(
+        self,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[StreamResponse]:
+        """POST expecting server-sent events; the response stays open inside the block.
+
+        Not retried: part of the stream may already have been consumed.
+        Timeouts and network errors while reading are raised as
+        :class:`AioHttpAdapterError` like for :meth:`post`.
+        """
+
+        from src.services.metrics import HTTP_REQUEST_TIME, HTTP_REQUESTS_IN_FLIGHT
+
+        options: dict[str, Any] = {}
+        if timeout:
+            options["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            session = await self._get_session()
+            async with session.post(url, headers=headers, json=json, **options) as response:
+                if response.status >= 400:
+                    body = await response.text()
+                    logger.error(
+                        "HTTP error from POST %s status=%s body=%s", url, response.status, body
+                    )
+                    raise AioHttpAdapterError(
+                        ErrorCode.AI_PROVIDER_UNAVAILABLE,
+                        f"HTTP {response.status} error",
+                        status=response.status,
+                        headers=response.headers.copy(),
+                    )
+                yield StreamResponse(response.status, response.headers.copy(), response)
+        except asyncio.TimeoutError as exc:
+            logger.warning("Stream from %s timed out: %s", url, exc)
+            raise AioHttpAdapterError(
+                ErrorCode.AI_PROVIDER_TIMEOUT,
+                "Request timed out",
+            ) from exc
+        except aiohttp.ClientError as exc:
+            logger.warning("Aiohttp client error %s: %s", url, exc)
+            raise AioHttpAdapterError(
+                ErrorCode.AI_PROVIDER_UNAVAILABLE,
+                "Network error",
+            ) from exc
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_TIME.observe(time.perf_counter() - started)
+
+
+_shared_adapter: Optional[AioHttpAdapter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_adapter() -> AioHttpAdapter:
+    """Process-wide adapter whose connection pool is shared by all provider clients."""
+
+    global _shared_adapter
+    with _shared_lock:
+        if _shared_adapter is None:
+            _shared_adapter = AioHttpAdapter(max_retries=2, retry_delay=1.0)
+        return _shared_adapter
+
+
+async def close_shared_adapter() -> None:
+    global _shared_adapter
+    with _shared_lock:
+        adapter, _shared_adapter = _shared_adapter, None
+    if adapter is not None:
+        await adapter.close()
 
 
-__all__ = ["AioHttpAdapter", "AioHttpAdapterError"]
+__all__ = [
+    "AioHttpAdapter",
+    "AioHttpAdapterError",
+    "JsonResponse",
+    "StreamResponse",
+    "close_shared_adapter",
+    "get_shared_adapter",
+]
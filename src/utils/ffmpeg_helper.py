@@ -1,15 +1,34 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import os
+import re
+import signal
+import subprocess
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Callable, Generic, Optional, Sequence, TypeVar
 
 import ffmpeg
 
 from src.logger import get_logger
 from src.schemes import ErrorCode
+from src.settings import get_settings
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+ProgressCallback = Callable[[float], None]
+
+_PROGRESS_RE = re.compile(r"time=\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+_LINE_SPLIT_RE = re.compile(rb"[\r\n]")
+_STDERR_TAIL_LINES = 20
+
 
 class FFmpegError(RuntimeError):
     def __init__(self, code: ErrorCode, message: str, *, detail: str | None = None):
@@ -18,19 +37,146 @@ class FFmpegError(RuntimeError):
         super().__init__(message)
 
 
+@dataclass
+class FrameBatch:
+    """Result of :meth:`FFmpegVideoHelper.extract_frames`.
+
+    ``frames`` follows the order of the requested timestamps; timestamps past
+    the end of the video are left out and timestamps that land on the same
+    decoded frame share its file.
+    """
+
+    frames: list[tuple[float, Path]] = field(default_factory=list)
+    sprites: list[Path] = field(default_factory=list)
+    # ``(timestamp, sheet, column, row)`` for every frame, when both frames and
+    # sprites were extracted.
+    tiles: list[tuple[float, Path, int, int]] = field(default_factory=list)
+
+
+@dataclass
+class _Job(Generic[T]):
+    args: list[str]
+    operation: str
+    finish: Callable[[bytes], T]
+    capture_stdout: bool = False
+    timeout: Optional[float] = None
+
+
+class _ProcessSlots:
+    """Process-wide cap on concurrently running ffmpeg/ffprobe processes.
+
+    An awaitable semaphore that is not bound to one event loop: blocking
+    helpers run their own loop, so waiters are futures on their own loops,
+    woken in FIFO order by :meth:`release` without polling.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(limit, 1)
+        self._free = self.limit
+        self._lock = threading.Lock()
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = deque()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter not in self._waiters
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                # release() handed the slot over just as we were cancelled.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(_grant, future)
+                except RuntimeError:
+                    # The waiter's loop is closed; the slot goes to the next one.
+                    continue
+                return
+            self._free += 1
+
+
+def _grant(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_slots: Optional[_ProcessSlots] = None
+_slots_lock = threading.Lock()
+
+
+def _process_slots() -> _ProcessSlots:
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = _ProcessSlots(get_settings().FFMPEG_MAX_CONCURRENCY)
+        return _slots
+
+
+def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def parse_progress(line: str) -> Optional[float]:
+    """Return the processed position in seconds from an ffmpeg stats line."""
+
+    match = _PROGRESS_RE.search(line)
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _select_expression(timestamps: Sequence[float]) -> str:
+    # Picks the first decoded frame at or after every timestamp; prev_t is NAN
+    # for the very first frame, which makes not(gte(...)) true. ``t`` must
+    # start at zero, see the setpts filter in _extract_frames_job.
+    return "+".join(f"gte(t,{ts:.3f})*not(gte(prev_t,{ts:.3f}))" for ts in timestamps)
+
+
+def sprite_tile(index: int, grid: tuple[int, int]) -> tuple[int, int, int]:
+    """Sheet, column and row of the ``index``-th selected frame in a ``(columns, rows)`` grid."""
+
+    columns, rows = grid
+    sheet, cell = divmod(index, columns * rows)
+    return sheet, cell % columns, cell // columns
+
+
 class FFmpegVideoHelper:
-    """Utility wrapper around python-ffmpeg for common video operations."""
+    """Utility wrapper around python-ffmpeg for common video operations.
+
+    Every operation has a blocking and an awaitable (``a``-prefixed) variant.
+    Both run ffmpeg as an asyncio subprocess in its own process group, limited
+    by ``FFMPEG_MAX_CONCURRENCY`` and killed when ``timeout`` (by default
+    ``FFMPEG_TIMEOUT_SECONDS``) expires. stderr is streamed: stats lines are
+    reported to ``on_progress`` in seconds and only the last lines are kept
+    for error details.
+    """
 
     def __init__(self) -> None:
         self._ffmpeg = ffmpeg
 
-    def probe(self, video_path: str) -> dict[str, Any]:
-        path = self._ensure_path(video_path)
-        try:
-            return self._ffmpeg.probe(str(path))
-        except ffmpeg.Error as exc:
-            logger.error("ffmpeg probe failed for %s: %s", path, exc.stderr)
-            raise FFmpegError(ErrorCode.VIDEO_DECODING_FAILED, "Failed to probe video.") from exc
+    def probe(self, video_path: str, *, timeout: Optional[float] = None) -> dict[str, Any]:
+        return self._run(self._probe_job(video_path, timeout))
+
+    async def aprobe(self, video_path: str, *, timeout: Optional[float] = None) -> dict[str, Any]:
+        return await self._arun(self._probe_job(video_path, timeout))
 
     def extract_frame(
         self,
@@ -40,18 +186,97 @@ class FFmpegVideoHelper:
         timestamp: float = 0.0,
         width: Optional[int] = None,
         height: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> Path:
-        path = self._ensure_path(video_path)
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
+        job = self._extract_frame_job(video_path, output_path, timestamp, width, height)
+        job.timeout = timeout
+        return self._run(job)
 
-        stream = self._ffmpeg.input(str(path), ss=timestamp)
-        if width or height:
-            stream = stream.filter("scale", width or -1, height or -1)
-        stream = stream.output(str(output), vframes=1)
+    async def aextract_frame(
+        self,
+        video_path: str,
+        output_path: str,
+        *,
+        timestamp: float = 0.0,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Path:
+        job = self._extract_frame_job(video_path, output_path, timestamp, width, height)
+        job.timeout = timeout
+        return await self._arun(job)
+
+    def extract_frames(
+        self,
+        video_path: str,
+        output_dir: str,
+        timestamps: Sequence[float],
+        *,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        prefix: str = "frame",
+        sprite_grid: Optional[tuple[int, int]] = None,
+        sprite_width: Optional[int] = None,
+        frames: bool = True,
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> FrameBatch:
+        """Extract frames at many timestamps with a single ffmpeg process.
 
-        self._run(stream, f"extract_frame {path.name}@{timestamp}s")
-        return output
+        The video is decoded once, up to the last timestamp, and a ``select``
+        filter keeps the first frame at or after each requested time. Files are
+        named by their presentation time in milliseconds, which maps them back
+        to the requested timestamps. With ``sprite_grid=(columns, rows)`` the
+        same selection is also tiled into sprite sheets in the same run, and
+        ``tiles`` tells where each frame sits in them.
+        """
+
+        job = self._extract_frames_job(
+            video_path,
+            output_dir,
+            timestamps,
+            width=width,
+            height=height,
+            prefix=prefix,
+            sprite_grid=sprite_grid,
+            sprite_width=sprite_width,
+            frames=frames,
+        )
+        if job is None:
+            return FrameBatch()
+        job.timeout = timeout
+        return self._run(job, on_progress)
+
+    async def aextract_frames(
+        self,
+        video_path: str,
+        output_dir: str,
+        timestamps: Sequence[float],
+        *,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        prefix: str = "frame",
+        sprite_grid: Optional[tuple[int, int]] = None,
+        sprite_width: Optional[int] = None,
+        frames: bool = True,
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> FrameBatch:
+        job = self._extract_frames_job(
+            video_path,
+            output_dir,
+            timestamps,
+            width=width,
+            height=height,
+            prefix=prefix,
+            sprite_grid=sprite_grid,
+            sprite_width=sprite_width,
+            frames=frames,
+        )
+        if job is None:
+            return FrameBatch()
+        job.timeout = timeout
+        return await self._arun(job, on_progress)
 
     def transcode(
         self,
@@ -62,21 +287,62 @@ class FFmpegVideoHelper:
         audio_codec: Optional[str] = "aac",
         crf: int = 23,
         preset: str = "medium",
+        width: Optional[int] = None,
+        fps: Optional[float] = None,
+        keyint: Optional[int] = None,
+        tune: Optional[str] = None,
+        drop_audio: bool = False,
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
     ) -> Path:
-        path = self._ensure_path(video_path)
-        output = Path(output_path)
-        output.parent.mkdir(parents=True, exist_ok=True)
+        job = self._transcode_job(
+            video_path,
+            output_path,
+            video_codec=video_codec,
+            audio_codec=audio_codec,
+            crf=crf,
+            preset=preset,
+            width=width,
+            fps=fps,
+            keyint=keyint,
+            tune=tune,
+            drop_audio=drop_audio,
+        )
+        job.timeout = timeout
+        return self._run(job, on_progress)
 
-        stream = self._ffmpeg.input(str(path))
-        stream = stream.output(
-            str(output),
-            vcodec=video_codec,
-            acodec=audio_codec if audio_codec else "copy",
+    async def atranscode(
+        self,
+        video_path: str,
+        output_path: str,
+        *,
+        video_codec: str = "libx264",
+        audio_codec: Optional[str] = "aac",
+        crf: int = 23,
+        preset: str = "medium",
+        width: Optional[int] = None,
+        fps: Optional[float] = None,
+        keyint: Optional[int] = None,
+        tune: Optional[str] = None,
+        drop_audio: bool = False,
+        timeout: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Path:
+        job = self._transcode_job(
+            video_path,
+            output_path,
+            video_codec=video_codec,
+            audio_codec=audio_codec,
             crf=crf,
             preset=preset,
+            width=width,
+            fps=fps,
+            keyint=keyint,
+            tune=tune,
+            drop_audio=drop_audio,
         )
-        self._run(stream, f"transcode {path.name} -> {output.suffix}")
-        return output
+        job.timeout = timeout
+        return await self._arun(job, on_progress)
 
     def clip_segment(
         self,
@@ -85,29 +351,381 @@ class FFmpegVideoHelper:
         *,
         start: float,
         duration: float,
+        timeout: Optional[float] = None,
+    ) -> Path:
+        job = self._clip_segment_job(video_path, output_path, start, duration)
+        job.timeout = timeout
+        return self._run(job)
+
+    async def aclip_segment(
+        self,
+        video_path: str,
+        output_path: str,
+        *,
+        start: float,
+        duration: float,
+        timeout: Optional[float] = None,
     ) -> Path:
+        job = self._clip_segment_job(video_path, output_path, start, duration)
+        job.timeout = timeout
+        return await self._arun(job)
+
+    @asynccontextmanager
+    async def aopen_frame_stream(
+        self,
+        source: str,
+        *,
+        width: int,
+        height: int,
+        fps: float,
+        follow: bool = False,
+        idle_timeout: Optional[float] = None,
+    ) -> AsyncIterator[asyncio.subprocess.Process]:
+        """Run ffmpeg decoding ``source`` into raw BGR24 frames on stdout.
+
+        With ``follow`` the file protocol keeps reading past the current end of
+        a file that is still being written; ``idle_timeout`` ends the stream once
+        no new data arrived for that many seconds. Like every other operation the
+        stream holds an ``FFMPEG_MAX_CONCURRENCY`` slot and runs in its own
+        process group, which is killed when the context exits.
+        """
+
+        path = self._ensure_path(source)
+        input_kwargs: dict[str, Any] = {}
+        if follow:
+            input_kwargs["follow"] = 1
+        if idle_timeout:
+            input_kwargs["rw_timeout"] = int(idle_timeout * 1_000_000)
+
+        stream = self._ffmpeg.input(f"file:{path}", **input_kwargs)
+        stream = stream.filter("fps", fps=fps).filter("scale", width, height)
+        stream = stream.output("pipe:", format="rawvideo", pix_fmt="bgr24")
+        stream = stream.global_args("-loglevel", "error")
+        args = self._compile(stream)
+
+        slots = _process_slots()
+        await slots.acquire()
+        try:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    start_new_session=True,
+                )
+            except OSError as exc:
+                raise FFmpegError(
+                    ErrorCode.VIDEO_DECODING_FAILED,
+                    "Failed to start ffmpeg frame stream.",
+                    detail=str(exc),
+                ) from exc
+            logger.info("ffmpeg frame stream opened for %s (follow=%s)", path.name, follow)
+            try:
+                yield process
+            finally:
+                if process.returncode is None:
+                    _kill_process_group(process)
+                await process.wait()
+        finally:
+            slots.release()
+
+    def _probe_job(self, video_path: str, timeout: Optional[float]) -> _Job[dict[str, Any]]:
+        path = self._ensure_path(video_path)
+        args = ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json"]
+        return _Job(
+            args=[*args, str(path)],
+            operation=f"probe {path.name}",
+            finish=lambda stdout: json.loads(stdout.decode("utf-8") or "{}"),
+            capture_stdout=True,
+            timeout=timeout or get_settings().FFMPEG_PROBE_TIMEOUT_SECONDS,
+        )
+
+    def _extract_frame_job(
+        self,
+        video_path: str,
+        output_path: str,
+        timestamp: float,
+        width: Optional[int],
+        height: Optional[int],
+    ) -> _Job[Path]:
+        path = self._ensure_path(video_path)
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        stream = self._ffmpeg.input(str(path), ss=timestamp)
+        if width or height:
+            stream = stream.filter("scale", width or -1, height or -1)
+        stream = stream.output(str(output), vframes=1)
+
+        return _Job(
+            args=self._compile(stream),
+            operation=f"extract_frame {path.name}@{timestamp}s",
+            finish=lambda _: output,
+        )
+
+    def _extract_frames_job(
+        self,
+        video_path: str,
+        output_dir: str,
+        timestamps: Sequence[float],
+        *,
+        width: Optional[int],
+        height: Optional[int],
+        prefix: str,
+        sprite_grid: Optional[tuple[int, int]],
+        sprite_width: Optional[int],
+        frames: bool,
+    ) -> Optional[_Job[FrameBatch]]:
+        path = self._ensure_path(video_path)
+        directory = Path(output_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        wanted = sorted({max(float(ts), 0.0) for ts in timestamps})
+        if not wanted or not (frames or sprite_grid):
+            return None
+
+        source = self._ffmpeg.input(str(path), t=wanted[-1] + 1.0)
+        # Streams often start at a non-zero PTS (MPEG-TS, trimmed MP4s);
+        # requested times and output file names are relative to the start.
+        selected = source.video.filter("setpts", "PTS-STARTPTS").filter(
+            "select", _select_expression(wanted)
+        )
+        if width or height:
+            selected = selected.filter("scale", width or -1, height or -1)
+
+        branches = []
+        if frames and sprite_grid:
+            split = selected.split()
+            frame_branch, sprite_branch = split[0], split[1]
+        else:
+            frame_branch = sprite_branch = selected
+
+        if frames:
+            branches.append(
+                frame_branch.output(
+                    str(directory / f"{prefix}_%d.jpg"),
+                    fps_mode="passthrough",
+                    enc_time_base="1/1000",
+                    frame_pts=1,
+                )
+            )
+        if sprite_grid:
+            columns, rows = sprite_grid
+            if sprite_width:
+                sprite_branch = sprite_branch.filter("scale", sprite_width, -2)
+            sprite_branch = sprite_branch.filter("tile", f"{columns}x{rows}")
+            branches.append(
+                sprite_branch.output(
+                    str(directory / f"{prefix}_sprite_%d.jpg"),
+                    fps_mode="passthrough",
+                )
+            )
+
+        stream = self._ffmpeg.merge_outputs(*branches) if len(branches) > 1 else branches[0]
+
+        def collect(_: bytes) -> FrameBatch:
+            batch = FrameBatch()
+            if frames:
+                pattern = re.compile(rf"^{re.escape(prefix)}_(\d+)\.jpg$")
+                extracted = sorted(
+                    (int(match.group(1)), item)
+                    for item in directory.iterdir()
+                    if (match := pattern.match(item.name))
+                )
+                for ts in timestamps:
+                    target = round(max(float(ts), 0.0) * 1000) - 1
+                    index = next(
+                        (index for index, (pts, _) in enumerate(extracted) if pts >= target),
+                        None,
+                    )
+                    if index is None:
+                        continue
+                    batch.frames.append((float(ts), extracted[index][1]))
+                    if sprite_grid:
+                        sheet, column, row = sprite_tile(index, sprite_grid)
+                        sheet_path = directory / f"{prefix}_sprite_{sheet + 1}.jpg"
+                        batch.tiles.append((float(ts), sheet_path, column, row))
+            if sprite_grid:
+                batch.sprites = sorted(
+                    directory.glob(f"{prefix}_sprite_*.jpg"),
+                    key=lambda item: int(item.stem.rsplit("_", 1)[1]),
+                )
+            return batch
+
+        return _Job(
+            args=self._compile(stream),
+            operation=f"extract_frames {path.name} x{len(wanted)}",
+            finish=collect,
+        )
+
+    def _transcode_job(
+        self,
+        video_path: str,
+        output_path: str,
+        *,
+        video_codec: str,
+        audio_codec: Optional[str],
+        crf: int,
+        preset: str,
+        width: Optional[int],
+        fps: Optional[float],
+        keyint: Optional[int],
+        tune: Optional[str],
+        drop_audio: bool,
+    ) -> _Job[Path]:
+        path = self._ensure_path(video_path)
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        output_kwargs: dict[str, Any] = {
+            "vcodec": video_codec,
+            "crf": crf,
+            "preset": preset,
+        }
+        filters = []
+        if fps:
+            filters.append(f"fps={fps}")
+        if width:
+            filters.append(f"scale={width}:-2")
+        if filters:
+            output_kwargs["vf"] = ",".join(filters)
+        if keyint:
+            output_kwargs["g"] = keyint
+            output_kwargs["keyint_min"] = keyint
+        if tune:
+            output_kwargs["tune"] = tune
+        if drop_audio:
+            output_kwargs["an"] = None
+        else:
+            output_kwargs["acodec"] = audio_codec if audio_codec else "copy"
+
+        stream = self._ffmpeg.input(str(path))
+        stream = stream.output(str(output), **output_kwargs)
+        return _Job(
+            args=self._compile(stream),
+            operation=f"transcode {path.name} -> {output.suffix}",
+            finish=lambda _: output,
+        )
+
+    def _clip_segment_job(
+        self,
+        video_path: str,
+        output_path: str,
+        start: float,
+        duration: float,
+    ) -> _Job[Path]:
         path = self._ensure_path(video_path)
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
 
         stream = self._ffmpeg.input(str(path), ss=start, t=duration)
         stream = stream.output(str(output), c="copy")
-        self._run(stream, f"clip {path.name} {start}-{start + duration}s")
-        return output
+        return _Job(
+            args=self._compile(stream),
+            operation=f"clip {path.name} {start}-{start + duration}s",
+            finish=lambda _: output,
+        )
+
+    def _compile(self, stream: ffmpeg.nodes.FilterableStream) -> list[str]:
+        command, *args = self._ffmpeg.compile(stream, overwrite_output=True)
+        return [command, "-hide_banner", *args]
+
+    def _run(self, job: _Job[T], on_progress: Optional[ProgressCallback] = None) -> T:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._arun(job, on_progress))
+        raise RuntimeError(
+            f"ffmpeg {job.operation} called from a running event loop; "
+            "use the awaitable variant instead."
+        )
 
-    def _run(self, stream: ffmpeg.nodes.FilterableStream, operation: str) -> None:
+    async def _arun(self, job: _Job[T], on_progress: Optional[ProgressCallback] = None) -> T:
+        timeout = job.timeout or get_settings().FFMPEG_TIMEOUT_SECONDS
+        slots = _process_slots()
+        await slots.acquire()
         try:
-            stream.run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
-            logger.info("ffmpeg %s completed.", operation)
-        except ffmpeg.Error as exc:
-            detail = exc.stderr.decode("utf-8", errors="ignore") if exc.stderr else None
-            logger.error("ffmpeg %s failed: %s", operation, detail)
+            returncode, stdout, tail = await self._execute(job, timeout, on_progress)
+        finally:
+            slots.release()
+
+        if returncode != 0:
+            detail = "\n".join(tail) or None
+            logger.error("ffmpeg %s failed (exit %s): %s", job.operation, returncode, detail)
             raise FFmpegError(
                 ErrorCode.VIDEO_DECODING_FAILED,
-                f"FFmpeg failed to {operation}.",
+                f"FFmpeg failed to {job.operation}.",
                 detail=detail,
+            )
+        logger.info("ffmpeg %s completed.", job.operation)
+        return job.finish(stdout)
+
+    async def _execute(
+        self,
+        job: _Job[Any],
+        timeout: float,
+        on_progress: Optional[ProgressCallback],
+    ) -> tuple[int, bytes, deque[str]]:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *job.args,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE if job.capture_stdout else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+            )
+        except OSError as exc:
+            raise FFmpegError(
+                ErrorCode.VIDEO_DECODING_FAILED,
+                f"Failed to start ffmpeg to {job.operation}.",
+                detail=str(exc),
             ) from exc
 
+        tail: deque[str] = deque(maxlen=_STDERR_TAIL_LINES)
+
+        def handle_line(raw: bytes) -> None:
+            line = raw.decode("utf-8", errors="ignore").strip()
+            if not line:
+                return
+            position = parse_progress(line)
+            if position is None:
+                tail.append(line)
+            elif on_progress is not None:
+                on_progress(position)
+
+        async def read_stderr() -> None:
+            assert process.stderr is not None
+            pending = b""
+            while chunk := await process.stderr.read(4096):
+                *lines, pending = _LINE_SPLIT_RE.split(pending + chunk)
+                for line in lines:
+                    handle_line(line)
+            handle_line(pending)
+
+        async def read_stdout() -> bytes:
+            if process.stdout is None:
+                return b""
+            return await process.stdout.read()
+
+        async def communicate() -> tuple[bytes, int]:
+            stdout, _ = await asyncio.gather(read_stdout(), read_stderr())
+            return stdout, await process.wait()
+
+        try:
+            stdout, returncode = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            _kill_process_group(process)
+            await process.wait()
+            logger.error("ffmpeg %s killed after %gs timeout", job.operation, timeout)
+            raise FFmpegError(
+                ErrorCode.VIDEO_PROCESSING_TIMEOUT,
+                f"FFmpeg timed out after {timeout:g}s to {job.operation}.",
+                detail="\n".join(tail) or None,
+            ) from None
+        except BaseException:
+            _kill_process_group(process)
+            raise
+        return returncode, stdout, tail
+
     @staticmethod
     def _ensure_path(video_path: str) -> Path:
         path = Path(video_path)
@@ -119,4 +737,11 @@ class FFmpegVideoHelper:
         return path.resolve()
 
 
-__all__ = ["FFmpegVideoHelper", "FFmpegError"]
+__all__ = [
+    "FFmpegVideoHelper",
+    "FFmpegError",
+    "FrameBatch",
+    "ProgressCallback",
+    "parse_progress",
+    "sprite_tile",
+]
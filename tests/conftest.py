@@ -0,0 +1,33 @@
+from typing import Awaitable, Callable, Mapping
+
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@pytest_asyncio.fixture
+async def stub_server():
+    """Start local HTTP servers answering POSTs with the given handlers.
+
+    ``await stub_server({"/path": handler})`` returns the base URL
+    (``http://127.0.0.1:<port>``); the servers are closed after the test.
+    """
+
+    servers: list[TestServer] = []
+
+    async def start(routes: Mapping[str, Handler]) -> str:
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_post(path, handler)
+        server = TestServer(app, host="127.0.0.1")
+        servers.append(server)
+        await server.start_server()
+        return f"http://{server.host}:{server.port}"
+
+    try:
+        yield start
+    finally:
+        for server in servers:
+            await server.close()
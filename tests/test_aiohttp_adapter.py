@@ -0,0 +1,26 @@
+import pytest
+from aiohttp import web
+
+from src.services.metrics import HTTP_CONNECTIONS_CREATED, HTTP_CONNECTIONS_REUSED
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+@pytest.mark.asyncio
+async def test_adapter_reuses_pooled_connection(stub_server):
+    async def echo(request: web.Request) -> web.Response:
+        return web.json_response(await request.json())
+
+    base_url = await stub_server({"/echo": echo})
+
+    adapter = AioHttpAdapter()
+    created = HTTP_CONNECTIONS_CREATED._value.get()
+    reused = HTTP_CONNECTIONS_REUSED._value.get()
+    try:
+        for index in range(3):
+            payload = await adapter.post(f"{base_url}/echo", json={"n": index})
+            assert payload == {"n": index}
+    finally:
+        await adapter.close()
+
+    assert HTTP_CONNECTIONS_CREATED._value.get() - created == 1
+    assert HTTP_CONNECTIONS_REUSED._value.get() - reused == 2
@@ -4,7 +4,10 @@ import pytest
 from fastapi.testclient import TestClient
 
 from src.app import app
+from src.schemes import ErrorCode
+from src.services.media_info import MediaInfo
 from src.settings import get_settings
+from src.utils.ffmpeg_helper import FFmpegError
 
 DEFAULT_TOKEN = get_settings().SECRET_KEY
 
@@ -15,9 +18,16 @@ def client(monkeypatch):
     def fake_process(video_id: uuid.UUID):
         pass
 
+    # Ingest probing needs ffprobe; uploads in these tests are fake bytes
+    async def fake_probe(path: str) -> MediaInfo:
+        return MediaInfo(
+            codec="h264", width=640, height=360, fps=25.0, duration=4.0, total_frames=100
+        )
+
     from src.api.routes import analyze as analyze_module
 
     monkeypatch.setattr(analyze_module, "process_video_task", fake_process)
+    monkeypatch.setattr(analyze_module, "probe_media", fake_probe)
 
     return TestClient(app)
 
@@ -38,3 +48,71 @@ def test_metrics_endpoint(client):
     response = client.get("/metrics")
     assert response.status_code == 200
     assert "tsos_videos_processed_total" in response.text
+
+
+def test_analyze_rejects_invalid_trigger(client):
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("test.mp4", b"fake-binary", "video/mp4")},
+        data={"triggers": "people >> 3"},
+        headers={"Authorization": f"Bearer {DEFAULT_TOKEN}"},
+    )
+    assert response.status_code == 400
+    assert response.json()["code"] == "E300"
+
+
+def test_analyze_rejects_webhook_to_internal_address(client):
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("test.mp4", b"fake-binary", "video/mp4")},
+        data={"webhook_url": "http://169.254.169.254/latest/meta-data/"},
+        headers={"Authorization": f"Bearer {DEFAULT_TOKEN}"},
+    )
+    assert response.status_code == 400
+    assert response.json()["code"] == ErrorCode.INVALID_REQUEST.value
+
+
+def test_analyze_rejects_undecodable_file(client, monkeypatch):
+    async def failing_probe(path: str) -> MediaInfo:
+        raise FFmpegError(ErrorCode.VIDEO_DECODING_FAILED, "No video stream found.")
+
+    from src.api.routes import analyze as analyze_module
+
+    monkeypatch.setattr(analyze_module, "probe_media", failing_probe)
+    before = set(analyze_module.UPLOAD_DIR.iterdir())
+
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("test.mp4", b"fake-binary", "video/mp4")},
+        headers={"Authorization": f"Bearer {DEFAULT_TOKEN}"},
+    )
+    assert response.status_code == 422
+    assert response.json()["code"] == "E101"
+    assert set(analyze_module.UPLOAD_DIR.iterdir()) == before
+
+
+def test_task_list_cursor_round_trips_and_rejects_garbage(client):
+    from datetime import datetime
+
+    from src.api.routes.analyze import decode_cursor, encode_cursor
+    from src.models import Video
+
+    video = Video(id=uuid.uuid4(), created_at=datetime(2026, 10, 19, 12, 30, 1, 250))
+    assert decode_cursor(encode_cursor(video)) == (video.created_at, video.id)
+
+    response = client.get(
+        "/api/v1/tasks",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {DEFAULT_TOKEN}"},
+    )
+    assert response.status_code == 400
+    assert response.json()["code"] == ErrorCode.INVALID_REQUEST.value
+
+
+def test_task_lookup_requires_ids(client):
+    response = client.post(
+        "/api/v1/tasks/lookup",
+        json={"ids": []},
+        headers={"Authorization": f"Bearer {DEFAULT_TOKEN}"},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,73 @@
+import pytest
+from aiohttp import web
+
+from src.providers.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from src.providers.openrouter import OpenRouterClient
+from src.providers.rate_limit import LocalBucketStore, RateLimiter
+from src.providers.response_cache import ResponseCache
+from src.schemes import ErrorCode
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+def test_breaker_opens_probes_and_closes():
+    now = [0.0]
+    breaker = CircuitBreaker(
+        "p", window=10, min_calls=4, failure_rate=0.5, open_seconds=30, clock=lambda: now[0]
+    )
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_call()
+    assert raised.value.code == ErrorCode.AI_PROVIDER_UNAVAILABLE
+    assert raised.value.retry_after == 30
+
+    now[0] = 31.0
+    breaker.before_call()  # the single half-open probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    now[0] = 62.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.retry_after() == 0
+
+
+@pytest.mark.asyncio
+async def test_client_fails_fast_while_circuit_is_open(tmp_path, stub_server):
+    calls = 0
+
+    async def completions(request: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        return web.json_response({"error": "upstream down"}, status=503)
+
+    base_url = await stub_server({"/chat/completions": completions})
+
+    frame = tmp_path / "frame.jpg"
+    frame.write_bytes(b"jpeg-bytes")
+    adapter = AioHttpAdapter()
+    client = OpenRouterClient(
+        api_key="test",
+        base_url=f"{base_url}",
+        adapter=adapter,
+        cooldown_seconds=0.0,
+        rate_limiter=RateLimiter(LocalBucketStore(), requests_per_minute=6000, burst=10),
+        response_cache=ResponseCache(None),
+        circuit_breaker=CircuitBreaker("openrouter", min_calls=3, open_seconds=60),
+    )
+    try:
+        with pytest.raises(CircuitOpenError):
+            await client.describe_image(str(frame), prompt="p", max_retries=5, retry_delay=0.0)
+        assert calls == 3  # the third failure opened the circuit, later attempts were refused
+        with pytest.raises(CircuitOpenError):
+            await client.describe_image(str(frame), prompt="other", retry_delay=0.0)
+    finally:
+        await adapter.close()
+
+    assert calls == 3
+    assert client.unavailable_for() > 0
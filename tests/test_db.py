@@ -0,0 +1,125 @@
+import asyncio
+import socket
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, inspect
+
+from src import db
+from src.app import app
+from src.models import Video
+from src.services.media_info import MediaInfo
+from src.settings import get_settings
+
+DEFAULT_TOKEN = get_settings().SECRET_KEY
+
+
+class RecordingSession:
+    def __init__(self):
+        self.calls = []
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+    async def close(self):
+        self.calls.append("close")
+
+
+@pytest.mark.asyncio
+async def test_async_session_scope_commits_or_rolls_back(monkeypatch):
+    sessions = []
+
+    def fake_session():
+        sessions.append(RecordingSession())
+        return sessions[-1]
+
+    monkeypatch.setattr(db, "get_async_session", fake_session)
+
+    async with db.async_session_scope() as session:
+        assert session is sessions[0]
+    with pytest.raises(RuntimeError):
+        async with db.async_session_scope():
+            raise RuntimeError("query failed")
+
+    assert sessions[0].calls == ["commit", "close"]
+    assert sessions[1].calls == ["rollback", "close"]
+
+
+def test_async_engine_is_rebuilt_for_another_event_loop():
+    async def engines():
+        return db.get_async_engine(), db.get_async_engine()
+
+    try:
+        first, same = asyncio.run(engines())
+        second, _ = asyncio.run(engines())
+    finally:
+        asyncio.run(db.dispose_async_engine())
+    assert first is same
+    assert second is not first
+
+
+def _database_ready() -> bool:
+    settings = get_settings()
+    try:
+        socket.create_connection((settings.DB_HOST, settings.DB_PORT), timeout=1).close()
+        with db.get_engine().connect() as connection:
+            return inspect(connection).has_table("video")
+    except Exception:
+        return False
+
+
+@pytest.fixture()
+def db_client(monkeypatch):
+    if not _database_ready():
+        pytest.skip("Postgres with the migrated schema is not reachable")
+
+    async def fake_probe(path: str) -> MediaInfo:
+        return MediaInfo(
+            codec="h264", width=640, height=360, fps=25.0, duration=4.0, total_frames=100
+        )
+
+    from src.api.routes import analyze as analyze_module
+
+    monkeypatch.setattr(analyze_module, "process_video_task", lambda video_id: None)
+    monkeypatch.setattr(analyze_module, "probe_media", fake_probe)
+    created: list[uuid.UUID] = []
+    yield TestClient(app), created
+    with db.session_scope() as session:
+        session.execute(delete(Video).where(Video.id.in_(created)))
+
+
+def test_task_routes_against_the_database(db_client):
+    client, created = db_client
+    headers = {"Authorization": f"Bearer {DEFAULT_TOKEN}"}
+
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("test.mp4", b"fake-binary", "video/mp4")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    task_id = response.json()["task_id"]
+    created.append(uuid.UUID(task_id))
+
+    response = client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "received"
+
+    response = client.get("/api/v1/tasks", params={"status": "received"}, headers=headers)
+    assert response.status_code == 200
+    assert task_id in [item["id"] for item in response.json()["items"]]
+
+    missing = str(uuid.uuid4())
+    response = client.post(
+        "/api/v1/tasks/lookup", json={"ids": [task_id, missing]}, headers=headers
+    )
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()["tasks"]] == [task_id]
+    assert response.json()["missing"] == [missing]
+
+    response = client.post(f"/api/v1/tasks/{task_id}/close", headers=headers)
+    assert response.status_code == 409
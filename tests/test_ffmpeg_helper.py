@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.schemes import ErrorCode
+from src.utils.ffmpeg_helper import (
+    FFmpegError,
+    FFmpegVideoHelper,
+    _ProcessSlots,
+    _select_expression,
+    parse_progress,
+    sprite_tile,
+)
+
+
+def test_parse_progress_reads_stats_line():
+    line = "frame=  120 fps= 60 q=28.0 size=     256kB time=00:01:02.50 bitrate= 33.5kbits/s"
+    assert parse_progress(line) == pytest.approx(62.5)
+    assert parse_progress("Press [q] to stop, [?] for help") is None
+
+
+def test_missing_input_fails_before_spawning(tmp_path):
+    with pytest.raises(FFmpegError) as exc_info:
+        FFmpegVideoHelper().extract_frame(str(tmp_path / "missing.mp4"), str(tmp_path / "out.jpg"))
+    assert exc_info.value.code == ErrorCode.VIDEO_NOT_FOUND
+
+
+def test_select_expression_keeps_first_frame_at_each_timestamp():
+    assert _select_expression([0.0, 2.5]) == (
+        "gte(t,0.000)*not(gte(prev_t,0.000))+gte(t,2.500)*not(gte(prev_t,2.500))"
+    )
+
+
+def test_sprite_tile_fills_rows_then_sheets():
+    grid = (3, 2)
+    assert [sprite_tile(index, grid) for index in (0, 2, 3, 5, 6, 8)] == [
+        (0, 0, 0),
+        (0, 2, 0),
+        (0, 0, 1),
+        (0, 2, 1),
+        (1, 0, 0),
+        (1, 2, 0),
+    ]
+
+
+def test_extract_frames_maps_files_back_to_timestamps(tmp_path):
+    video = tmp_path / "clip.ts"
+    video.write_bytes(b"not decoded: ffmpeg is not run")
+    out = tmp_path / "frames"
+    job = FFmpegVideoHelper()._extract_frames_job(
+        str(video),
+        str(out),
+        [4.0, 0.0, 1.0, 1.02, 60.0],
+        width=None,
+        height=None,
+        prefix="f",
+        sprite_grid=(2, 1),
+        sprite_width=None,
+        frames=True,
+    )
+    graph = job.args[job.args.index("-filter_complex") + 1]
+    assert graph.index("setpts=PTS-STARTPTS") < graph.index("select=")
+    assert job.args[job.args.index("-t") + 1] == "61.0"
+
+    # Files as ffmpeg names them: presentation time in ms, from zero after setpts.
+    for pts in (0, 1040, 4000):
+        (out / f"f_{pts}.jpg").write_bytes(b"jpg")
+    for sheet in (1, 2):
+        (out / f"f_sprite_{sheet}.jpg").write_bytes(b"jpg")
+    batch = job.finish(b"")
+
+    assert [(ts, path.name) for ts, path in batch.frames] == [
+        (4.0, "f_4000.jpg"),
+        (0.0, "f_0.jpg"),
+        (1.0, "f_1040.jpg"),
+        (1.02, "f_1040.jpg"),
+    ]
+    assert [(ts, path.name, column, row) for ts, path, column, row in batch.tiles] == [
+        (4.0, "f_sprite_2.jpg", 0, 0),
+        (0.0, "f_sprite_1.jpg", 0, 0),
+        (1.0, "f_sprite_1.jpg", 1, 0),
+        (1.02, "f_sprite_1.jpg", 1, 0),
+    ]
+    assert [path.name for path in batch.sprites] == ["f_sprite_1.jpg", "f_sprite_2.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_process_slots_wake_waiters_in_order_across_event_loops():
+    slots = _ProcessSlots(1)
+    await slots.acquire()
+    order = []
+
+    async def take(name):
+        await slots.acquire()
+        order.append(name)
+
+    first = asyncio.ensure_future(take("first"))
+    cancelled = asyncio.ensure_future(take("cancelled"))
+    await asyncio.sleep(0)
+    acquired_elsewhere = threading.Event()
+    # Blocking helpers run their own loop in another thread.
+    thread = threading.Thread(
+        target=lambda: (asyncio.run(take("thread")), acquired_elsewhere.set())
+    )
+    thread.start()
+    while len(slots._waiters) < 3:
+        await asyncio.sleep(0.01)
+
+    cancelled.cancel()
+    slots.release()
+    await first
+    slots.release()
+    assert await asyncio.to_thread(acquired_elsewhere.wait, 5)
+    thread.join()
+    slots.release()
+
+    assert order == ["first", "thread"]
+    assert cancelled.cancelled()
+    assert slots._free == 1 and not slots._waiters
@@ -0,0 +1,195 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from src.services.frame_analysis import (
+    BatchOptions,
+    FrameAnalyzer,
+    parse_combined_response,
+    parse_people_count,
+    plan_batches,
+    resolve_model_tiers,
+)
+from src.services.worker_loop import WorkerLoop
+from src.settings import ModelTier
+
+
+class SlowClient:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    async def describe_image(self, *, image_path: str, prompt: str) -> str:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return "3" if prompt == "count" else f"scene {Path(image_path).stem}"
+
+
+def test_parse_people_count():
+    assert parse_people_count("На кадре 4 человека") == 4
+    assert parse_people_count("никого") == 0
+
+
+@pytest.mark.asyncio
+async def test_analyze_many_is_concurrent_and_ordered():
+    client = SlowClient(delay=0.2)
+    analyzer = FrameAnalyzer(
+        client, summary_prompt="summary", people_prompt="count", concurrency=10
+    )
+    frames = [(Path(f"frame{index}.jpg"), float(index)) for index in range(5)]
+
+    started = time.perf_counter()
+    results = await analyzer.analyze_many(frames)
+    elapsed = time.perf_counter() - started
+
+    assert [result.summary for result in results] == [f"scene frame{i}" for i in range(5)]
+    assert all(result.people == 3 for result in results)
+    assert client.peak == 10
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_fast_tier_counts_and_escalates_ambiguous_answers():
+    calls = []
+
+    class TieredClient:
+        async def describe_image(self, *, image_path: str, prompt: str, tier=None) -> str:
+            calls.append((prompt, tier))
+            if prompt == "count":
+                return "2 или 3" if tier == ModelTier.FAST else "3"
+            return "scene"
+
+    tiers = resolve_model_tiers(
+        {
+            "people": ModelTier.FAST,
+            "summary": ModelTier.STRONG,
+            "alert_only.summary": ModelTier.FAST,
+        },
+        "full",
+    )
+    analyzer = FrameAnalyzer(
+        TieredClient(), summary_prompt="summary", people_prompt="count", tiers=tiers
+    )
+    result = await analyzer.analyze(Path("frame.jpg"), 0.0)
+
+    assert result.people == 3
+    assert sorted(calls) == [
+        ("count", ModelTier.FAST),
+        ("count", ModelTier.STRONG),
+        ("summary", ModelTier.STRONG),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_analyze_many_respects_concurrency_limit():
+    client = SlowClient(delay=0.01)
+    analyzer = FrameAnalyzer(client, summary_prompt="summary", people_prompt="count", concurrency=3)
+    await analyzer.analyze_many([(Path(f"f{index}.jpg"), 0.0) for index in range(6)])
+    assert client.peak == 3
+
+
+def test_parse_combined_response_validates_fields():
+    assert parse_combined_response('```json\n{"summary": "Двое идут", "people_count": 2}\n```') == (
+        "Двое идут",
+        2,
+    )
+    assert parse_combined_response('{"summary": "", "people_count": 3}') == (None, 3)
+    assert parse_combined_response("Кто-то стоит, people_count: 4") == (None, 4)
+
+
+@pytest.mark.asyncio
+async def test_combined_mode_retries_only_failed_part():
+    class PartialClient:
+        def __init__(self) -> None:
+            self.prompts: list[str] = []
+
+        async def describe_image(self, *, image_path: str, prompt: str) -> str:
+            self.prompts.append(prompt)
+            if prompt == "combined":
+                return '{"summary": "Человек у двери", "people_count": "много"}'
+            return "1"
+
+    client = PartialClient()
+    analyzer = FrameAnalyzer(
+        client, summary_prompt="summary", people_prompt="count", combined_prompt="combined"
+    )
+    result = await analyzer.analyze(Path("frame.jpg"), 0.0)
+
+    assert (result.summary, result.people) == ("Человек у двери", 1)
+    assert client.prompts == ["combined", "count"]
+
+
+def test_plan_batches_respects_image_and_payload_budget(tmp_path):
+    frames = []
+    for index in range(5):
+        path = tmp_path / f"{index}.jpg"
+        path.write_bytes(b"x" * 300)  # 400 bytes once base64-encoded
+        frames.append((path, float(index)))
+
+    by_count = plan_batches(frames, max_images=2, max_payload_bytes=10_000)
+    by_payload = plan_batches(frames, max_images=8, max_payload_bytes=1000)
+    assert [len(batch) for batch in by_count] == [2, 2, 1]
+    assert [len(batch) for batch in by_payload] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_batched_mode_packs_frames_and_falls_back_for_missing(tmp_path):
+    class BatchClient:
+        def __init__(self) -> None:
+            self.batches: list[list[str]] = []
+            self.single: list[str] = []
+
+        async def describe_images(self, image_paths, *, prompt, labels=None):
+            self.batches.append(labels)
+            return (
+                '{"frames": [{"index": 1, "summary": "вход", "people_count": 1}, '
+                '{"index": 3, "summary": "выход", "people_count": 2}], '
+                '"summary": "человек прошёл через холл", "unique_people": 2}'
+            )
+
+        async def describe_image(self, *, image_path: str, prompt: str) -> str:
+            self.single.append(prompt)
+            return "1" if prompt == "count" else "холл"
+
+    frames = []
+    for index in range(3):
+        path = tmp_path / f"{index}.jpg"
+        path.write_bytes(b"jpeg")
+        frames.append((path, index * 2.0))
+
+    client = BatchClient()
+    analyzer = FrameAnalyzer(
+        client,
+        summary_prompt="summary",
+        people_prompt="count",
+        batch=BatchOptions(prompt="batch"),
+    )
+    results = await analyzer.analyze_many(frames)
+
+    assert client.batches == [["Кадр 1 (0.0 с)", "Кадр 2 (2.0 с)", "Кадр 3 (4.0 с)"]]
+    assert [result.summary for result in results] == ["вход", "холл", "выход"]
+    assert [result.people for result in results] == [1, 1, 2]
+    # The fallback frame records the prompt that actually described it.
+    assert [result.prompt for result in results] == ["batch", "summary", "batch"]
+    assert all(result.latency is not None for result in results)
+    assert sorted(client.single) == ["count", "summary"]
+    assert analyzer.batch_overviews[0].summary == "человек прошёл через холл"
+    assert analyzer.batch_overviews[0].unique_people == 2
+
+
+def test_worker_loop_reuses_one_loop():
+    worker = WorkerLoop(name="test-worker-loop")
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    try:
+        assert worker.run(current_loop()) is worker.run(current_loop())
+    finally:
+        worker.stop()
+    assert not worker.running
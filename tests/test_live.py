@@ -0,0 +1,142 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.services import video_processor
+from src.services.frame_analysis import FrameResult
+from src.services.live import (
+    LiveAnalysis,
+    LiveFrameReader,
+    LiveHandle,
+    LiveOptions,
+    LiveWindow,
+)
+from src.services.triggers import TriggerEngine
+
+WIDTH, HEIGHT = 8, 6
+
+
+def _pipe(frame_count: int, *, trailing: bytes = b"") -> asyncio.StreamReader:
+    stream = asyncio.StreamReader()
+    for index in range(frame_count):
+        shade = 255 if index % 2 else 0
+        stream.feed_data(np.full((HEIGHT, WIDTH, 3), shade, np.uint8).tobytes())
+    stream.feed_data(trailing)
+    stream.feed_eof()
+    return stream
+
+
+class FakeHelper:
+    def __init__(self, stream):
+        self.stream = stream
+
+    @asynccontextmanager
+    async def aopen_frame_stream(self, source, **kwargs):
+        yield SimpleNamespace(stdout=self.stream, pid=None)
+
+
+class FakeAnalyzer:
+    async def analyze(self, frame_path, timestamp):
+        return FrameResult(frame_path=frame_path, timestamp=timestamp, summary="a person walks")
+
+
+async def _run(tmp_path, stream, *, on_window=None, handle=None):
+    source = tmp_path / "camera.raw"
+    source.write_bytes(b"")
+    triggers = TriggerEngine.from_expressions(["summary mentions person"])
+    windows = []
+
+    async def collect(window):
+        windows.append(window)
+        if on_window is not None:
+            await on_window(window)
+
+    analysis = LiveAnalysis(
+        str(source),
+        options=LiveOptions(sample_fps=2.0, width=WIDTH, height=HEIGHT, window_seconds=2.0),
+        frame_dir=tmp_path,
+        handle=handle or LiveHandle(),
+        analyzer=FakeAnalyzer(),
+        triggers=triggers,
+        on_window=collect,
+        helper=FakeHelper(stream),
+    )
+    count = await analysis.run()
+    # Windows are handed to the callback and not kept by the analysis.
+    assert count == analysis.windows_emitted == len(windows)
+    return windows, triggers
+
+
+@pytest.mark.asyncio
+async def test_frame_reader_stops_at_a_partial_frame():
+    reader = LiveFrameReader(_pipe(1, trailing=b"\x00" * 10), width=WIDTH, height=HEIGHT)
+    assert (await reader.read()).shape == (HEIGHT, WIDTH, 3)
+    assert await reader.read() is None
+
+
+@pytest.mark.asyncio
+async def test_stream_is_split_into_windows_and_triggers_rearm(tmp_path):
+    windows, triggers = await _run(tmp_path, _pipe(10, trailing=b"\x00" * 10))
+
+    assert [(w.index, w.start, w.end, w.frames) for w in windows] == [
+        (1, 0.0, 2.0, 4),
+        (2, 2.0, 4.0, 4),
+        (3, 4.0, 5.0, 2),
+    ]
+    # Each window fires the rule again after the previous window re-armed it.
+    assert [firing.timestamp for firing in triggers.fired] == [
+        w.result.timestamp for w in windows
+    ]
+
+    handle = LiveHandle()
+
+    async def stop_after_second(window):
+        if window.index == 2:
+            handle.stop()
+
+    windows, _ = await _run(tmp_path, _pipe(10), on_window=stop_after_second, handle=handle)
+    assert [w.index for w in windows] == [1, 2]
+
+
+class RecordingSession:
+    def __init__(self, video):
+        self.video = video
+        self.added = []
+        self.inserted = []
+
+    def get(self, model, key):
+        return self.video
+
+    def add(self, row):
+        self.added.append(row)
+
+    def execute(self, statement, rows):
+        self.inserted.extend(rows)
+
+
+def test_each_window_stores_its_frame_result(monkeypatch):
+    video_id = uuid.uuid4()
+    video = SimpleNamespace(unique_people=0, stop_requested_at=None, webhook_url=None)
+    session = RecordingSession(video)
+
+    @contextmanager
+    def fake_scope():
+        yield session
+
+    monkeypatch.setattr(video_processor, "session_scope", fake_scope)
+    monkeypatch.setattr(video_processor, "ensure_current_partitions", lambda: None)
+    monkeypatch.setattr(video_processor, "notify_task_changed", lambda session, video: None)
+    result = FrameResult(frame_path="f.jpg", timestamp=3.5, summary="a person", people=2)
+    window = LiveWindow(index=2, start=2.0, end=4.0, frames=4, motion=0.4, result=result)
+
+    stop = video_processor._store_live_window(video_id, window, ["a person"], [], "ollama")
+
+    assert stop is False
+    stored = [(row["video_id"], row["timestamp_seconds"], row["text"]) for row in session.inserted]
+    assert stored == [(video_id, 3.5, "a person")]
+    assert video.analysis_stage == "window-2"
+    assert video.unique_people == 2
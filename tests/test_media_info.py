@@ -0,0 +1,33 @@
+import pytest
+
+from src.services.media_info import parse_probe
+from src.utils.ffmpeg_helper import FFmpegError
+
+
+def test_parse_probe_reads_video_stream():
+    info = parse_probe(
+        {
+            "streams": [
+                {"codec_type": "audio", "codec_name": "aac"},
+                {
+                    "codec_type": "video",
+                    "codec_name": "h264",
+                    "width": 1280,
+                    "height": 720,
+                    "avg_frame_rate": "30000/1001",
+                    "duration": "10.01",
+                },
+            ],
+            "format": {"duration": "10.05"},
+        }
+    )
+    assert info.codec == "h264"
+    assert (info.width, info.height) == (1280, 720)
+    assert info.fps == pytest.approx(29.97, abs=0.01)
+    assert info.duration == pytest.approx(10.01)
+    assert info.total_frames == 300
+
+
+def test_parse_probe_rejects_files_without_video():
+    with pytest.raises(FFmpegError):
+        parse_probe({"streams": [{"codec_type": "audio"}], "format": {"duration": "3.0"}})
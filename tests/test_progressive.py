@@ -0,0 +1,84 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.services import progressive
+from src.services.frame_analysis import FrameResult
+from src.services.media_info import MediaInfo
+from src.services.progressive import ProgressiveAnalysis, ProgressiveOptions
+
+DURATION = 60.0
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.calls = []
+
+    async def analyze_many(self, frames):
+        self.calls.append([timestamp for _, timestamp in frames])
+        return [
+            FrameResult(frame_path=path, timestamp=timestamp, summary=f"frame {timestamp}")
+            for path, timestamp in frames
+        ]
+
+
+def _write_video(path):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 1, (32, 24))
+    for _ in range(int(DURATION)):
+        writer.write(np.zeros((24, 32, 3), np.uint8))
+    writer.release()
+
+
+@pytest.mark.asyncio
+async def test_coarse_scan_stops_at_its_budget_share_and_refines_around_motion(
+    tmp_path, monkeypatch
+):
+    video = tmp_path / "long.avi"
+    _write_video(video)
+    sampled = []
+
+    def slow_motion_score(cap, timestamp):
+        time.sleep(0.02)
+        sampled.append(timestamp)
+        return 100.0 - abs(timestamp - 32.0)
+
+    def fake_save(video_path, timestamps, frame_dir):
+        return [(frame_dir / f"{timestamp}.jpg", timestamp) for timestamp in timestamps]
+
+    monkeypatch.setattr(progressive, "motion_score_at", slow_motion_score)
+    monkeypatch.setattr(progressive, "save_frames_at", fake_save)
+    analyzer = FakeAnalyzer()
+    stages = []
+
+    async def on_stage(stage, outcome):
+        stages.append((stage, len(sampled)))
+
+    analysis = ProgressiveAnalysis(
+        str(video),
+        options=ProgressiveOptions(
+            budget_seconds=0.6, coarse_interval=1.0, coarse_frames=2, refine_frames_per_stage=2
+        ),
+        frame_dir=tmp_path,
+        analyzer=analyzer,
+        on_stage=on_stage,
+        media=MediaInfo(
+            codec="mjpeg", width=32, height=24, fps=1.0, duration=DURATION, total_frames=60
+        ),
+    )
+    started = time.perf_counter()
+    outcome = await analysis.run()
+
+    assert time.perf_counter() - started < 1.0
+    stage, coarse_samples = stages[0]
+    assert stage == "coarse"
+    assert 2 <= coarse_samples < DURATION
+    coarse = sampled[:coarse_samples]
+    assert min(coarse) < 5 and max(coarse) > 50
+    by_motion = sorted(coarse, key=lambda timestamp: abs(timestamp - 32.0))
+    assert analyzer.calls[0] == sorted(by_motion[:2])
+
+    assert stages[1][0] == "refine-1"
+    assert all(abs(timestamp - by_motion[0]) <= 0.5 for timestamp in analyzer.calls[1])
+    assert outcome.stage == stages[-1][0]
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from src.providers.base import ProviderError
+from src.providers.latency import AdaptiveTimeout
+from src.providers.ollama import OllamaClient
+from src.providers.response_cache import ResponseCache
+from src.providers.router import ProviderRouter
+from src.services.metrics import PROVIDER_HEDGES_FIRED, PROVIDER_HEDGES_WON
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+class FakeProvider:
+    def __init__(self, name: str, *, delay: float, fail: bool = False, cost: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.cost_per_request = cost
+        self.calls = 0
+
+    async def describe_image(self, image_path: str, *, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ProviderError(f"{self.name} is down")
+        return self.name
+
+    async def describe_images(self, image_paths, *, prompt, labels=None) -> str:
+        return await self.describe_image(image_paths[0], prompt=prompt)
+
+
+@pytest.mark.asyncio
+async def test_router_prefers_fast_backend_and_fails_over():
+    slow = FakeProvider("slow", delay=0.05)
+    fast = FakeProvider("fast", delay=0.0)
+    router = ProviderRouter([slow, fast], explore_every=0)
+
+    answers = [await router.describe_image("frame.jpg", prompt="p") for _ in range(6)]
+    # Both are measured once, then the faster one takes the traffic.
+    assert answers[:2] == ["slow", "fast"]
+    assert set(answers[2:]) == {"fast"}
+
+    fast.fail = True
+    assert await router.describe_image("frame.jpg", prompt="p") == "slow"
+    assert router.stats["fast"].error_rate > 0
+
+    expensive = FakeProvider("expensive", delay=0.0, cost=0.01)
+    cheap = FakeProvider("cheap", delay=0.02)
+    priced = ProviderRouter([expensive, cheap], cost_weight=1000.0, explore_every=0)
+    for _ in range(4):
+        await priced.describe_image("frame.jpg", prompt="p")
+    assert priced.ranked()[0] is cheap
+
+
+@pytest.mark.asyncio
+async def test_ollama_client_talks_openai_compatible_api(tmp_path, stub_server):
+    seen: dict = {}
+
+    async def completions(request: web.Request) -> web.Response:
+        seen["auth"] = request.headers.get("Authorization")
+        seen["body"] = await request.json()
+        return web.json_response({"choices": [{"message": {"content": "два человека"}}]})
+
+    base_url = await stub_server({"/v1/chat/completions": completions})
+
+    frame = tmp_path / "frame.png"
+    frame.write_bytes(b"png-bytes")
+    adapter = AioHttpAdapter()
+    client = OllamaClient(
+        base_url=f"{base_url}/v1",
+        model="qwen2.5vl:7b",
+        adapter=adapter,
+        response_cache=ResponseCache(None),
+    )
+    try:
+        answer = await client.describe_image(str(frame), prompt="Сколько людей?")
+    finally:
+        await adapter.close()
+
+    assert answer == "два человека"
+    assert client.rate_limiter is None
+    assert seen["body"]["model"] == "qwen2.5vl:7b"
+    image = seen["body"]["messages"][0]["content"][1]["image_url"]["url"]
+    assert image.startswith("data:image/png;base64,")
+
+
+@pytest.mark.asyncio
+async def test_hedge_fires_after_p95_and_cancels_loser():
+    primary = FakeProvider("primary", delay=0.01)
+    backup = FakeProvider("backup", delay=0.01)
+    router = ProviderRouter(
+        [primary, backup], explore_every=0, hedge_quantile=0.95, hedge_min_samples=5
+    )
+    router._stats(backup, "image").record(1.0, ok=True)  # keep traffic on "primary"
+    for _ in range(5):
+        assert await router.describe_image("frame.jpg", prompt="p") == "primary"
+    fired = PROVIDER_HEDGES_FIRED.labels(provider="backup")._value.get()
+    won = PROVIDER_HEDGES_WON.labels(provider="backup")._value.get()
+
+    primary.delay = 1.0  # a stuck response
+    delay = router.hedge_delay(primary)
+    started = time.perf_counter()
+    assert await router.describe_image("frame.jpg", prompt="p") == "backup"
+    assert time.perf_counter() - started < 0.5
+    assert PROVIDER_HEDGES_FIRED.labels(provider="backup")._value.get() - fired == 1
+    assert PROVIDER_HEDGES_WON.labels(provider="backup")._value.get() - won == 1
+    # The cancelled request is not counted as a provider error, but its time is
+    # kept as a lower bound, so the stuck call still raises primary's tail.
+    assert router.stats["primary"].error_rate == 0
+    latencies = router.stats["primary"].latencies
+    assert len(latencies) == 6 and delay <= latencies[-1] < 0.5
+    assert len(router.stats["backup"].latencies) == 2
+
+
+def test_adaptive_timeout_follows_p99():
+    timeouts = AdaptiveTimeout(default=30.0, minimum=2.0, maximum=60.0, min_samples=3)
+    assert timeouts.timeout("m:1") == 30.0
+    for latency in (1.0, 1.5, 4.0):
+        timeouts.record("m:1", latency)
+    assert timeouts.timeout("m:1") == 8.0
+    timeouts.record("m:2", 0.1)
+    timeouts.record("m:2", 0.1)
+    timeouts.record("m:2", 0.1)
+    assert timeouts.timeout("m:2") == 2.0
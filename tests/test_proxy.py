@@ -0,0 +1,61 @@
+import os
+
+import cv2
+import numpy as np
+
+from src.schemes import ErrorCode
+from src.services import proxy as proxy_module
+from src.services.media_info import MediaInfo
+from src.services.proxy import ensure_proxy, proxy_path_for
+from src.services.video_processor import cleanup_frames, detect_motion_frames
+from src.settings import get_settings
+from src.utils.ffmpeg_helper import FFmpegError
+
+
+class FakeHelper:
+    def __init__(self, *, fail=False):
+        self.fail = fail
+        self.outputs = []
+
+    def transcode(self, source, output, **kwargs):
+        self.outputs.append(output)
+        with open(output, "wb") as handle:
+            handle.write(b"proxy")
+        if self.fail:
+            raise FFmpegError(ErrorCode.VIDEO_DECODING_FAILED, "boom")
+
+
+def test_proxy_is_written_to_a_unique_temp_file_and_swapped_in(tmp_path, monkeypatch):
+    settings = get_settings().model_copy(update={"PROXY_ENABLED": True, "PROXY_MIN_SOURCE_MB": 0})
+    monkeypatch.setattr(proxy_module, "get_settings", lambda: settings)
+    source = tmp_path / "upload.mp4"
+    source.write_bytes(b"original")
+
+    failing = FakeHelper(fail=True)
+    assert ensure_proxy(str(source), helper=failing) is None
+    helper = FakeHelper()
+    assert ensure_proxy(str(source), helper=helper) == proxy_path_for(str(source))
+
+    first, second = failing.outputs[0], helper.outputs[0]
+    assert first != second
+    assert f".{os.getpid()}-" in second
+    assert proxy_path_for(str(source)).read_bytes() == b"proxy"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "upload.mp4",
+        "upload.proxy.mp4",
+    ]
+
+
+def test_motion_scan_handles_sources_below_one_fps(tmp_path):
+    video = tmp_path / "timelapse.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 1, (32, 24))
+    for index in range(6):
+        writer.write(np.full((24, 32, 3), 255 if index % 2 else 0, np.uint8))
+    writer.release()
+    media = MediaInfo(codec="mjpeg", width=32, height=24, fps=0.5, duration=12.0, total_frames=6)
+
+    scan = detect_motion_frames(str(video), max_frames=3, media=media)
+    cleanup_frames(scan.frames)
+
+    assert scan.timestamps == [2.0, 4.0, 6.0]
+    assert len(scan.frames) == 3
@@ -0,0 +1,72 @@
+import time
+from email.utils import formatdate
+
+import pytest
+from aiohttp import web
+
+from src.providers.openrouter import OpenRouterClient
+from src.providers.rate_limit import (
+    LocalBucketStore,
+    RateLimiter,
+    limit_delay,
+    parse_reset,
+)
+from src.providers.response_cache import ResponseCache
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+def test_bucket_and_limit_headers():
+    store = LocalBucketStore()
+    now = 1_760_000_000.0
+    assert store.take("p:m", rate=1.0, burst=2, now=now) == 0
+    assert store.take("p:m", rate=1.0, burst=2, now=now) == 0
+    assert store.take("p:m", rate=1.0, burst=2, now=now) == pytest.approx(1.0)
+    assert store.take("p:m", rate=1.0, burst=2, now=now + 1.0) == 0
+
+    store.block("p:m", until=now + 10.0, now=now + 1.0)
+    assert store.take("p:m", rate=1.0, burst=2, now=now + 4.0) == pytest.approx(6.0)
+    # After the block the bucket refills from empty instead of allowing a burst.
+    assert store.take("p:m", rate=1.0, burst=2, now=now + 10.5) == pytest.approx(0.5)
+
+    assert limit_delay({"Retry-After": "7"}, now=now) == 7.0
+    assert limit_delay({"Retry-After": formatdate(now + 10, usegmt=True)}, now=now) == 10.0
+    assert limit_delay({"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "5"}, now=now) is None
+    headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int((now + 4) * 1000))}
+    assert limit_delay(headers, now=now) == pytest.approx(4.0)
+    assert parse_reset("6m0s", now=now) == 360.0
+    assert parse_reset("20ms", now=now) == pytest.approx(0.02)
+
+
+@pytest.mark.asyncio
+async def test_client_waits_for_retry_after(stub_server):
+    calls: list[float] = []
+
+    async def completions(request: web.Request) -> web.Response:
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            return web.json_response(
+                {"error": "rate limited"}, status=429, headers={"Retry-After": "0.3"}
+            )
+        return web.json_response({"choices": [{"message": {"content": "ok"}}]})
+
+    base_url = await stub_server({"/chat/completions": completions})
+
+    adapter = AioHttpAdapter()
+    client = OpenRouterClient(
+        api_key="test",
+        base_url=f"{base_url}",
+        adapter=adapter,
+        cooldown_seconds=5.0,
+        rate_limiter=RateLimiter(LocalBucketStore(), requests_per_minute=600, burst=5),
+        response_cache=ResponseCache(None),
+    )
+    try:
+        answer = await client._complete(
+            [{"type": "text", "text": "hi"}], model="m", max_retries=2, retry_delay=5.0
+        )
+    finally:
+        await adapter.close()
+
+    assert answer == "ok"
+    # Retry-After replaces the fixed cooldown/backoff of several seconds.
+    assert 0.25 <= calls[1] - calls[0] < 2.0
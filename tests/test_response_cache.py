@@ -0,0 +1,87 @@
+import time
+
+import pytest
+from aiohttp import web
+
+from src.providers.openrouter import OpenRouterClient
+from src.providers.rate_limit import LocalBucketStore, RateLimiter
+from src.providers.response_cache import ResponseCache, cache_key
+from src.settings import ModelTier
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+def test_cache_tiers_ttl_and_eviction(tmp_path, monkeypatch):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = ResponseCache(path, memory_entries=1, ttl_seconds=60, max_disk_bytes=10)
+    cache.set("a", "12345")
+    cache.set("b", "67890")
+    assert cache.get("a") == "12345"  # memory tier holds only "b"; "a" comes from disk
+
+    cache.set("c", "xyz")  # 13 bytes on disk: the least recently read entry ("b") goes
+    reopened = ResponseCache(path, ttl_seconds=60)
+    assert reopened.get("b") is None
+    assert reopened.get("a") == "12345"
+    assert reopened.get("c") == "xyz"
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert reopened.get("a") is None
+    cache.close()
+    reopened.close()
+
+    image = {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,AAAA"}}
+    text = {"type": "text", "text": "describe"}
+    assert cache_key("m", [text, image]) == cache_key("m", [text, dict(image)])
+    assert cache_key("m", [text, image]) != cache_key("other", [text, image])
+
+    # Same bytes behind a different MIME type share the key; other bytes do not.
+    png = {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}}
+    other = {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,AAAB"}}
+    assert cache_key("m", [text, image]) == cache_key("m", [text, png])
+    assert cache_key("m", [text, image]) != cache_key("m", [text, other])
+
+    options = {"model": "vision-large", "temperature": 0.0, "max_tokens": 300}
+    key = cache_key("m", [text, image], options=options)
+    assert key == cache_key("m", [text, image], options=dict(reversed(options.items())))
+    for name, value in [("model", "vision-small"), ("temperature", 0.7), ("max_tokens", 50)]:
+        assert key != cache_key("m", [text, image], options={**options, name: value})
+
+
+@pytest.mark.asyncio
+async def test_client_serves_repeated_frame_from_cache(tmp_path, stub_server):
+    calls = 0
+
+    async def completions(request: web.Request) -> web.Response:
+        nonlocal calls
+        calls += 1
+        return web.json_response({"choices": [{"message": {"content": "a hallway"}}]})
+
+    base_url = await stub_server({"/chat/completions": completions})
+
+    frame = tmp_path / "frame.jpg"
+    frame.write_bytes(b"jpeg-bytes")
+    path = str(tmp_path / "responses.sqlite3")
+    adapter = AioHttpAdapter()
+
+    def make_client() -> OpenRouterClient:
+        return OpenRouterClient(
+            api_key="test",
+            base_url=f"{base_url}",
+            model="vision-large",
+            fast_model="vision-small",
+            adapter=adapter,
+            rate_limiter=RateLimiter(LocalBucketStore(), requests_per_minute=600, burst=5),
+            response_cache=ResponseCache(path),
+        )
+
+    try:
+        first = await make_client().describe_image(str(frame), prompt="describe")
+        # A fresh client (new process) still finds the answer on disk.
+        second = await make_client().describe_image(str(frame), prompt="describe")
+        await make_client().describe_image(str(frame), prompt="count people")
+        await make_client().describe_image(str(frame), prompt="describe", tier=ModelTier.FAST)
+    finally:
+        await adapter.close()
+
+    assert first == second == "a hallway"
+    assert calls == 3
@@ -0,0 +1,98 @@
+import os
+import time
+from datetime import datetime
+
+from src.services.partitions import (
+    add_months,
+    default_partition_name,
+    expired_partitions,
+    partition_name,
+)
+from src.services.proxy import proxy_path_for
+from src.services.retention import active_upload_paths, remove_task_files, sweep_files
+
+
+def test_expired_partitions_only_cover_whole_months_before_cutoff():
+    months = [add_months(datetime(2025, 11, 1), offset) for offset in range(4)]
+    names = [partition_name("videometric", month) for month in months]
+    assert names[-1] == "videometric_p202602"
+
+    cutoff = datetime(2026, 1, 15)
+    default = default_partition_name("videometric")
+    assert expired_partitions(names + [default, "videometric_legacy"], cutoff) == [
+        "videometric_p202511",
+        "videometric_p202512",
+    ]
+
+
+def test_sweep_and_task_cleanup_remove_uploads_with_their_proxies(tmp_path):
+    uploads = tmp_path / "uploads"
+    live = tmp_path / "live"
+    uploads.mkdir()
+    live.mkdir()
+    old_upload = uploads / "old.mp4"
+    new_upload = uploads / "new.mp4"
+    kept_task = uploads / "task.mp4"
+    live_source = live / "camera.mp4"
+    for path in (old_upload, new_upload, kept_task, live_source):
+        path.write_bytes(b"x" * 10)
+    proxy_path_for(str(old_upload)).write_bytes(b"p" * 5)
+    proxy_path_for(str(kept_task)).write_bytes(b"p" * 5)
+
+    stale = time.time() - 10 * 86400
+    os.utime(old_upload, (stale, stale))
+    freed = sweep_files([uploads, tmp_path / "missing"], cutoff=time.time() - 86400)
+
+    # The proxy was used recently, but goes with its upload.
+    assert freed == 15
+    assert sorted(path.name for path in uploads.iterdir()) == [
+        "new.mp4",
+        "task.mp4",
+        "task.proxy.mp4",
+    ]
+
+    freed = remove_task_files([str(kept_task), str(live_source)], upload_dir=uploads)
+    assert freed == 15
+    assert live_source.exists()
+    assert sorted(path.name for path in uploads.iterdir()) == ["new.mp4"]
+
+
+class PendingTasks:
+    def __init__(self, stored_paths):
+        self.stored_paths = stored_paths
+        self.statement = None
+
+    def scalars(self, statement):
+        self.statement = statement
+        return self.stored_paths
+
+
+def test_sweep_keeps_stale_uploads_of_unfinished_tasks(tmp_path):
+    pending = tmp_path / "pending.mp4"
+    finished = tmp_path / "finished.mp4"
+    stale = time.time() - 10 * 86400
+    for path in (pending, finished, proxy_path_for(str(pending))):
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (stale, stale))
+
+    session = PendingTasks([str(pending)])
+    keep = active_upload_paths(session)
+    freed = sweep_files([tmp_path], cutoff=time.time() - 86400, keep=keep)
+
+    assert "NOT IN" in str(session.statement)
+    assert freed == 10
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "pending.mp4",
+        "pending.proxy.mp4",
+    ]
+
+
+def test_no_environment_deletes_data_by_default(monkeypatch):
+    from src.settings.config import DevConfig, LocalConfig, ProdConfig, TestConfig
+
+    monkeypatch.delenv("RETENTION_RESULTS_DAYS", raising=False)
+    monkeypatch.delenv("RETENTION_UPLOADS_DAYS", raising=False)
+    for config in (LocalConfig, DevConfig, TestConfig, ProdConfig):
+        settings = config(_env_file=None)
+        assert settings.RETENTION_RESULTS_DAYS is None
+        assert settings.RETENTION_UPLOADS_DAYS is None
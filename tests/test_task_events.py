@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+import uuid
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+from src.providers.openrouter import OpenRouterClient
+from src.providers.rate_limit import LocalBucketStore, RateLimiter
+from src.providers.response_cache import ResponseCache
+from src.services import task_status
+from src.services.frame_analysis import FrameAnalyzer
+from src.services.task_events import TaskEventBus, TaskEventPublisher
+from src.utils.aiohttp_adapter import AioHttpAdapter
+
+
+@pytest.mark.asyncio
+async def test_streamed_completion_reaches_task_subscribers(tmp_path, stub_server):
+    seen: dict = {}
+
+    async def completions(request: web.Request) -> web.StreamResponse:
+        seen["body"] = await request.json()
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": OPENROUTER PROCESSING\n\n")
+        for token in ["Двое ", "входят ", "в дверь"]:
+            chunk = {"choices": [{"delta": {"content": token}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    base_url = await stub_server({"/api/v1/chat/completions": completions})
+
+    frame = tmp_path / "frame.png"
+    frame.write_bytes(b"png-bytes")
+    adapter = AioHttpAdapter()
+    client = OpenRouterClient(
+        api_key="test-key",
+        base_url=f"{base_url}/api/v1",
+        adapter=adapter,
+        rate_limiter=RateLimiter(LocalBucketStore(), requests_per_minute=600, burst=5),
+        response_cache=ResponseCache(None),
+    )
+    bus = TaskEventBus()
+    task_id = uuid.uuid4()
+    analyzer = FrameAnalyzer(
+        client,
+        summary_prompt="Опиши сцену",
+        people_prompt="Сколько людей?",
+        count_people=False,
+        events=TaskEventPublisher(bus, task_id),
+    )
+    received = []
+
+    async def listen() -> None:
+        async for event in bus.subscribe(task_id):
+            received.append(event)
+
+    listener = asyncio.ensure_future(listen())
+    await asyncio.sleep(0)
+    try:
+        result = await analyzer.analyze(Path(frame), 1.5)
+        bus.finish(task_id, "status", {"status": "completed"})
+        await asyncio.wait_for(listener, 1)
+    finally:
+        await adapter.close()
+
+    assert seen["body"]["stream"] is True
+    assert result.summary == "Двое входят в дверь"
+    partials = [event.data["text"] for event in received if event.type == "partial"]
+    assert partials == ["Двое ", "Двое входят ", "Двое входят в дверь"]
+    assert [event.type for event in received][-2:] == ["frame", "status"]
+    assert received[-2].data == {"timestamp": 1.5, "summary": result.summary, "people": None}
+
+
+@pytest.mark.asyncio
+async def test_bus_replays_history_and_delivers_across_threads():
+    bus = TaskEventBus(history=10)
+    task_id = uuid.uuid4()
+    first = bus.publish(task_id, "status", {"status": "processing"})
+    bus.publish(task_id, "partial", {"text": "..."}, retain=False)
+
+    events = bus.subscribe(task_id, last_event_id=0, keepalive=0.05)
+    assert (await events.__anext__()) == first
+    assert bus.has_subscribers(task_id)
+
+    worker = threading.Thread(
+        target=lambda: bus.finish(task_id, "status", {"status": "failed"})
+    )
+    worker.start()
+    received = [event async for event in events]
+    worker.join()
+
+    # Keepalives may come first; the partial was not kept for the late subscriber.
+    assert [event.data for event in received if event is not None] == [{"status": "failed"}]
+    assert not bus.has_subscribers(task_id)
+
+    # After the task ended, a reconnect only replays what it missed.
+    replay = [event async for event in bus.subscribe(task_id, last_event_id=first.id)]
+    assert [event.data["status"] for event in replay] == ["failed"]
+
+
+@pytest.mark.asyncio
+async def test_status_notifications_wake_waiters_and_remote_streams(monkeypatch):
+    bus = TaskEventBus()
+    monkeypatch.setattr(task_status, "get_task_events", lambda: bus)
+    listener = task_status.TaskStatusListener()
+    task_id = uuid.uuid4()
+    events = bus.subscribe(task_id, keepalive=1)
+    listen = asyncio.ensure_future(events.__anext__())
+    await asyncio.sleep(0)
+
+    def notify(status: str, origin: str) -> None:
+        payload = {"id": str(task_id), "status": status, "stage": None, "origin": origin}
+        listener._on_notify(None, 1, task_status.TASK_STATUS_CHANNEL, json.dumps(payload))
+
+    with listener.watch(task_id) as changed:
+        # Local changes reach streams through the worker's own publisher.
+        notify("processing", task_status.INSTANCE_ID)
+        assert changed.is_set()
+        assert not listen.done()
+
+    notify("completed", "other-replica")
+    event = await asyncio.wait_for(listen, 1)
+    assert (event.type, event.data["status"]) == ("status", "completed")
+    assert [item async for item in events] == []
+    assert listener._waiters == {}
@@ -0,0 +1,44 @@
+from src.services import video_processor
+from src.services.tracking import PersonTracker, box_iou
+from src.settings import AnalysisProfile, PeopleCountSource, get_settings
+
+
+def test_box_iou_overlap():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+    assert 0 < box_iou((0, 0, 10, 10), (5, 5, 10, 10)) < 1
+
+
+def test_tracker_keeps_identity_across_frames():
+    tracker = PersonTracker(min_hits=2, max_missed=1)
+    tracker.update([(0, 0, 50, 100), (300, 0, 50, 100)], 0.0)
+    tracker.update([(10, 0, 50, 100), (310, 0, 50, 100)], 0.5)
+    tracker.update([(20, 0, 50, 100)], 1.0)
+
+    assert tracker.unique_count == 2
+    spans = tracker.spans()
+    assert [span.start_seconds for span in spans] == [0.0, 0.0]
+    assert spans[0].end_seconds == 1.0
+    assert spans[1].end_seconds == 0.5
+
+
+def test_tracker_ignores_single_hit_detections():
+    tracker = PersonTracker(min_hits=2, max_missed=0)
+    tracker.update([(0, 0, 50, 100)], 0.0)
+    tracker.update([], 0.5)
+    tracker.update([(400, 300, 50, 100)], 1.0)
+    tracker.update([(405, 300, 50, 100)], 1.5)
+
+    assert tracker.unique_count == 1
+
+
+def test_untracked_profiles_fall_back_to_provider_people_counts(monkeypatch):
+    settings = get_settings().model_copy(
+        update={"PEOPLE_COUNT_SOURCE": PeopleCountSource.TRACKER}
+    )
+    monkeypatch.setattr(video_processor, "get_settings", lambda: settings)
+
+    tracking, count_with_provider = video_processor.plan_people_counting(AnalysisProfile.FULL)
+    assert tracking is not None and not count_with_provider
+    for profile in (AnalysisProfile.PROGRESSIVE, AnalysisProfile.LIVE):
+        assert video_processor.plan_people_counting(profile) == (None, True)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from src.services.triggers import (
+    MotionRule,
+    TriggerConfigError,
+    TriggerEngine,
+    parse_trigger_rule,
+    parse_trigger_rules,
+)
+
+
+def test_parse_rules_from_text_and_json():
+    assert parse_trigger_rules("people >= 3; summary mentions weapon") == [
+        "people >= 3",
+        "summary mentions weapon",
+    ]
+    assert parse_trigger_rules('["motion in roi(0, 0, 0.5, 0.5) for > 10s"]') == [
+        "motion in roi(0, 0, 0.5, 0.5) for > 10s"
+    ]
+    rule = parse_trigger_rule("motion in roi(0,0,0.5,0.5) for > 10s")
+    assert isinstance(rule, MotionRule)
+    assert rule.roi == (0.0, 0.0, 0.5, 0.5)
+
+
+@pytest.mark.parametrize("rule", ["people >> 3", "motion in roi(0,0,2,2) for > 1s", "foo"])
+def test_invalid_rules_rejected(rule):
+    with pytest.raises(TriggerConfigError):
+        parse_trigger_rule(rule)
+
+
+def test_engine_fires_each_rule_once():
+    engine = TriggerEngine.from_expressions(["people >= 3", "summary mentions weapon"])
+    assert engine.observe_people(1.0, 2) == []
+    assert len(engine.observe_people(2.0, 3)) == 1
+    assert engine.observe_people(3.0, 4) == []
+    fired = engine.observe_summary(4.0, "A man holding a WEAPON")
+    assert [firing.timestamp for firing in fired] == [4.0]
+
+
+def test_motion_rule_requires_continuous_roi_motion():
+    engine = TriggerEngine.from_expressions(["motion in roi(0,0,0.5,0.5) for > 1s"])
+    moving = np.zeros((100, 100), dtype=np.uint8)
+    moving[:50, :50] = 255
+    outside = np.zeros((100, 100), dtype=np.uint8)
+    outside[50:, 50:] = 255
+
+    assert engine.observe_motion(0.0, outside) == []
+    assert engine.observe_motion(0.5, moving) == []
+    assert engine.observe_motion(1.0, moving) == []
+    assert len(engine.observe_motion(1.6, moving)) == 1
+    assert not engine.wants_motion
@@ -0,0 +1,129 @@
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from aiohttp import web
+
+from src.models import Video
+from src.services.triggers import TriggerFiring
+from src.services.webhooks import (
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    TRIGGER_EVENT,
+    PendingWebhook,
+    PublicResolver,
+    WebhookTargetError,
+    check_webhook_url,
+    enqueue_trigger_webhooks,
+    is_public_address,
+    retry_delay,
+    send_webhooks,
+    verify_signature,
+)
+from src.utils.aiohttp_adapter import AioHttpAdapter, AioHttpAdapterError
+
+
+def _delivery(status: str) -> PendingWebhook:
+    task_id = str(uuid.uuid4())
+    return PendingWebhook(
+        id=uuid.uuid4(),
+        url="",
+        event=f"task.{status}",
+        payload={"task_id": task_id, "status": status},
+        attempts=1,
+        created_at=datetime.utcnow(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_batched_webhook_is_signed_and_failures_carry_retry_after(stub_server):
+    received = []
+    replies = [web.Response(status=503, headers={"Retry-After": "120"}), web.Response(text="ok")]
+
+    async def receiver(request: web.Request) -> web.Response:
+        body = await request.read()
+        received.append(
+            (body, request.headers[TIMESTAMP_HEADER], request.headers[SIGNATURE_HEADER])
+        )
+        return replies.pop(0)
+
+    base_url = await stub_server({"/hooks": receiver})
+    url = f"{base_url}/hooks"
+
+    batch = [_delivery("completed"), _delivery("failed")]
+    adapter = AioHttpAdapter()
+    try:
+        with pytest.raises(AioHttpAdapterError) as failure:
+            await send_webhooks(adapter, url, batch, secret="s3cret")
+        await send_webhooks(adapter, url, batch, secret="s3cret")
+    finally:
+        await adapter.close()
+
+    assert failure.value.status == 503
+    assert retry_delay(1, 120.0) == 120.0
+    body, timestamp, signature = received[-1]
+    assert verify_signature(body, timestamp, signature, "s3cret")
+    assert not verify_signature(body, timestamp, signature, "other")
+    assert not verify_signature(body + b" ", timestamp, signature, "s3cret")
+    events = json.loads(body)["events"]
+    assert [event["event"] for event in events] == ["task.completed", "task.failed"]
+    assert events[0]["data"] == batch[0].payload
+
+
+def test_retry_delay_backs_off_exponentially_up_to_the_cap():
+    assert [retry_delay(attempt) for attempt in range(1, 6)] == [5, 10, 20, 40, 80]
+    assert retry_delay(20) == 3600
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.added = []
+
+    def add_all(self, rows):
+        self.added.extend(rows)
+
+
+def test_each_trigger_firing_is_queued_as_its_own_event():
+    video = Video(id=uuid.uuid4(), webhook_url="https://hooks.example.com/tsos")
+    firings = [
+        TriggerFiring(rule="people >= 2", timestamp=3.5, detail="people=3"),
+        TriggerFiring(rule="summary mentions fire", timestamp=7.0, detail="fire"),
+    ]
+    session = _RecordingSession()
+
+    deliveries = enqueue_trigger_webhooks(session, video, firings)
+
+    assert session.added == deliveries
+    assert [delivery.event for delivery in deliveries] == [TRIGGER_EVENT, TRIGGER_EVENT]
+    assert {delivery.url for delivery in deliveries} == {video.webhook_url}
+    assert deliveries[0].payload == {
+        "task_id": str(video.id),
+        "rule": "people >= 2",
+        "timestamp_seconds": 3.5,
+        "detail": "people=3",
+    }
+    assert enqueue_trigger_webhooks(session, Video(id=uuid.uuid4()), firings) == []
+
+
+@pytest.mark.asyncio
+async def test_webhooks_to_internal_addresses_are_refused():
+    for address in ("169.254.169.254", "10.1.2.3", "127.0.0.1", "::1", "::ffff:192.168.0.1"):
+        assert not is_public_address(address)
+    assert is_public_address("93.184.216.34")
+
+    for url in (
+        "http://169.254.169.254/latest/meta-data/",
+        "http://localhost:8080/hooks",
+        "http://[::1]/hooks",
+        "ftp://93.184.216.34/hooks",
+    ):
+        with pytest.raises(WebhookTargetError):
+            await check_webhook_url(url, allowed_hosts=[])
+    await check_webhook_url("https://93.184.216.34/hooks", allowed_hosts=[])
+    await check_webhook_url("http://localhost:8080/hooks", allowed_hosts=["localhost"])
+
+    with pytest.raises(OSError):
+        await PublicResolver(allowed_hosts=[]).resolve("127.0.0.1", 80)
+    resolved = await PublicResolver(allowed_hosts=["127.0.0.1"]).resolve("127.0.0.1", 80)
+    assert resolved[0]["host"] == "127.0.0.1"